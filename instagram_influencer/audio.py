@@ -14,10 +14,14 @@ import os
 import random
 import subprocess
 import tempfile
+import threading
 from pathlib import Path
 
 import requests as http_requests
 
+import ffmpeg_caps
+import loudness
+import synth
 from config import GENERATED_IMAGES_DIR
 
 log = logging.getLogger(__name__)
@@ -31,13 +35,84 @@ _AUDIO_EXTENSIONS = {".mp3", ".wav", ".aac", ".m4a", ".ogg", ".flac"}
 # CC0 music endpoint (JSON or direct MP3). Falls back to generated lo-fi.
 
 
+# Chord progressions — each is 4 chords, each chord = list of freqs (Hz)
+# Cycle through the 4 chords over the duration
+_PROGRESSIONS = [
+    # i - VI - III - VII (Am - F - C - G) — lo-fi classic
+    {
+        "name": "lofi_classic",
+        "chords": [
+            [220.0, 261.6, 329.6],     # Am (A3, C4, E4)
+            [174.6, 220.0, 261.6],     # F (F3, A3, C4)
+            [130.8, 164.8, 196.0],     # C (C3, E3, G3)
+            [196.0, 246.9, 293.7],     # G (G3, B3, D4)
+        ],
+        "bass": [110.0, 87.3, 65.4, 98.0],  # root notes one octave down
+    },
+    # i - iv - VI - V (Am - Dm - F - E) — emotional
+    {
+        "name": "emotional",
+        "chords": [
+            [220.0, 261.6, 329.6],     # Am
+            [146.8, 174.6, 220.0],     # Dm (D3, F3, A3)
+            [174.6, 220.0, 261.6],     # F
+            [164.8, 207.7, 246.9],     # E (E3, G#3, B3)
+        ],
+        "bass": [110.0, 73.4, 87.3, 82.4],
+    },
+    # I - vi - IV - V (C - Am - F - G) — uplifting pop
+    {
+        "name": "uplifting",
+        "chords": [
+            [261.6, 329.6, 392.0],     # C (C4, E4, G4)
+            [220.0, 261.6, 329.6],     # Am
+            [174.6, 220.0, 261.6],     # F
+            [196.0, 246.9, 293.7],     # G
+        ],
+        "bass": [130.8, 110.0, 87.3, 98.0],
+    },
+    # ii - V - I - vi (Dm - G - C - Am) — jazzy
+    {
+        "name": "jazzy",
+        "chords": [
+            [146.8, 174.6, 220.0],     # Dm
+            [196.0, 246.9, 293.7],     # G
+            [261.6, 329.6, 392.0],     # C
+            [220.0, 261.6, 329.6],     # Am
+        ],
+        "bass": [73.4, 98.0, 130.8, 110.0],
+    },
+]
+
+# Lo-fi timing: 4 chords × 2.5s = 10s progression cycle, kick every 2 beats
+# at 75 BPM = 1.6s. Beds whose length is a multiple of both (40s, 80s) loop
+# seamlessly.
+_CHORD_DUR = 2.5
+_BPM = 75
+
+# Pre-rendered bed library: one loopable WAV (loudness measured once) per
+# (progression, length), built on first use and cut per render in ms.
+# AUDIO_BEDS=0 falls back to synthesizing every track from scratch.
+BED_LENGTHS = (40, 80)
+_BED_VERSION = 2  # bump when the synth changes so stale beds are rebuilt
+_bed_lock = threading.Lock()
+
+# Synthesis backend: numpy (vectorized, synth.py; the default) or ffmpeg
+# (aevalsrc graphs).
+SYNTH_BACKENDS = ("numpy", "ffmpeg")
+
+
 def _get_ffmpeg() -> str:
     """Get path to ffmpeg binary."""
-    try:
-        import imageio_ffmpeg
-        return imageio_ffmpeg.get_ffmpeg_exe()
-    except ImportError:
-        return "ffmpeg"
+    return ffmpeg_caps.ffmpeg_path()
+
+
+def _synth_backend() -> str:
+    backend = os.getenv("AUDIO_SYNTH_BACKEND", "numpy").strip().lower()
+    if backend not in SYNTH_BACKENDS:
+        log.warning("Unknown AUDIO_SYNTH_BACKEND=%r — using numpy", backend)
+        backend = "numpy"
+    return backend
 
 
 def _fetch_external_track(duration: float) -> str | None:
@@ -115,13 +190,13 @@ def get_background_track(duration: float, *, for_youtube: bool = True) -> str |
         log.info("Audio: external music API track (copyright-free)")
         return ext_track
 
-    # 3. Generate lo-fi beat with ffmpeg (always available — no API needed)
+    # 3. Synthesize a lo-fi beat (NumPy or ffmpeg — always available, no API needed)
     log.info("Audio: generating lo-fi beat (%.0fs)", duration)
     return _generate_ambient(duration)
 
 
 def _generate_ambient(duration: float) -> str | None:
-    """Generate a lo-fi beat with chord progression using ffmpeg.
+    """Generate a lo-fi beat with chord progression (NumPy or ffmpeg backend).
 
     Creates professional-sounding background music by mixing:
       - Chord progression (4 chords, cycling) with detuned oscillators for warmth
@@ -130,70 +205,154 @@ def _generate_ambient(duration: float) -> str | None:
       - Lo-fi drum pattern (kick + hi-hat from filtered noise)
       - Fade in/out for smooth transitions
 
-    Randomly selects from multiple chord progressions for variety.
+    Randomly selects from multiple chord progressions for variety. The track
+    is cut from the pre-rendered bed library when possible (milliseconds);
+    synthesizing from scratch (seconds) is the fallback.
     """
-    ffmpeg = _get_ffmpeg()
-    fd, audio_path = tempfile.mkstemp(suffix=".wav", prefix="lofi_")
-    os.close(fd)
+    prog = random.choice(_PROGRESSIONS)
+    if os.getenv("AUDIO_BEDS", "1").strip().lower() not in {"0", "false", "no", "off"}:
+        track = _cut_from_bed(prog, duration)
+        if track:
+            return track
+    return _synthesize_lofi(prog, duration)
+
+
+def _bed_dir() -> Path:
+    """Bed library location: AUDIO_BED_DIR, else the XDG cache dir.
+
+    Beds don't depend on the persona, so they live outside data/ and are
+    shared by every account on the machine (CI restores them via actions/cache).
+    """
+    override = os.getenv("AUDIO_BED_DIR", "").strip()
+    if override:
+        return Path(override)
+    cache_root = os.getenv("XDG_CACHE_HOME", "").strip() or str(Path.home() / ".cache")
+    return Path(cache_root) / "instagram_influencer" / "audio_beds"
+
+
+def _get_bed(prog: dict, length: int) -> str | None:
+    """Path to the loopable bed for `prog`, rendering it on first use."""
+    path = _bed_dir() / f"{prog['name']}_{length}s_v{_BED_VERSION}.wav"
+    if path.exists():
+        return str(path)
+
+    with _bed_lock:
+        if path.exists():
+            return str(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = str(path.with_suffix(f".tmp{os.getpid()}.wav"))
+        # No fades: the bed must loop seamlessly; fades are applied per cut
+        try:
+            _render_lofi(prog, length, tmp_path, fade=False, timeout=180)
+        except Exception as exc:
+            log.warning("Audio bed build failed (%s): %s", path.name, exc)
+            _safe_remove(tmp_path)
+            return None
+        os.replace(tmp_path, path)
+        log.info("Built audio bed %s (%ds)", path.name, length)
+        loudness.measure(str(path))  # index it beside the bed so cuts never re-analyse
+    return str(path)
+
+
+def build_bed_library() -> int:
+    """Render every (progression, length) bed that is missing. Returns count ready."""
+    return sum(
+        1 for prog in _PROGRESSIONS for length in BED_LENGTHS
+        if _get_bed(prog, length)
+    )
+
+
+def _cut_from_bed(prog: dict, duration: float) -> str | None:
+    """Cut a `duration`-second track from a bed: seek + fade, no synthesis.
+
+    Uses the shortest bed that covers the duration and starts at a random
+    chord boundary for variety; longer tracks loop the longest bed.
+    """
+    length = next((n for n in BED_LENGTHS if n >= duration), BED_LENGTHS[-1])
+    bed = _get_bed(prog, length)
+    if not bed:
+        return None
 
+    slack = length - duration
+    offset = _CHORD_DUR * random.randint(0, int(slack // _CHORD_DUR)) if slack > 0 else 0.0
     fade_out_start = max(0, duration - 1.2)
 
-    # Chord progressions — each is 4 chords, each chord = list of freqs (Hz)
-    # Cycle through the 4 chords over the duration
-    _PROGRESSIONS = [
-        # i - VI - III - VII (Am - F - C - G) — lo-fi classic
-        {
-            "name": "lofi_classic",
-            "chords": [
-                [220.0, 261.6, 329.6],     # Am (A3, C4, E4)
-                [174.6, 220.0, 261.6],     # F (F3, A3, C4)
-                [130.8, 164.8, 196.0],     # C (C3, E3, G3)
-                [196.0, 246.9, 293.7],     # G (G3, B3, D4)
-            ],
-            "bass": [110.0, 87.3, 65.4, 98.0],  # root notes one octave down
-        },
-        # i - iv - VI - V (Am - Dm - F - E) — emotional
-        {
-            "name": "emotional",
-            "chords": [
-                [220.0, 261.6, 329.6],     # Am
-                [146.8, 174.6, 220.0],     # Dm (D3, F3, A3)
-                [174.6, 220.0, 261.6],     # F
-                [164.8, 207.7, 246.9],     # E (E3, G#3, B3)
-            ],
-            "bass": [110.0, 73.4, 87.3, 82.4],
-        },
-        # I - vi - IV - V (C - Am - F - G) — uplifting pop
-        {
-            "name": "uplifting",
-            "chords": [
-                [261.6, 329.6, 392.0],     # C (C4, E4, G4)
-                [220.0, 261.6, 329.6],     # Am
-                [174.6, 220.0, 261.6],     # F
-                [196.0, 246.9, 293.7],     # G
-            ],
-            "bass": [130.8, 110.0, 87.3, 98.0],
-        },
-        # ii - V - I - vi (Dm - G - C - Am) — jazzy
-        {
-            "name": "jazzy",
-            "chords": [
-                [146.8, 174.6, 220.0],     # Dm
-                [196.0, 246.9, 293.7],     # G
-                [261.6, 329.6, 392.0],     # C
-                [220.0, 261.6, 329.6],     # Am
-            ],
-            "bass": [73.4, 98.0, 130.8, 110.0],
-        },
+    fd, audio_path = tempfile.mkstemp(suffix=".wav", prefix="lofi_")
+    os.close(fd)
+    cmd = [_get_ffmpeg(), "-y"]
+    if duration > length:
+        cmd += ["-stream_loop", "-1"]  # beds are loop-clean
+    cmd += [
+        "-ss", f"{offset:.2f}", "-i", bed,
+        "-t", f"{duration:.2f}",
+        "-af", f"afade=t=in:d=0.8,afade=t=out:st={fade_out_start}:d=1.2",
+        "-c:a", "pcm_s16le",
+        audio_path,
     ]
 
-    prog = random.choice(_PROGRESSIONS)
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            log.warning("Audio bed cut failed: %s", (result.stderr or "")[-300:])
+            _safe_remove(audio_path)
+            return None
+    except Exception as exc:
+        log.warning("Audio bed cut error: %s", exc)
+        _safe_remove(audio_path)
+        return None
+
+    loudness.inherit(audio_path, bed)
+    log.info("Lo-fi beat (%s): %.1fs cut from %ds bed at %.1fs",
+             prog["name"], duration, length, offset)
+    return audio_path
+
+
+def _synthesize_lofi(prog: dict, duration: float) -> str | None:
+    """Render a lo-fi track from scratch (the pre-library path)."""
+    fd, audio_path = tempfile.mkstemp(suffix=".wav", prefix="lofi_")
+    os.close(fd)
+
+    try:
+        _render_lofi(prog, duration, audio_path, fade=True, timeout=60)
+    except Exception as exc:
+        log.warning("Lo-fi beat generation failed: %s", exc)
+        _safe_remove(audio_path)
+        # Fall back to simple ambient if complex generation fails
+        return _generate_simple_ambient(duration)
+
+    file_size = os.path.getsize(audio_path)
+    log.info("Generated lo-fi beat (%s): %d bytes, %.1fs",
+             prog["name"], file_size, duration)
+    return audio_path
+
+
+def _render_lofi(prog: dict, duration: float, audio_path: str, *,
+                 fade: bool, timeout: int) -> None:
+    """Synthesize `prog` into audio_path with the configured backend.
+
+    Raises on failure (RuntimeError carries ffmpeg's stderr tail).
+    """
+    if _synth_backend() == "numpy":
+        synth.render_lofi(prog, duration, audio_path,
+                          chord_dur=_CHORD_DUR, bpm=_BPM, fade=fade)
+        return
+    cmd = _lofi_cmd(prog, duration, audio_path, fade=fade)
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError((result.stderr or "")[-500:])
+
+
+def _lofi_cmd(prog: dict, duration: float, audio_path: str, fade: bool = True) -> list[str]:
+    """Build the ffmpeg command that synthesizes `prog` into audio_path."""
+    ffmpeg = _get_ffmpeg()
+    fade_out_start = max(0, duration - 1.2)
+
     chords = prog["chords"]
     bass_notes = prog["bass"]
     n_chords = len(chords)
 
     # Each chord lasts ~2.5 seconds, cycling through the progression
-    chord_dur = 2.5
+    chord_dur = _CHORD_DUR
 
     # Build chord pad expression: detuned oscillators for warmth
     # Each note gets a main + slightly detuned copy (±2Hz) for chorus effect
@@ -241,7 +400,7 @@ def _generate_ambient(duration: float) -> str | None:
 
     # Lo-fi drum pattern: kick (low thump) + hi-hat (high click)
     # BPM ~75 (lo-fi tempo), kick on 1 & 3, hat on every beat
-    bpm = 75
+    bpm = _BPM
     beat_dur = 60.0 / bpm
     # Kick: punchy low freq burst every 2 beats
     kick_expr = (
@@ -257,15 +416,15 @@ def _generate_ambient(duration: float) -> str | None:
         f"volume=0.025"
     )
 
-    # Mix all 5 layers with fades + loudness normalization
+    # Mix all 5 layers with fades. No loudnorm here: the track is measured
+    # once and levelled at mux time (loudness.py).
     filter_complex = (
         f"[0:a][1:a][2:a][3:a][4:a]amix=inputs=5:duration=shortest:weights=1 0.8 0.5 0.7 0.4,"
         f"lowpass=f=12000,"  # lo-fi: cut harsh highs
-        f"equalizer=f=400:width_type=o:width=2:g=3,"  # warm mid boost
-        f"loudnorm=I=-16:TP=-1.5:LRA=11,"  # broadcast loudness normalization
-        f"afade=t=in:d=0.8,"
-        f"afade=t=out:st={fade_out_start}:d=1.2"
+        f"equalizer=f=400:width_type=o:width=2:g=3"  # warm mid boost
     )
+    if fade:
+        filter_complex += f",afade=t=in:d=0.8,afade=t=out:st={fade_out_start}:d=1.2"
 
     cmd = [
         ffmpeg, "-y",
@@ -276,37 +435,31 @@ def _generate_ambient(duration: float) -> str | None:
         "-f", "lavfi", "-i", hat_input,
         "-filter_complex", filter_complex,
         "-c:a", "pcm_s16le",
+        "-ar", "44100",
         audio_path,
     ]
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode != 0:
-            log.warning("Lo-fi beat generation failed: %s", (result.stderr or "")[-500:])
-            _safe_remove(audio_path)
-            # Fall back to simple ambient if complex generation fails
-            return _generate_simple_ambient(duration)
-
-        file_size = os.path.getsize(audio_path)
-        log.info("Generated lo-fi beat (%s): %d bytes, %.1fs",
-                 prog["name"], file_size, duration)
-        return audio_path
-    except Exception as exc:
-        log.warning("Lo-fi beat generation error: %s", exc)
-        _safe_remove(audio_path)
-        return _generate_simple_ambient(duration)
+    return cmd
 
 
 def _generate_simple_ambient(duration: float) -> str | None:
     """Simple ambient fallback — warm pad with gentle movement.
 
     Used when the full lo-fi beat generation fails (e.g., old ffmpeg version).
-    Still much better than the original static chord.
+    Still much better than the original static chord. Tries the NumPy
+    synthesizer first when that backend is active.
     """
-    ffmpeg = _get_ffmpeg()
     fd, audio_path = tempfile.mkstemp(suffix=".wav", prefix="ambient_")
     os.close(fd)
 
+    if _synth_backend() == "numpy":
+        try:
+            synth.render_ambient(duration, audio_path)
+            log.debug("Generated simple ambient: %s (%d bytes)", audio_path, os.path.getsize(audio_path))
+            return audio_path
+        except Exception as exc:
+            log.warning("NumPy ambient synthesis failed, trying ffmpeg: %s", exc)
+
+    ffmpeg = _get_ffmpeg()
     fade_out_start = max(0, duration - 0.8)
 
     # Warm evolving pad: Am7 chord with slow LFO modulation for movement
@@ -337,7 +490,6 @@ def _generate_simple_ambient(duration: float) -> str | None:
     filter_complex = (
         f"[0:a][1:a]amix=inputs=2:duration=shortest,"
         f"lowpass=f=10000,"
-        f"loudnorm=I=-16:TP=-1.5:LRA=11,"  # broadcast loudness normalization
         f"afade=t=in:d=0.6,"
         f"afade=t=out:st={fade_out_start}:d=0.8"
     )
@@ -366,38 +518,6 @@ def _generate_simple_ambient(duration: float) -> str | None:
         return None
 
 
-def trim_audio(audio_path: str, duration: float) -> str | None:
-    """Trim an audio file to the specified duration with fade out.
-
-    Returns path to trimmed audio (temp file), or None on failure.
-    """
-    ffmpeg = _get_ffmpeg()
-    fd, trimmed_path = tempfile.mkstemp(suffix=".wav", prefix="trimmed_")
-    os.close(fd)
-
-    fade_out_start = max(0, duration - 0.8)
-
-    cmd = [
-        ffmpeg, "-y",
-        "-i", audio_path,
-        "-t", str(duration),
-        "-af", f"afade=t=in:d=0.3,afade=t=out:st={fade_out_start}:d=0.8",
-        "-c:a", "pcm_s16le",
-        "-ar", "44100",
-        trimmed_path,
-    ]
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0:
-            _safe_remove(trimmed_path)
-            return None
-        return trimmed_path
-    except Exception:
-        _safe_remove(trimmed_path)
-        return None
-
-
 def _safe_remove(path: str) -> None:
     try:
         os.remove(path)
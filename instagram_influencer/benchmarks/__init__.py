@@ -0,0 +1 @@
+"""Rendering benchmarks — run from instagram_influencer/ as `python -m benchmarks.<name>`."""
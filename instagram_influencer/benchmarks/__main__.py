@@ -0,0 +1,5 @@
+"""`python -m benchmarks` runs the full suite (see benchmarks/suite.py)."""
+
+from benchmarks.suite import main
+
+raise SystemExit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Lo-fi synthesis benchmark: NumPy backend vs ffmpeg aevalsrc graphs.
+
+Renders the same progression with every backend in audio.SYNTH_BACKENDS
+for each track length and reports wall time, realtime factor and the
+integrated loudness ffmpeg measures on the output (the exact level is set
+at mux time by loudness.py).
+
+  cd instagram_influencer
+  python -m benchmarks.audio_synth                       # 10s, 25s, 60s
+  python -m benchmarks.audio_synth --durations 40 80 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+import audio
+
+
+def measured_lufs(ffmpeg: str, path: str) -> float | None:
+    """Integrated loudness of a file via ffmpeg's ebur128 filter."""
+    result = subprocess.run(
+        [ffmpeg, "-i", path, "-af", "ebur128", "-f", "null", "-"],
+        capture_output=True, text=True, timeout=120,
+    )
+    m = re.findall(r"I:\s+(-?[0-9.]+) LUFS", result.stderr or "")
+    return float(m[-1]) if m else None
+
+
+def run(durations: list[float], repeat: int, progression: str) -> list[dict]:
+    prog = next(p for p in audio._PROGRESSIONS if p["name"] == progression)
+    ffmpeg = audio._get_ffmpeg()
+    workdir = tempfile.mkdtemp(prefix="synth_bench_")
+    rows: list[dict] = []
+    prev = os.environ.get("AUDIO_SYNTH_BACKEND")
+
+    try:
+        for duration in durations:
+            for backend in audio.SYNTH_BACKENDS:
+                os.environ["AUDIO_SYNTH_BACKEND"] = backend
+                if audio._synth_backend() != backend:
+                    continue  # numpy not installed
+                out = os.path.join(workdir, f"{backend}_{duration:g}s.wav")
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    audio._render_lofi(prog, duration, out, fade=True, timeout=600)
+                    best = min(best, time.perf_counter() - start)
+                rows.append({"duration": duration, "backend": backend, "seconds": best,
+                             "realtime": duration / best,
+                             "lufs": measured_lufs(ffmpeg, out)})
+                os.remove(out)
+    finally:
+        if prev is None:
+            os.environ.pop("AUDIO_SYNTH_BACKEND", None)
+        else:
+            os.environ["AUDIO_SYNTH_BACKEND"] = prev
+        os.rmdir(workdir)
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Lo-fi synthesis backend benchmark")
+    parser.add_argument("--durations", type=float, nargs="+", default=[10, 25, 60])
+    parser.add_argument("--repeat", type=int, default=1, help="runs per backend (best is kept)")
+    parser.add_argument("--progression", default="lofi_classic",
+                        choices=[p["name"] for p in audio._PROGRESSIONS])
+    args = parser.parse_args()
+
+    rows = run(args.durations, args.repeat, args.progression)
+
+    print(f"Lo-fi synthesis ({args.progression}), best of {args.repeat}")
+    print(f"{'track':>7} {'backend':<8} {'seconds':>8} {'x realtime':>11} {'LUFS':>7} {'speedup':>8}")
+    baseline = {r["duration"]: r["seconds"] for r in rows if r["backend"] == "ffmpeg"}
+    for r in rows:
+        lufs = f"{r['lufs']:.1f}" if r["lufs"] is not None else "n/a"
+        base = baseline.get(r["duration"])
+        speedup = f"{base / r['seconds']:.1f}x" if base else "n/a"
+        print(f"{r['duration']:>6g}s {r['backend']:<8} {r['seconds']:>8.2f} "
+              f"{r['realtime']:>11.1f} {lufs:>7} {speedup:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Encoder profile benchmark: speed, size and quality per ENCODER_PROFILES entry.
+
+Renders a fixed corpus of the repo's pending images through image_to_video()
+with every profile in video.ENCODER_PROFILES and reports:
+  - encode fps: output frames / wall seconds (motion graph included)
+  - bytes: total size of the corpus' MP4s
+  - SSIM / PSNR against a lossless (-qp 0) render of the same graph
+
+The corpus is the first --count images (sorted by path) found under
+data/*/generated_images/pending/, so runs are comparable across commits;
+a synthetic photo is used when no pending images exist.
+
+--tuning also renders each profile with the static-content x264 tunings
+(TUNINGS: -tune stillimage, a long GOP without scene cuts, both) and
+reports their size and SSIM change against the untuned profile. That is
+the measurement behind keeping them out of ENCODER_PROFILES; re-run it
+when the motion or the profiles change.
+
+  cd instagram_influencer
+  python -m benchmarks.encoder_profiles
+  python -m benchmarks.encoder_profiles --count 8 --size yt --profiles draft publish
+  python -m benchmarks.encoder_profiles --profiles publish archive --tuning
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+import video
+from benchmarks.kenburns import synthetic_photo
+from persona import DATA_DIR
+
+_SIZES = {
+    "ig": (video.IG_WIDTH, video.IG_HEIGHT),
+    "yt": (video.YT_WIDTH, video.YT_HEIGHT),
+}
+
+# Quality reference: same graph, lossless x264. Registered only while the
+# benchmark runs.
+_REFERENCE = "_lossless_reference"
+_REFERENCE_ARGS = ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0"]
+
+# Static-content tunings, appended to a profile's args (--tuning). keyint 300
+# is 10s at 30fps — one GOP per reel — and scenecut=0 stops x264 inserting
+# its own keyframes. Registered as "<profile>+<tuning>" while the run lasts.
+TUNINGS: dict[str, list[str]] = {
+    "stillimage": ["-tune", "stillimage"],
+    "longgop": ["-x264-params", "keyint=300:min-keyint=30:scenecut=0"],
+}
+TUNINGS["static"] = TUNINGS["stillimage"] + TUNINGS["longgop"]
+
+
+def corpus(count: int) -> list[str]:
+    """First `count` pending images in the repo, or one synthetic photo."""
+    images = sorted(
+        str(p) for p in DATA_DIR.glob("*/generated_images/pending/*.jpg")
+    )[:count]
+    if not images:
+        images = [synthetic_photo(os.path.join(tempfile.gettempdir(), "kb_bench_photo.jpg"))]
+    return images
+
+
+def compare(ffmpeg: str, distorted: str, reference: str) -> tuple[float | None, float | None]:
+    """(SSIM All, PSNR average) of distorted vs reference via ffmpeg."""
+    def metric(name: str, pattern: str) -> float | None:
+        result = subprocess.run(
+            [ffmpeg, "-i", distorted, "-i", reference, "-lavfi", name, "-f", "null", "-"],
+            capture_output=True, text=True, timeout=300,
+        )
+        m = re.search(pattern, result.stderr or "")
+        return float(m.group(1)) if m and m.group(1) != "inf" else None
+
+    return metric("ssim", r"All:([0-9.]+)"), metric("psnr", r"average:([0-9.]+|inf)")
+
+
+def run(images: list[str], size: str, duration: int, profiles: list[str]) -> list[dict]:
+    width, height = _SIZES[size]
+    frames = duration * video.FPS
+    ffmpeg = video._get_ffmpeg()
+    workdir = tempfile.mkdtemp(prefix="enc_bench_")
+    video.ENCODER_PROFILES[_REFERENCE] = _REFERENCE_ARGS
+
+    def render(profile: str, i: int, image: str) -> tuple[str, float]:
+        out = os.path.join(workdir, f"{profile}_{i}.mp4")
+        start = time.perf_counter()
+        video.image_to_video(image, out, width, height, duration,
+                             add_audio=False, cache=False, encoder_profile=profile)
+        return out, time.perf_counter() - start
+
+    rows: list[dict] = []
+    try:
+        references = [render(_REFERENCE, i, image)[0] for i, image in enumerate(images)]
+        for profile in profiles:
+            seconds = 0.0
+            size_bytes = 0
+            ssims: list[float] = []
+            psnrs: list[float] = []
+            for i, image in enumerate(images):
+                out, elapsed = render(profile, i, image)
+                seconds += elapsed
+                size_bytes += os.path.getsize(out)
+                s, p = compare(ffmpeg, out, references[i])
+                if s is not None:
+                    ssims.append(s)
+                if p is not None:
+                    psnrs.append(p)
+            rows.append({
+                "profile": profile,
+                "fps": frames * len(images) / seconds,
+                "seconds": seconds,
+                "bytes": size_bytes,
+                "ssim": sum(ssims) / len(ssims) if ssims else None,
+                "psnr": sum(psnrs) / len(psnrs) if psnrs else None,
+            })
+    finally:
+        video.ENCODER_PROFILES.pop(_REFERENCE, None)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Encoder profile benchmark")
+    parser.add_argument("--count", type=int, default=4, help="corpus size (pending images)")
+    parser.add_argument("--size", choices=sorted(_SIZES), default="ig")
+    parser.add_argument("--duration", type=int, default=video.IG_DURATION)
+    parser.add_argument("--profiles", nargs="+", default=list(video.ENCODER_PROFILES),
+                        choices=list(video.ENCODER_PROFILES))
+    parser.add_argument("--tuning", action="store_true",
+                        help="also render every profile with each of TUNINGS")
+    args = parser.parse_args()
+
+    profiles: list[str] = []
+    tuned: list[str] = []
+    for base in args.profiles:
+        profiles.append(base)
+        if not args.tuning:
+            continue
+        for name, extra in TUNINGS.items():
+            variant = f"{base}+{name}"
+            video.ENCODER_PROFILES[variant] = video.ENCODER_PROFILES[base] + extra
+            tuned.append(variant)
+            profiles.append(variant)
+
+    images = corpus(args.count)
+    try:
+        rows = run(images, args.size, args.duration, profiles)
+    finally:
+        for variant in tuned:
+            video.ENCODER_PROFILES.pop(variant, None)
+
+    by_profile = {r["profile"]: r for r in rows}
+    width, height = _SIZES[args.size]
+    print(f"Encoder profiles @ {width}x{height}, {args.duration}s x {len(images)} image(s)")
+    print(f"{'profile':<22} {'encode fps':>10} {'seconds':>8} {'KiB':>8} {'SSIM':>7} "
+          f"{'PSNR dB':>8} {'size vs base':>13} {'SSIM vs base':>13}")
+    for r in rows:
+        ssim = f"{r['ssim']:.4f}" if r["ssim"] is not None else "n/a"
+        psnr = f"{r['psnr']:.2f}" if r["psnr"] is not None else "n/a"
+        size_delta = ssim_delta = ""
+        base = by_profile.get(r["profile"].partition("+")[0]) if "+" in r["profile"] else None
+        if base is not None:
+            size_delta = f"{(r['bytes'] / base['bytes'] - 1) * 100:+.1f}%"
+            if r["ssim"] is not None and base["ssim"] is not None:
+                ssim_delta = f"{r['ssim'] - base['ssim']:+.4f}"
+        print(f"{r['profile']:<22} {r['fps']:>10.1f} {r['seconds']:>8.2f} "
+              f"{r['bytes'] / 1024:>8.0f} {ssim:>7} {psnr:>8} {size_delta:>13} {ssim_delta:>13}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
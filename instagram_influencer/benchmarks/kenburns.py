@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Ken Burns engine benchmark: frame throughput + visual match.
+
+Renders the same photo with every engine in video.KEN_BURNS_ENGINES and
+reports:
+  - filter fps: the motion alone, no encode (zoompan: the graph decoded to
+    the null muxer; plate: framepipe.ken_burns frames composed in Python)
+  - render fps: full image_to_video() including the libx264 encode
+  - SSIM of each engine's output against the original 2x zoompan graph
+
+  cd instagram_influencer
+  python -m benchmarks.kenburns                     # synthetic test photo
+  python -m benchmarks.kenburns --image some.jpg --size yt --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+from PIL import Image, ImageDraw, ImageFilter
+
+import video
+
+_SIZES = {
+    "ig": (video.IG_WIDTH, video.IG_HEIGHT),
+    "yt": (video.YT_WIDTH, video.YT_HEIGHT),
+}
+
+
+def synthetic_photo(path: str, width: int = 1024, height: int = 1536) -> str:
+    """Write a photo-like test image (gradients + soft texture + hard edges).
+
+    Flat colours make every engine look identical; edges and mild texture
+    are where zoom resampling and blur differences show up. (Pure noise is
+    the opposite extreme — it measures x264, not the motion graph.)
+    """
+    grad = Image.linear_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (grad, grad.transpose(Image.FLIP_TOP_BOTTOM), grad.rotate(90)))
+    texture = Image.effect_noise((width, height), 24).filter(ImageFilter.GaussianBlur(2))
+    img = Image.blend(img, Image.merge("RGB", (texture,) * 3), 0.25)
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        x0, y0 = (i * 83) % width, (i * 131) % height
+        draw.rectangle([x0, y0, x0 + width // 5, y0 + height // 9],
+                       outline=(255, 255, 255), width=6)
+    img.save(path, quality=95)
+    return path
+
+
+def ssim(ffmpeg: str, a: str, b: str) -> float | None:
+    """Mean SSIM (All) between two videos via ffmpeg's ssim filter."""
+    result = subprocess.run(
+        [ffmpeg, "-i", a, "-i", b, "-lavfi", "ssim", "-f", "null", "-"],
+        capture_output=True, text=True, timeout=300,
+    )
+    m = re.search(r"All:([0-9.]+)", result.stderr or "")
+    return float(m.group(1)) if m else None
+
+
+def filter_seconds(ffmpeg: str, image: str, width: int, height: int,
+                   duration: int, engine: str) -> float:
+    """Wall time of the motion alone (plate build included), no encode."""
+    start = time.perf_counter()
+    if engine == "plate":
+        plate = video.plates.composite(image, width, height)
+        for _ in video.framepipe.ken_burns(plate, (width, height), duration * video.FPS,
+                                           video.FPS):
+            pass
+        return time.perf_counter() - start
+    source, engine, is_temp = video._motion_input(image, width, height, engine)
+    vf = video._ken_burns_filter(width, height, duration * video.FPS, engine=engine)
+    try:
+        subprocess.run(
+            [ffmpeg, "-y", "-loop", "1", "-i", source, "-vf", vf + ",format=yuv420p",
+             "-t", str(duration), "-f", "null", "-"],
+            capture_output=True, text=True, timeout=300, check=True,
+        )
+    finally:
+        if is_temp:
+            os.remove(source)
+    return time.perf_counter() - start
+
+
+def run(image: str, size: str, duration: int, repeat: int) -> list[dict]:
+    width, height = _SIZES[size]
+    frames = duration * video.FPS
+    ffmpeg = video._get_ffmpeg()
+    workdir = tempfile.mkdtemp(prefix="kb_bench_")
+    rows: list[dict] = []
+    outputs: dict[str, str] = {}
+    prev = os.environ.get("KEN_BURNS_ENGINE")
+
+    try:
+        for engine in video.KEN_BURNS_ENGINES:
+            os.environ["KEN_BURNS_ENGINE"] = engine
+            out = os.path.join(workdir, f"{engine}.mp4")
+            best_filter = best_render = float("inf")
+            for _ in range(repeat):
+                best_filter = min(best_filter, filter_seconds(
+                    ffmpeg, image, width, height, duration, engine))
+                start = time.perf_counter()
+                video.image_to_video(image, out, width, height, duration,
+                                     add_audio=False, cache=False)
+                best_render = min(best_render, time.perf_counter() - start)
+            outputs[engine] = out
+            rows.append({"engine": engine, "filter_fps": frames / best_filter,
+                         "seconds": best_render, "fps": frames / best_render,
+                         "bytes": os.path.getsize(out)})
+    finally:
+        if prev is None:
+            os.environ.pop("KEN_BURNS_ENGINE", None)
+        else:
+            os.environ["KEN_BURNS_ENGINE"] = prev
+
+    reference = outputs["zoompan"]
+    for row in rows:
+        row["ssim"] = ssim(ffmpeg, outputs[row["engine"]], reference)
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ken Burns engine benchmark")
+    parser.add_argument("--image", help="photo to render (default: synthetic)")
+    parser.add_argument("--size", choices=sorted(_SIZES), default="ig")
+    parser.add_argument("--duration", type=int, default=video.IG_DURATION)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per engine (best is kept)")
+    args = parser.parse_args()
+
+    image = args.image or synthetic_photo(
+        os.path.join(tempfile.gettempdir(), "kb_bench_photo.jpg"))
+    rows = run(image, args.size, args.duration, args.repeat)
+
+    width, height = _SIZES[args.size]
+    print(f"Ken Burns @ {width}x{height}, {args.duration}s "
+          f"({args.duration * video.FPS} frames), best of {args.repeat}")
+    print(f"{'engine':<10} {'filter fps':>11} {'render s':>9} {'render fps':>11} "
+          f"{'bytes':>10} {'SSIM vs zoompan':>16}")
+    for r in rows:
+        sim = f"{r['ssim']:.4f}" if r["ssim"] is not None else "n/a"
+        print(f"{r['engine']:<10} {r['filter_fps']:>11.1f} {r['seconds']:>9.2f} "
+              f"{r['fps']:>11.1f} {r['bytes']:>10} {sim:>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Render pipeline benchmark suite with a golden corpus and a JSON history.
+
+Times the public render entry points on a fixed corpus — three synthetic
+photos (portrait, landscape, square) plus the first checked-in pending
+images — and records, per case:
+  - wall: wall-clock seconds
+  - cpu: user + system seconds, including ffmpeg child processes
+  - rss_mb: peak resident set size (this process or any ffmpeg child)
+  - bytes: total size of the outputs
+
+Each case runs in a fresh interpreter so peak RSS is per case, with the
+persona caches (plates, text frames, render manifest) redirected to an
+empty scratch dir and RENDER_CACHE=0 — i.e. cold caches, like the first
+render of a new post. The audio bed library is pre-built once (CI restores
+it from actions/cache), so the audio cases time the cut, not the synth.
+
+Every run is appended to benchmarks/history.json. With a stored baseline
+(--save-baseline), cases whose wall/cpu time or peak RSS grew by more
+than --threshold are flagged and the exit status is 1.
+
+  cd instagram_influencer
+  python -m benchmarks                       # full suite
+  python -m benchmarks --quick               # one synthetic image
+  python -m benchmarks --cases text_frames ambient --repeat 3
+  python -m benchmarks --save-baseline       # run + store as the baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+PACKAGE_DIR = BENCH_DIR.parent
+HISTORY_FILE = BENCH_DIR / "history.json"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+
+# Metrics compared against the baseline (bytes is reported, not flagged)
+_FLAGGED = ("wall", "cpu", "rss_mb")
+
+
+def _scratch_root() -> Path:
+    """Benchmark scratch space — outside the temp dir so plates get cached like pending/."""
+    cache_root = os.getenv("XDG_CACHE_HOME", "").strip() or str(Path.home() / ".cache")
+    return Path(cache_root) / "instagram_influencer" / "bench"
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def build_corpus(pending: int, quick: bool) -> list[str]:
+    """Synthetic photos (deterministic) + the first `pending` checked-in images."""
+    from benchmarks.kenburns import synthetic_photo
+    from persona import DATA_DIR
+
+    corpus_dir = _scratch_root() / "corpus"
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    shapes = [("portrait", 1024, 1536), ("landscape", 1536, 1024), ("square", 1200, 1200)]
+    if quick:
+        shapes = shapes[:1]
+    images = []
+    for name, w, h in shapes:
+        path = corpus_dir / f"synthetic_{name}.jpg"
+        if not path.exists():
+            synthetic_photo(str(path), w, h)
+        images.append(str(path))
+    if not quick:
+        images += sorted(str(p) for p in DATA_DIR.glob("*/generated_images/pending/*.jpg"))[:pending]
+    return images
+
+
+# ---------------------------------------------------------------------------
+# Cases — each takes (corpus, out_dir) and returns the output paths
+# ---------------------------------------------------------------------------
+
+_TEXT = ["POV: the outfit that changed everything", "Wait for the last one", "Save this for later"]
+
+
+def _case_image_to_video(images: list[str], out: Path) -> list[str]:
+    import video
+    return [video.image_to_video(img, str(out / f"ig_{i}.mp4"), add_audio=False, text_lines=_TEXT)
+            for i, img in enumerate(images)]
+
+
+def _case_youtube_short(images: list[str], out: Path) -> list[str]:
+    import video
+    return [video.image_to_youtube_short(img, str(out / f"yt_{i}.mp4"), text_lines=_TEXT)
+            for i, img in enumerate(images)]
+
+
+def _case_montage(images: list[str], out: Path) -> list[str]:
+    import video
+    slides = images if len(images) >= 2 else images * 3
+    return [video.images_to_montage(slides, str(out / "montage.mp4"), video.YT_WIDTH,
+                                    video.YT_HEIGHT, video.YT_MONTAGE_PER_IMAGE,
+                                    add_audio=True, text_lines=_TEXT)]
+
+
+def _case_hook_reel(images: list[str], out: Path) -> list[str]:
+    import video
+    return [video.create_hook_photo_reel(images[:3], str(out / "hook.mp4"),
+                                         width=video.IG_WIDTH, height=video.YT_HEIGHT,
+                                         text_lines=_TEXT, add_audio=False)]
+
+
+def _case_text_frames(images: list[str], out: Path) -> list[str]:
+    import video
+    outputs = []
+    for frame_type, line in zip(("hook", "bridge", "cta"), _TEXT):
+        path = video._create_text_frame(line, video.YT_WIDTH, video.YT_HEIGHT, frame_type=frame_type)
+        outputs.append(shutil.move(path, out / f"text_{frame_type}.jpg"))
+    return [str(p) for p in outputs]
+
+
+def _case_ambient(images: list[str], out: Path) -> list[str]:
+    import audio
+    path = audio._generate_ambient(25)
+    return [str(shutil.move(path, out / "ambient.wav"))] if path else []
+
+
+def _case_story_images(images: list[str], out: Path) -> list[str]:
+    import stories
+    return [str(shutil.move(stories._create_story_image(img, _TEXT[0]), out / f"story_{i}.jpg"))
+            for i, img in enumerate(images)]
+
+
+def _case_ingest(images: list[str], out: Path) -> list[str]:
+    import ingest
+    pending = ingest._pending_dir()
+    pending.mkdir(parents=True, exist_ok=True)
+    copies = [str(shutil.copy(img, pending / f"bench_{i}{Path(img).suffix}"))
+              for i, img in enumerate(images)]
+    ingest.ingest(copies)
+    return copies
+
+
+CASES: dict[str, Callable[[list[str], Path], list[str]]] = {
+    "image_to_video": _case_image_to_video,
+    "image_to_youtube_short": _case_youtube_short,
+    "images_to_montage": _case_montage,
+    "create_hook_photo_reel": _case_hook_reel,
+    "text_frames": _case_text_frames,
+    "ambient": _case_ambient,
+    "story_images": _case_story_images,
+    "ingest_images": _case_ingest,
+}
+
+
+# ---------------------------------------------------------------------------
+# Child process: run one case under a clean scratch persona
+# ---------------------------------------------------------------------------
+
+def _run_case_child(name: str, images: list[str]) -> dict:
+    import persona
+
+    scratch = _scratch_root() / "run"
+    shutil.rmtree(scratch, ignore_errors=True)
+    out = scratch / "out"
+    out.mkdir(parents=True)
+    persona.DATA_DIR = scratch / "data"  # plates, text frames, manifest → scratch
+
+    wall_start = time.perf_counter()
+    outputs = CASES[name](images, out)
+    wall = time.perf_counter() - wall_start
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    result = {
+        "wall": wall,
+        "cpu": own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+        "rss_mb": max(own.ru_maxrss, children.ru_maxrss) / 1024,  # Linux: KiB
+        "bytes": sum(os.path.getsize(p) for p in outputs if os.path.exists(p)),
+    }
+    shutil.rmtree(scratch, ignore_errors=True)
+    return result
+
+
+def run_case(name: str, images: list[str], repeat: int) -> dict:
+    """Best-of-`repeat` metrics for one case, each run in a fresh interpreter."""
+    env = {**os.environ, "RENDER_CACHE": "0", "PYTHONPATH": str(PACKAGE_DIR),
+           "AUDIO_BED_DIR": str(_scratch_root() / "audio_beds")}
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--child", name, "--images", *images],
+            cwd=PACKAGE_DIR, env=env, capture_output=True, text=True, timeout=1800,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{name} failed: {(proc.stderr or '')[-500:]}")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {metric: min(r[metric] for r in runs) for metric in runs[0]}
+
+
+# ---------------------------------------------------------------------------
+# History + baseline
+# ---------------------------------------------------------------------------
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PACKAGE_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _load_json(path: Path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return default
+
+
+def _save_json(path: Path, data) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def regressions(results: dict[str, dict], baseline: dict[str, dict],
+                threshold: float) -> list[str]:
+    """Human-readable list of metrics that grew past baseline * (1 + threshold)."""
+    flagged = []
+    for case, metrics in results.items():
+        base = baseline.get(case)
+        if not base:
+            continue
+        for metric in _FLAGGED:
+            old, new = base.get(metric), metrics.get(metric)
+            if old and new and new > old * (1 + threshold):
+                flagged.append(f"{case}.{metric}: {old:.2f} → {new:.2f} (+{(new / old - 1) * 100:.0f}%)")
+    return flagged
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render pipeline benchmark suite")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--pending", type=int, default=2, help="checked-in pending images to add")
+    parser.add_argument("--quick", action="store_true", help="one synthetic image only")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case (best is kept)")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="regression threshold as a fraction (default 0.20)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--no-history", action="store_true", help="don't append to history.json")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--images", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_case_child(args.child, args.images)))
+        return 0
+
+    images = build_corpus(args.pending, args.quick)
+    # Warm the bed library once, outside the timed runs
+    subprocess.run([sys.executable, "-c", "import audio; audio.build_bed_library()"],
+                   cwd=PACKAGE_DIR, capture_output=True, timeout=1800,
+                   env={**os.environ, "AUDIO_BED_DIR": str(_scratch_root() / "audio_beds")})
+
+    print(f"Corpus: {len(images)} image(s); best of {args.repeat}; cold caches")
+    print(f"{'case':<24} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'KiB out':>9}")
+    results: dict[str, dict] = {}
+    for name in args.cases:
+        results[name] = r = run_case(name, images, args.repeat)
+        print(f"{name:<24} {r['wall']:>8.2f} {r['cpu']:>8.2f} {r['rss_mb']:>8.0f} "
+              f"{r['bytes'] / 1024:>9.0f}", flush=True)
+
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "corpus": [Path(p).name for p in images],
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if not args.no_history:
+        history = _load_json(HISTORY_FILE, [])
+        history.append(entry)
+        _save_json(HISTORY_FILE, history)
+
+    status = 0
+    baseline = _load_json(BASELINE_FILE, {})
+    if baseline and not args.save_baseline:
+        if baseline.get("corpus") != entry["corpus"]:
+            print("\nNote: baseline was recorded on a different corpus")
+        flagged = regressions(results, baseline.get("results", {}), args.threshold)
+        if flagged:
+            print(f"\nRegressions vs baseline {baseline.get('commit', '?')} "
+                  f"(>{args.threshold:.0%}):")
+            for line in flagged:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"\nNo regressions vs baseline {baseline.get('commit', '?')}")
+    if args.save_baseline:
+        _save_json(BASELINE_FILE, entry)
+        print(f"\nSaved baseline ({entry['commit']})")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Watermark crop benchmark: lossless jpegtran crop vs PIL decode + re-encode.
+
+Crops the bottom WATERMARK_CROP_FRACTION off the same JPEG both ways and
+reports, per image:
+  - ms: wall time of the crop (best of --repeat)
+  - bytes: size of the cropped file
+  - PSNR of the kept rows against the source's own decode (inf = lossless)
+
+  cd instagram_influencer
+  python -m benchmarks.watermark                    # synthetic Gemini-sized photo
+  python -m benchmarks.watermark --image some.jpg --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+import ingest
+from benchmarks.kenburns import synthetic_photo
+
+
+def _pil_crop(path: str, out: str, width: int, height: int) -> bool:
+    with Image.open(path) as src:
+        src.convert("RGB").crop((0, 0, width, height)).save(out, "JPEG", quality=95)
+    return True
+
+
+_METHODS = {"jpegtran": ingest.lossless_crop, "pil": _pil_crop}
+
+
+def psnr(reference: np.ndarray, path: str) -> float:
+    with Image.open(path) as img:
+        out = np.asarray(img.convert("RGB"), dtype=np.float64)
+    ref = reference[: out.shape[0], : out.shape[1]].astype(np.float64)
+    mse = float(np.mean((ref - out) ** 2))
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def run(image: str, repeat: int) -> list[dict]:
+    with Image.open(image) as src:
+        width, height = src.size
+        mcu = ingest._mcu_height(src)
+        reference = np.asarray(src.convert("RGB"))
+    keep = (height - int(height * ingest.WATERMARK_CROP_FRACTION)) // mcu * mcu
+    workdir = tempfile.mkdtemp(prefix="wm_bench_")
+    rows: list[dict] = []
+    for name, crop in _METHODS.items():
+        out = os.path.join(workdir, f"{name}.jpg")
+        best = math.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ok = crop(image, out, width, keep)
+            best = min(best, time.perf_counter() - start)
+            if not ok:
+                break
+        if not ok:
+            rows.append({"method": name, "ms": None, "bytes": None, "psnr": None})
+            continue
+        rows.append({"method": name, "ms": best * 1000, "bytes": os.path.getsize(out),
+                     "psnr": psnr(reference, out)})
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Watermark crop benchmark")
+    parser.add_argument("--image", help="JPEG to crop (default: synthetic)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per method (best is kept)")
+    args = parser.parse_args()
+
+    image = args.image or synthetic_photo(
+        os.path.join(tempfile.gettempdir(), "wm_bench_photo.jpg"))
+    rows = run(image, args.repeat)
+
+    with Image.open(image) as src:
+        print(f"Watermark crop of {os.path.basename(image)} ({src.width}x{src.height}), "
+              f"best of {args.repeat}")
+    print(f"{'method':<10} {'ms/image':>9} {'bytes':>10} {'PSNR dB':>8}")
+    for r in rows:
+        if r["ms"] is None:
+            print(f"{r['method']:<10} {'n/a (jpegtran not installed)':>29}")
+            continue
+        print(f"{r['method']:<10} {r['ms']:>9.1f} {r['bytes']:>10} {r['psnr']:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Content build for every persona in one process.
+
+The orchestrator runs one persona per process, so a build across accounts
+paid interpreter startup, the heavy imports and the ffmpeg probe once per
+persona just to generate drafts and render videos. This entry point does
+the content steps for all main (non-satellite) personas in turn:
+
+  1. generate_content        (only when the publishable queue is short)
+  2. fill_image_urls         (link + ingest user-placed images)
+  3. convert_posts_to_video  (IG Reels + YT Shorts)
+
+Each persona runs inside persona.use_persona(), which scopes the data dirs
+and queue path. The render pool, ffmpeg capability probe and in-process
+caches (fonts, text frames, audio beds) are shared across personas.
+Nothing is published and no Instagram client is created.
+
+Settings (GEMINI_API_KEY, YOUTUBE_ENABLED, ...) come from the one .env /
+environment of this process; persona JSON defaults apply as usual.
+
+  cd instagram_influencer
+  python build.py                          # every main persona
+  python build.py --personas maya aryan --no-generate
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import ffmpeg_caps
+from config import load_config, setup_logging
+from generator import generate_content
+from image import fill_image_urls
+from persona import list_personas, persona_data_dir, use_persona
+from post_queue import publishable_count, read_queue, status_counts, write_queue
+from video import _video_workers, convert_posts_to_video
+
+log = logging.getLogger(__name__)
+
+
+def build_persona(name: str, pool: ThreadPoolExecutor, generate: bool = True) -> dict[str, int]:
+    """Run the content steps for one persona; returns per-step counts."""
+    stats = {"generated": 0, "images": 0, "videos": 0}
+    with use_persona(name):
+        cfg = load_config()
+        queue_file = str(persona_data_dir() / "content_queue.json")
+        posts = read_queue(queue_file)
+        log.info("[%s] Queue: %s", name, status_counts(posts))
+
+        if generate and publishable_count(posts) < cfg.min_ready_queue:
+            before = len(posts)
+            if generate_content(queue_file, cfg):
+                posts = read_queue(queue_file)
+                stats["generated"] = len(posts) - before
+
+        stats["images"] = fill_image_urls(posts, cfg)
+        if stats["images"]:
+            write_queue(queue_file, posts)
+
+        stats["videos"] = convert_posts_to_video(posts, youtube=cfg.youtube_enabled, pool=pool)
+        if stats["videos"]:
+            write_queue(queue_file, posts)
+    return stats
+
+
+def main() -> int:
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(override=True)
+    except ModuleNotFoundError:
+        pass
+
+    parser = argparse.ArgumentParser(description="Generate + render content for every persona")
+    parser.add_argument("--personas", nargs="+", default=None,
+                        help="persona ids (default: all non-satellite personas)")
+    parser.add_argument("--no-generate", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    setup_logging(args.verbose)
+
+    names = args.personas or list_personas()
+    ffmpeg_caps.probe()  # once for every persona's renders
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=_video_workers(), thread_name_prefix="render") as pool:
+        for name in names:
+            try:
+                stats = build_persona(name, pool, generate=not args.no_generate)
+                log.info("[%s] Build: %s", name, stats)
+            except Exception as exc:
+                failed += 1
+                log.exception("[%s] Build failed: %s", name, exc)
+
+    log.info("Built %d/%d persona(s)", len(names) - failed, len(names))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
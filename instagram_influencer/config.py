@@ -28,16 +28,22 @@ def _persona_reference_dir():
 
 # Lazy properties — modules that import these at module level still work
 class _LazyPath:
-    """Defers path resolution until first access (avoids import-time persona load)."""
+    """Defers path resolution until first access (avoids import-time persona load).
+
+    Resolved paths are cached per persona id, so the path always follows
+    the current persona (see persona.use_persona).
+    """
     def __init__(self, resolver):
         self._resolver = resolver
-        self._path = None
+        self._paths: dict[str, Path] = {}
     def reset(self):
-        """Clear cached path so next access re-resolves (e.g. after persona change)."""
-        self._path = None
+        """Clear cached paths so the next access re-resolves."""
+        self._paths.clear()
     def __fspath__(self):
-        if self._path is None: self._path = self._resolver()
-        return str(self._path)
+        from persona import get_persona
+        persona_id = get_persona()["id"]
+        if persona_id not in self._paths: self._paths[persona_id] = self._resolver()
+        return str(self._paths[persona_id])
     def __str__(self):
         return self.__fspath__()
     def __truediv__(self, other):
@@ -105,6 +111,7 @@ class Config:
     # Content queue
     draft_count: int
     min_ready_queue: int
+    archive_after_days: int  # settled posts older than this leave the hot queue (0 = never)
 
     # Image generation — Replicate Kontext (primary) + BFL Kontext + HF Schnell (fallback)
     replicate_api_token: str
@@ -180,6 +187,7 @@ def load_config() -> Config:
         gemini_model=_str(os.getenv("GEMINI_MODEL"), "gemini-2.5-flash"),
         draft_count=_int(os.getenv("DRAFT_COUNT"), 3, minimum=1),
         min_ready_queue=_int(os.getenv("MIN_READY_QUEUE"), 5, minimum=1),
+        archive_after_days=_int(os.getenv("QUEUE_ARCHIVE_DAYS"), 30, minimum=0),
         replicate_api_token=_str(os.getenv("REPLICATE_API_TOKEN")),
         bfl_api_key=_str(os.getenv("BFL_API_KEY")),
         hf_token=_str(os.getenv("HF_TOKEN")),
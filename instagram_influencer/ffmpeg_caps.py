@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""ffmpeg binary resolution and a one-time capability probe.
+
+Every renderer used to resolve the ffmpeg binary on each call (an
+imageio_ffmpeg import) and learn about missing filters by failing a full
+encode — e.g. a build without libfreetype has no drawtext, and the graph
+was only dropped after ffmpeg rejected it. Here the binary is resolved once
+per process and probed once per binary:
+
+  ffmpeg -version / -filters / -encoders
+
+The result is cached on disk, keyed by the binary's path, size and mtime,
+so a new ffmpeg (or a different imageio_ffmpeg wheel) is re-probed
+automatically:
+
+  $XDG_CACHE_HOME/instagram_influencer/ffmpeg_caps.json
+    ← {path: {"probe", "size", "mtime_ns", "version", "filters": [...], "encoders": [...]}}
+
+If the probe cannot run, or a listing fails or comes back empty, nothing
+is cached and has_filter()/has_encoder() answer True so the renderers keep
+their existing try-and-fall-back behaviour.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Filters and encoders the renderers branch on (the probe records them all)
+RENDER_FILTERS = ("drawtext", "xfade", "zoompan", "loudnorm", "ebur128")
+RENDER_ENCODERS = ("libx264", "aac")
+
+_PROBE_VERSION = 1  # bump when the probe output format changes
+_lock = threading.Lock()
+_caps: dict | None = None
+
+
+@lru_cache(maxsize=1)
+def ffmpeg_path() -> str:
+    """Path to the ffmpeg binary (bundled with imageio_ffmpeg or system), resolved once."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def _cache_file() -> Path:
+    cache_root = os.getenv("XDG_CACHE_HOME", "").strip() or str(Path.home() / ".cache")
+    return Path(cache_root) / "instagram_influencer" / "ffmpeg_caps.json"
+
+
+def _load_cache() -> dict[str, dict]:
+    try:
+        with open(_cache_file(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_cache(data: dict[str, dict]) -> None:
+    path = _cache_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as exc:
+        log.debug("Could not write ffmpeg capability cache %s: %s", path, exc)
+
+
+# Table rows: " TSC zoompan  V->V  ..." (-filters), " V....D libx264  ..." (-encoders).
+# Legend lines ("  T.. = Timeline support") don't match either pattern.
+_FILTER_ROW = re.compile(r"^\s[T.][S.][C.]\s+(\S+)\s+\S*->\S*")
+_ENCODER_ROW = re.compile(r"^\s[VAS][F.][S.][X.][B.][D.]\s+(\S+)\s")
+
+
+def _listing(ffmpeg: str, flag: str, row: re.Pattern) -> list[str] | None:
+    """Names from the `ffmpeg -filters` / `-encoders` table.
+
+    None if ffmpeg failed or printed no table rows — an empty list would
+    read as "nothing supported" rather than "unknown".
+    """
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", flag], capture_output=True, text=True, timeout=30,
+    )
+    if result.returncode != 0:
+        log.debug("ffmpeg %s exited %d: %s", flag, result.returncode, (result.stderr or "")[-200:])
+        return None
+    names = sorted({
+        m.group(1) for line in (result.stdout or "").splitlines()
+        if (m := row.match(line)) and m.group(1) != "="
+    })
+    return names or None
+
+
+def _run_probe(ffmpeg: str) -> dict:
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-version"], capture_output=True, text=True, timeout=30,
+    )
+    first = (result.stdout or "").splitlines()[:1]
+    version = first[0].split()[2] if first and len(first[0].split()) > 2 else ""
+    return {
+        "version": version,
+        "filters": _listing(ffmpeg, "-filters", _FILTER_ROW),
+        "encoders": _listing(ffmpeg, "-encoders", _ENCODER_ROW),
+    }
+
+
+def probe() -> dict:
+    """Capabilities of ffmpeg_path(): {"path", "version", "filters", "encoders"}.
+
+    Served from memory, then the on-disk cache, then a fresh probe.
+    "filters"/"encoders" are None when the binary could not be probed.
+    """
+    global _caps
+    if _caps is not None:
+        return _caps
+    with _lock:
+        if _caps is not None:
+            return _caps
+        ffmpeg = ffmpeg_path()
+        resolved = shutil.which(ffmpeg) or ffmpeg
+        caps: dict = {"path": ffmpeg, "version": "", "filters": None, "encoders": None}
+        try:
+            st = os.stat(resolved)
+        except OSError as exc:
+            log.warning("ffmpeg not found at %s: %s", ffmpeg, exc)
+            _caps = caps
+            return caps
+
+        key = os.path.abspath(resolved)
+        cache = _load_cache()
+        entry = cache.get(key)
+        if (entry and entry.get("probe") == _PROBE_VERSION
+                and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns
+                and entry.get("filters") and entry.get("encoders")):
+            caps.update(version=entry["version"], filters=entry["filters"],
+                        encoders=entry["encoders"])
+        else:
+            try:
+                found = _run_probe(ffmpeg)
+            except (OSError, subprocess.SubprocessError) as exc:
+                log.warning("ffmpeg capability probe failed: %s", exc)
+                _caps = caps
+                return caps
+            caps.update(found)
+            if found["filters"] is None or found["encoders"] is None:
+                # Not cached: a transient failure must not stick to this binary
+                log.warning("ffmpeg capability probe incomplete for %s — assuming full support",
+                            ffmpeg)
+                _caps = caps
+                return caps
+            cache[key] = {"probe": _PROBE_VERSION, "size": st.st_size,
+                          "mtime_ns": st.st_mtime_ns, **found}
+            _save_cache(cache)
+            missing = [f for f in RENDER_FILTERS if f not in found["filters"]]
+            missing += [e for e in RENDER_ENCODERS if e not in found["encoders"]]
+            log.info("ffmpeg %s at %s%s", found["version"] or "(unknown version)", ffmpeg,
+                     f" — missing: {', '.join(missing)}" if missing else "")
+        _caps = caps
+        return caps
+
+
+def has_filter(name: str) -> bool:
+    """Whether ffmpeg has filter `name` (True if the probe could not run)."""
+    filters = probe()["filters"]
+    return filters is None or name in filters
+
+
+def has_encoder(name: str) -> bool:
+    """Whether ffmpeg has encoder `name` (True if the probe could not run)."""
+    encoders = probe()["encoders"]
+    return encoders is None or name in encoders
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Compose video frames in Python and stream them to a single ffmpeg encoder.
+
+The filter-graph renderers hand ffmpeg temp JPEGs (text frames, blur
+plates) that it decodes, rescales and animates with zoompan. Here the
+frames are composed in-process from the PIL images we already have in
+memory and written as raw yuv420p to one long-lived encoder:
+
+  ffmpeg -f rawvideo -pix_fmt yuv420p -s WxH -r FPS -i - [audio] <x264> out.mp4
+
+Each source image is converted to Y/Cb/Cr planes once; per frame only
+the luma plane is resampled at full size and chroma at quarter area, which
+is roughly half the work (and half the pipe bytes) of moving RGB frames,
+and ffmpeg has no colour conversion left to do.
+
+No temp files, no JPEG decode, and the zoom/pan is applied per frame with
+sub-pixel crop boxes, so the motion curves are exact (zoompan rounds its
+crop window to whole pixels, which shows up as jitter on slow zooms).
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+import tempfile
+import time
+from typing import Iterator
+
+import numpy as np
+from PIL import Image
+
+log = logging.getLogger(__name__)
+
+
+# A frame is three 8-bit planes — Y at full size, Cb/Cr at half size —
+# in limited (TV) range, i.e. exactly what yuv420p expects on the wire.
+Planes = tuple[Image.Image, Image.Image, Image.Image]
+
+
+class FrameEncoder:
+    """One ffmpeg process fed raw yuv420p frames over stdin.
+
+    Use as a context manager; leaving the block normally finishes the
+    encode and raises RuntimeError if ffmpeg failed. `deadline` is a
+    time.monotonic() value — the encode is killed once it passes.
+    """
+
+    def __init__(
+        self,
+        ffmpeg: str,
+        output_path: str,
+        width: int,
+        height: int,
+        fps: int,
+        *,
+        input_args: list[str] | None = None,
+        output_args: list[str] | None = None,
+        deadline: float | None = None,
+    ):
+        if width % 2 or height % 2:
+            raise ValueError(f"yuv420p needs even dimensions, got {width}x{height}")
+        self.size = (width, height)
+        self.deadline = deadline
+        self.frames = 0
+        self._stderr = tempfile.TemporaryFile()
+        cmd = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "yuv420p",
+            "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            *(input_args or []),
+            *(output_args or []),
+            output_path,
+        ]
+        self._proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr,
+        )
+
+    def __enter__(self) -> FrameEncoder:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._kill()
+            return
+        self.close()
+
+    def _check_deadline(self) -> None:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self._kill()
+            raise RuntimeError("frame pipe encode exceeded the render deadline")
+
+    def _error(self, what: str) -> RuntimeError:
+        self._stderr.seek(0)
+        tail = self._stderr.read().decode(errors="replace")[-500:]
+        return RuntimeError(f"{what}: {tail.strip() or 'no output'}")
+
+    def write(self, frame: Planes) -> None:
+        """Send one frame (planes from to_planes() / the motion generators)."""
+        self._check_deadline()
+        if frame[0].size != self.size:
+            raise ValueError(f"frame is {frame[0].size}, encoder expects {self.size}")
+        try:
+            for plane in frame:
+                self._proc.stdin.write(plane.tobytes())
+        except (BrokenPipeError, OSError):
+            self._proc.wait()
+            raise self._error("ffmpeg exited while receiving frames")
+        self.frames += 1
+
+    def write_all(self, frames: Iterator[Planes]) -> None:
+        for frame in frames:
+            self.write(frame)
+
+    def close(self) -> None:
+        """Finish the encode (flush stdin, wait for ffmpeg)."""
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        timeout = None
+        if self.deadline is not None:
+            timeout = max(1.0, self.deadline - time.monotonic())
+        try:
+            returncode = self._proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill()
+            raise RuntimeError("frame pipe encode exceeded the render deadline")
+        if returncode != 0:
+            raise self._error(f"ffmpeg failed (exit {returncode})")
+        self._stderr.close()
+
+    def _kill(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        self._stderr.close()
+
+
+def to_planes(image: Image.Image) -> Planes:
+    """RGB image → limited-range BT.601 Y/Cb/Cr planes, chroma halved.
+
+    Matches ffmpeg's default rgb24 → yuv420p conversion closely enough that
+    the encoder needs no colour conversion of its own. Done once per
+    source image; per-frame motion then resamples the planes.
+    """
+    y, cb, cr = image.convert("RGB").convert("YCbCr").split()  # full range (JPEG)
+    w, h = image.size
+    cb = cb.resize((w // 2, h // 2), Image.BILINEAR)
+    cr = cr.resize((w // 2, h // 2), Image.BILINEAR)
+
+    def limited(plane: Image.Image, lo: int, span: int) -> Image.Image:
+        lut = [lo + round(v * span / 255) for v in range(256)]
+        return plane.point(lut)
+
+    def limited_chroma(plane: Image.Image) -> Image.Image:
+        lut = [128 + round((v - 128) * 224 / 255) for v in range(256)]
+        return plane.point(lut)
+
+    return limited(y, 16, 219), limited_chroma(cb), limited_chroma(cr)
+
+
+# ---------------------------------------------------------------------------
+# Motion — per-frame equivalents of video._ken_burns_filter/_text_zoom_filter
+# ---------------------------------------------------------------------------
+
+def snap_ken_burns_zoom(n: int, total_frames: int, fps: int) -> float:
+    """Snap zoom 1.0→1.3 (0.5s), ease back to 1.1 (0.5s), then 1.1→1.2."""
+    half = fps // 2
+    if n < half:
+        return 1 + 0.6 * n / half
+    if n < fps:
+        return 1.3 - 0.2 * (n - half) / half
+    return 1.1 + 0.1 * (n - fps) / max(1, total_frames - fps)
+
+
+def _fade_in(frame: Planes, n: int, fade_frames: int) -> Planes:
+    """ffmpeg fade=in:0:fade_frames — frame n at n/fade_frames toward black."""
+    if n >= fade_frames:
+        return frame
+    out = []
+    for plane, black in zip(frame, (16, 128, 128)):
+        values = np.asarray(plane, dtype=np.int16)
+        faded = black + (values - black) * n // fade_frames
+        out.append(Image.fromarray(faded.astype(np.uint8), "L"))
+    return out[0], out[1], out[2]
+
+
+def _zoomed(source: Planes, size: tuple[int, int], zoom: float,
+            x_offset: float = 0.0) -> Planes:
+    """Crop a centered 1/zoom window (shifted by x_offset px) and scale to size."""
+    sw, sh = source[0].size
+    cw, ch = sw / zoom, sh / zoom
+    x0 = min(max(0.0, (sw - cw) / 2 + x_offset), sw - cw)
+    y0 = (sh - ch) / 2
+    luma = source[0].resize(size, Image.BILINEAR, box=(x0, y0, x0 + cw, y0 + ch))
+    half = (size[0] // 2, size[1] // 2)
+    box = (x0 / 2, y0 / 2, (x0 + cw) / 2, (y0 + ch) / 2)
+    return (
+        luma,
+        source[1].resize(half, Image.BILINEAR, box=box),
+        source[2].resize(half, Image.BILINEAR, box=box),
+    )
+
+
+def ken_burns(plate: Image.Image, size: tuple[int, int], total_frames: int, fps: int,
+              drift: float = 5.0, fade_frames: int = 5) -> Iterator[Planes]:
+    """Snap zoom + Ken Burns over a composed plate, with a short fade-in."""
+    source = to_planes(plate)
+    for n in range(total_frames):
+        zoom = snap_ken_burns_zoom(n, total_frames, fps)
+        frame = _zoomed(source, size, zoom, drift * n / total_frames)
+        yield _fade_in(frame, n, fade_frames)
+
+
+def push_in(image: Image.Image, size: tuple[int, int], total_frames: int,
+            zoom_gain: float, fade_frames: int = 4) -> Iterator[Planes]:
+    """Linear push-in 1.0 → 1+zoom_gain (text frames), with a short fade-in."""
+    source = to_planes(image)
+    for n in range(total_frames):
+        frame = _zoomed(source, size, 1 + zoom_gain * n / total_frames)
+        yield _fade_in(frame, n, fade_frames)
@@ -88,13 +88,13 @@ def _load_templates():
     persona = get_persona()
     return persona.get("templates", [])
 
-TEMPLATES = None  # loaded lazily
+TEMPLATES: dict[str, list] = {}  # persona id → templates, loaded lazily
 
 def _get_templates():
-    global TEMPLATES
-    if TEMPLATES is None:
-        TEMPLATES = _load_templates()
-    return TEMPLATES
+    persona_id = get_persona()["id"]
+    if persona_id not in TEMPLATES:
+        TEMPLATES[persona_id] = _load_templates()
+    return TEMPLATES[persona_id]
 
 
 def _template_drafts(existing: list[dict[str, Any]], count: int) -> list[dict[str, Any]]:
@@ -102,7 +102,7 @@ def _template_drafts(existing: list[dict[str, Any]], count: int) -> list[dict[st
     drafts: list[dict[str, Any]] = []
     templates = _get_templates()
     for idx in range(count):
-        post_id = next_post_id(existing + drafts)
+        post_id = next_post_id(existing, offset=len(drafts) + 1)
         slot = now + timedelta(hours=4 * (idx + 1))
         drafts.append(_coerce_draft(templates[idx % len(templates)], post_id, slot))
     return drafts
@@ -339,7 +339,7 @@ def _gemini_generate(cfg: Config, existing: list[dict[str, Any]]) -> list[dict[s
     for idx, item in enumerate(parsed[:cfg.draft_count]):
         if not isinstance(item, dict):
             continue
-        post_id = next_post_id(existing + drafts)
+        post_id = next_post_id(existing, offset=len(drafts) + 1)
         slot = now + timedelta(hours=4 * (idx + 1))
         drafts.append(_coerce_draft(item, post_id, slot))
 
@@ -361,7 +361,7 @@ def _gemini_generate(cfg: Config, existing: list[dict[str, Any]]) -> list[dict[s
             alt_type = "reel" if src_type == "carousel" else "carousel"
 
             companion = dict(draft)  # shallow copy
-            companion_id = next_post_id(existing + drafts + companions)
+            companion_id = next_post_id(existing, offset=len(drafts) + len(companions) + 1)
             companion["id"] = companion_id
             companion["post_type"] = alt_type
             companion["is_reel"] = alt_type == "reel"
@@ -6,6 +6,8 @@ using the Gemini app. This module:
   1. Generates descriptive prompts for each post and saves them for the user.
   2. Scans the generated_images/pending/ directory for user-placed images.
   3. Links found images back to draft posts in the queue.
+  4. Runs linked images through the ingest stage (ingest.py) — new ones, and
+     any whose earlier ingest failed.
 
 Directory structure:
   data/{persona}/generated_images/
@@ -15,6 +17,7 @@ Directory structure:
         1.jpg                  ← carousel slide 1
         2.jpg                  ← carousel slide 2
         ...
+      .ingest.json             ← ingest index (processed images, see ingest.py)
     prompts/
       maya-042.txt             ← Gemini prompt for reference
     IMAGE_PROMPTS.md           ← master summary (easy to read at a glance)
@@ -27,18 +30,15 @@ import os
 from pathlib import Path
 from typing import Any
 
-from PIL import Image
-
+import ingest
+import pending_index
 from config import Config
 from persona import get_persona, persona_images_dir
+from post_queue import as_queue
+from post_record import PostType, as_post
 
 log = logging.getLogger(__name__)
 
-# Watermark removal: crop this fraction off the bottom of Gemini-generated images.
-# Gemini places a small "Made with Google AI" badge in the bottom-right.
-# 5% is enough to remove it without losing meaningful content.
-WATERMARK_CROP_FRACTION = 0.05
-
 
 def _pending_dir():
     return persona_images_dir() / "pending"
@@ -156,15 +156,19 @@ def _save_post_prompts(post: dict[str, Any]) -> None:
     log.debug("Saved prompt for %s → %s", post_id, prompt_file.name)
 
 
-def write_prompts_summary(posts: list[dict[str, Any]]) -> None:
+def write_prompts_summary(
+    posts: list[dict[str, Any]], index: pending_index.PendingIndex | None = None,
+) -> None:
     """Write IMAGE_PROMPTS.md — a readable summary of all posts needing images."""
+    if index is None:
+        index = pending_index.load()
     images_dir = persona_images_dir()
     images_dir.mkdir(parents=True, exist_ok=True)
 
     pending = [
         p for p in posts
         if str(p.get("status", "")).lower() in {"draft", "approved"}
-        and not _has_images(p)
+        and not _has_images(p, index)
     ]
 
     if not pending:
@@ -230,87 +234,26 @@ def write_prompts_summary(posts: list[dict[str, Any]]) -> None:
     log.info("Updated IMAGE_PROMPTS.md — %d posts need images", len(pending))
 
 
-# ---------------------------------------------------------------------------
-# Watermark removal (Gemini "Made with Google AI" badge)
-# ---------------------------------------------------------------------------
-
-def _remove_watermark(image_path: str) -> None:
-    """Crop the bottom ~5% of an image to remove Gemini's watermark.
-
-    Operates in-place — overwrites the original file.
-    Skips if the image has already been processed (tracked via a sidecar marker).
-    """
-    marker = Path(image_path).with_suffix(".nowm")
-    if marker.exists():
-        return  # already processed
-
-    try:
-        img = Image.open(image_path)
-        w, h = img.size
-        crop_px = int(h * WATERMARK_CROP_FRACTION)
-        if crop_px < 10:
-            return  # image too small to bother
-
-        cropped = img.crop((0, 0, w, h - crop_px))
-        # JPEG doesn't support RGBA — convert to RGB first to avoid
-        # truncating the file to 0 bytes on save failure.
-        if cropped.mode in ("RGBA", "P", "LA"):
-            cropped = cropped.convert("RGB")
-        cropped.save(image_path, quality=95)
-        marker.touch()  # mark as processed so we don't re-crop on next run
-        log.info("Removed watermark from %s (cropped %dpx off bottom)", Path(image_path).name, crop_px)
-    except Exception as exc:
-        log.warning("Watermark removal failed for %s: %s", image_path, exc)
-
-
-def _remove_watermarks_batch(image_paths: list[str]) -> None:
-    """Remove watermarks from a list of images."""
-    for path in image_paths:
-        _remove_watermark(path)
-
-
 # ---------------------------------------------------------------------------
 # Pending image discovery
 # ---------------------------------------------------------------------------
 
-def _has_images(post: dict[str, Any]) -> bool:
+def _has_images(post: dict[str, Any], index: pending_index.PendingIndex) -> bool:
     """Check if a post already has valid images linked."""
-    post_type = str(post.get("post_type", "reel")).lower()
-    reel_format = str(post.get("reel_format", "")).strip().lower()
+    record = as_post(post)
     # Hook-photo reels need multiple images (like carousels)
-    if reel_format == "hook_photo" or post_type == "carousel":
-        images = post.get("carousel_images", [])
-        return bool(images) and all(os.path.exists(p) for p in images)
-    image = str(post.get("image_url", "")).strip()
-    return bool(image) and os.path.exists(image)
+    if record.reel_format == "hook_photo" or record.post_type == PostType.CAROUSEL:
+        images = record.carousel_images
+        return bool(images) and all(index.exists(p) for p in images)
+    return bool(record.image_url) and index.exists(record.image_url)
 
 
-def _find_pending_single(post_id: str) -> str | None:
-    """Look for user-placed image at pending/{post_id}.(jpg|png|webp)."""
-    pending_dir = _pending_dir()
-    if not pending_dir.is_dir():
-        return None
-    for ext in (".jpg", ".jpeg", ".png", ".webp"):
-        path = pending_dir / f"{post_id}{ext}"
-        if path.exists() and path.stat().st_size > 10_000:
-            return str(path)
-    return None
-
-
-def _find_pending_carousel(post_id: str) -> list[str]:
-    """Look for carousel images in pending/{post_id}/ directory."""
-    carousel_dir = _pending_dir() / post_id
-    if not carousel_dir.is_dir():
-        return []
-    images = sorted(
-        [
-            str(f) for f in carousel_dir.iterdir()
-            if f.suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"}
-            and f.stat().st_size > 10_000
-        ],
-        key=lambda p: Path(p).stem,  # sort by 1, 2, 3, ...
-    )
-    return images
+def _linked_images(post: dict[str, Any]) -> list[str]:
+    """The image paths a post is linked to (slides for carousels and hook-photo reels)."""
+    record = as_post(post)
+    if record.reel_format == "hook_photo" or record.post_type == PostType.CAROUSEL:
+        return list(record.carousel_images)
+    return [record.image_url] if record.image_url else []
 
 
 # ---------------------------------------------------------------------------
@@ -328,63 +271,62 @@ def fill_image_urls(posts: list[dict[str, Any]], cfg: Config) -> int:
     pending_dir.mkdir(parents=True, exist_ok=True)
     prompts_dir.mkdir(parents=True, exist_ok=True)
 
+    index = pending_index.load()
     updated = 0
+    linked: list[str] = []  # images to ingest (watermark crop, normalize)
 
-    for post in posts:
-        status = str(post.get("status", "")).strip().lower()
-        if status in {"posted", "failed"}:
-            continue
-
-        post_id = str(post.get("id", "")).strip()
+    for post in as_queue(posts).with_status("posted", "failed", exclude=True):
+        record = as_post(post)
+        post_id = record.id
         if not post_id:
             continue
 
-        post_type = str(post.get("post_type", "reel")).strip().lower()
+        post_type = str(record.post_type)
+
+        # Already linked: offered to ingest again, so an image whose ingest
+        # failed (or that was replaced) is retried; ingested ones cost a stat.
+        if _has_images(post, index):
+            linked.extend(_linked_images(post))
+            continue
 
-        # Always refresh prompts for posts that still need images
-        if not _has_images(post):
-            _save_post_prompts(post)
+        # Refresh prompts for posts that still need images
+        _save_post_prompts(post)
 
         # Hook-photo reels: reel with multiple photos (stored like carousels)
-        reel_format = str(post.get("reel_format", "")).strip().lower()
-
-        if reel_format == "hook_photo":
-            if _has_images(post):
-                continue
-            images = _find_pending_carousel(post_id)
+        if record.reel_format == "hook_photo":
+            images = index.carousel(post_id)
             if images and len(images) >= 2:
-                _remove_watermarks_batch(images)
+                linked.extend(images)
                 post["carousel_images"] = images
                 post["image_url"] = images[0]  # thumbnail fallback
                 post["is_reel"] = True  # stays as reel (not carousel)
                 updated += 1
                 log.info("Linked hook-photo reel for %s: %d photos", post_id, len(images))
         elif post_type == "carousel":
-            if _has_images(post):
-                continue
-            images = _find_pending_carousel(post_id)
+            images = index.carousel(post_id)
             if images and len(images) >= 2:
-                _remove_watermarks_batch(images)
+                linked.extend(images)
                 post["carousel_images"] = images
                 post["image_url"] = images[0]  # thumbnail fallback
                 post["is_reel"] = False
                 updated += 1
                 log.info("Linked carousel for %s: %d slides", post_id, len(images))
         else:
-            if _has_images(post):
-                continue
-            image_path = _find_pending_single(post_id)
+            image_path = index.single(post_id)
             if image_path:
-                _remove_watermark(image_path)
+                linked.append(image_path)
                 post["image_url"] = image_path
                 post["is_reel"] = post_type == "reel"
                 updated += 1
                 log.info("Linked image for %s (%s): %s", post_id, post_type, image_path)
 
+    if linked:
+        ingest.ingest(linked)
+
     # Write the master summary for the user
-    write_prompts_summary(posts)
+    write_prompts_summary(posts, index)
 
-    if updated == 0 and not any(_has_images(p) for p in posts
+    if updated == 0 and not any(_has_images(p, index) for p in posts
                                 if str(p.get("status", "")).lower() in {"draft", "approved"}):
         log.info(
             "No images found in pending/. See generated_images/IMAGE_PROMPTS.md for prompts."
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""Ingest stage for user-placed images in generated_images/pending/.
+
+Each new image is decoded once and, in that single pass:
+
+  1. EXIF orientation applied (phone screenshots / exports arrive rotated)
+  2. colour space normalized to 8-bit sRGB RGB (ICC profiles converted)
+  3. Gemini watermark cropped off the bottom (WATERMARK_CROP_FRACTION)
+     — losslessly with jpegtran when the JPEG needs no other change
+  4. downscaled to the largest size any renderer needs (cover RENDER_SIZE)
+  5. re-saved in place
+
+Images are processed on a thread pool (PIL releases the GIL while
+decoding, resizing and encoding). Results are kept in an index that lives
+in pending/ itself, so it travels with the images the workflows commit:
+
+  pending/.ingest.json   ← {"maya-042.jpg": {"size", "mtime_ns", "sha256",
+                                             "width", "height"}}
+
+An entry matches while the file's size and mtime are unchanged; after a
+fresh checkout (new mtimes) the content hash decides, so an image is never
+cropped twice. Legacy `.nowm` sidecars mark images whose watermark was
+already removed — those are normalized but not cropped again.
+
+Thumbnails are not part of ingest: thumbnails() makes them on request
+from the already normalized image, named by its content hash. They are
+derived data and sit beside pending/ (gitignored):
+
+  generated_images/.thumbs/<sha16>.jpg
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageOps, JpegImagePlugin
+
+try:
+    from PIL import ImageCms
+except ImportError:  # Pillow built without littlecms
+    ImageCms = None
+
+from persona import persona_images_dir
+
+log = logging.getLogger(__name__)
+
+# Watermark removal: crop this fraction off the bottom of Gemini-generated images.
+# Gemini places a small "Made with Google AI" badge in the bottom-right.
+# 5% is enough to remove it without losing meaningful content.
+WATERMARK_CROP_FRACTION = 0.05
+
+# Largest frame any consumer needs: the 1080x1920 IG/YT video (feed and
+# carousel uploads are 1080 wide). Images are shrunk until they just cover
+# it, so fit and cover renders never need more pixels than are kept.
+RENDER_SIZE = (1080, 1920)
+THUMB_SIZE = (320, 320)
+INDEX_NAME = ".ingest.json"
+_EXIF_ORIENTATION = 0x0112
+
+# Temp files ("<name>.tmp<pid>[.<tid>]") written beside their target and
+# renamed over it; ones older than this are left over from a killed run.
+_TMP_NAME = re.compile(r"\.tmp\d+")
+_STALE_TMP_SECONDS = 3600
+
+_lock = threading.Lock()
+
+
+def _workers() -> int:
+    raw = os.getenv("INGEST_WORKERS", "").strip()
+    if raw:
+        return max(1, int(raw))
+    return min(4, os.cpu_count() or 1)
+
+
+def _pending_dir() -> Path:
+    return persona_images_dir() / "pending"
+
+
+def _thumbs_dir() -> Path:
+    d = persona_images_dir() / ".thumbs"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def _load_index(pending_dir: Path) -> dict[str, dict]:
+    try:
+        with open(pending_dir / INDEX_NAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_index(pending_dir: Path, index: dict[str, dict]) -> None:
+    tmp = pending_dir / f"{INDEX_NAME}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp, pending_dir / INDEX_NAME)
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _index_key(path: str, pending_dir: Path) -> str:
+    return Path(os.path.relpath(path, pending_dir)).as_posix()
+
+
+def _is_current(path: str, entry: dict | None) -> bool:
+    """Whether `entry` describes the file at `path` as it is now."""
+    if not entry:
+        return False
+    st = os.stat(path)
+    if entry.get("size") != st.st_size:
+        return False
+    if entry.get("mtime_ns") == st.st_mtime_ns:
+        return True
+    # Same size, new mtime (e.g. a git checkout) — the content decides
+    if entry.get("sha256") == _sha256(path):
+        entry["mtime_ns"] = st.st_mtime_ns
+        return True
+    return False
+
+
+def _to_srgb(img: Image.Image) -> Image.Image:
+    """8-bit RGB in sRGB; embedded ICC profiles are converted, not dropped."""
+    icc = img.info.get("icc_profile")
+    if icc and ImageCms is not None:
+        try:
+            src = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+            if img.mode not in ("RGB", "CMYK"):
+                img = img.convert("RGB")
+            return ImageCms.profileToProfile(
+                img, src, ImageCms.createProfile("sRGB"), outputMode="RGB",
+            )
+        except Exception as exc:  # malformed profile — fall back to a plain convert
+            log.debug("ICC conversion failed, converting without profile: %s", exc)
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        # Flatten transparency onto white rather than black
+        rgba = img.convert("RGBA")
+        flat = Image.new("RGB", rgba.size, (255, 255, 255))
+        flat.paste(rgba, mask=rgba.getchannel("A"))
+        return flat
+    return img.convert("RGB")
+
+
+def _cover_scale(w: int, h: int) -> float:
+    """Scale (<= 1) at which a w x h image still covers RENDER_SIZE."""
+    return min(1.0, max(RENDER_SIZE[0] / w, RENDER_SIZE[1] / h))
+
+
+def _save_thumb(img: Image.Image, thumb_path: Path) -> None:
+    thumb = img.copy()
+    thumb.thumbnail(THUMB_SIZE, Image.BILINEAR)
+    thumb.save(thumb_path, "JPEG", quality=80)
+
+
+def _is_srgb(icc: bytes) -> bool:
+    if ImageCms is None:
+        return False
+    try:
+        desc = ImageCms.getProfileDescription(ImageCms.ImageCmsProfile(io.BytesIO(icc)))
+    except Exception:
+        return False
+    return "srgb" in desc.lower()
+
+
+@lru_cache(maxsize=1)
+def _jpegtran() -> str | None:
+    """libjpeg-turbo's jpegtran (Debian/Ubuntu: libjpeg-turbo-progs), if installed."""
+    return shutil.which("jpegtran")
+
+
+def _keeps_pixels(src: Image.Image, height: int) -> bool:
+    """Whether `src` cropped to `height` rows needs no pixel changes.
+
+    True for a baseline-colour JPEG (YCbCr or grey) that is upright, sRGB and
+    no larger than ingest would shrink it to — everything but the crop is
+    already done, so the image never has to be decoded and re-encoded.
+    """
+    if src.format != "JPEG" or src.mode not in ("RGB", "L"):
+        return False
+    if src.getexif().get(_EXIF_ORIENTATION, 1) != 1:
+        return False
+    icc = src.info.get("icc_profile")
+    if icc and not _is_srgb(icc):
+        return False
+    return _cover_scale(src.width, height) >= 1.0
+
+
+def _mcu_height(src: Image.Image) -> int:
+    """Rows per iMCU: 16 for 4:2:0 chroma, 8 otherwise (4:4:4, 4:2:2, grey)."""
+    return 16 if src.mode == "RGB" and JpegImagePlugin.get_sampling(src) == 2 else 8
+
+
+def lossless_crop(path: str, out_path: str, width: int, height: int) -> bool:
+    """Keep the top width x height of a JPEG without re-encoding (jpegtran -crop).
+
+    The crop starts at the origin, so the DCT blocks are copied untouched;
+    `height` should be a multiple of the iMCU height. False if jpegtran is
+    unavailable or fails — the caller then crops through PIL.
+    """
+    jpegtran = _jpegtran()
+    if jpegtran is None:
+        return False
+    result = subprocess.run(
+        [jpegtran, "-crop", f"{width}x{height}+0+0", "-copy", "none",
+         "-optimize", "-outfile", out_path, path],
+        capture_output=True, text=True, timeout=60,
+    )
+    if result.returncode != 0 or not os.path.exists(out_path):
+        log.debug("jpegtran crop failed for %s: %s", path, (result.stderr or "")[-200:])
+        return False
+    return True
+
+
+def _normalize(src: Image.Image, crop_px: int) -> Image.Image:
+    """Orientation, sRGB, watermark crop and downscale — the decoding path."""
+    img = _to_srgb(ImageOps.exif_transpose(src))
+    w, h = img.size
+    if crop_px:
+        img = img.crop((0, 0, w, h - crop_px))
+        h -= crop_px
+    scale = _cover_scale(w, h)
+    if scale < 1.0:
+        img = img.resize((round(w * scale), round(h * scale)), Image.LANCZOS)
+    return img
+
+
+def _save_format(path: str) -> str:
+    """PIL format for `path`'s extension (JPEG if PIL doesn't know it)."""
+    return Image.registered_extensions().get(Path(path).suffix.lower(), "JPEG")
+
+
+def _sweep_temp_files(pending_dir: Path) -> None:
+    """Delete temp files a killed run left in pending/ or a carousel directory."""
+    try:
+        with os.scandir(pending_dir) as it:
+            entries = list(it)
+        for sub in [e for e in entries if e.is_dir() and not e.name.startswith(".")]:
+            with os.scandir(sub.path) as it:
+                entries += list(it)
+    except OSError:
+        return
+    cutoff = time.time() - _STALE_TMP_SECONDS
+    for entry in entries:
+        if not (_TMP_NAME.search(entry.name) and entry.is_file()):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                log.info("Removed stale temp file %s", entry.path)
+        except OSError as exc:
+            log.debug("Could not remove temp file %s: %s", entry.path, exc)
+
+
+def _process(path: str, crop: bool) -> dict:
+    """Normalize `path` in place, decoding it at most once.
+
+    JPEGs that only need the watermark crop are cropped losslessly on an
+    iMCU boundary (up to 15 extra rows go); ones that need nothing are left
+    byte-for-byte alone. Everything else is decoded once and re-saved.
+    """
+    # No image extension, so the pending/ index never lists a half-written file
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with Image.open(path) as src:
+        w, h = src.size
+        crop_px = int(h * WATERMARK_CROP_FRACTION) if crop else 0
+        if crop_px < 10:
+            crop_px = 0  # image too small to bother
+        img: Image.Image | None = None
+        keep = h
+        if crop_px:
+            keep = (h - crop_px) // _mcu_height(src) * _mcu_height(src)
+        if keep <= 0 or not _keeps_pixels(src, keep):
+            img = _normalize(src, crop_px)
+        elif keep < h:
+            if lossless_crop(path, tmp, w, keep):
+                os.replace(tmp, path)
+                crop_px = h - keep
+            else:
+                img = _normalize(src, crop_px)
+
+    if img is not None:
+        # Same format as the file name says; EXIF/ICC not carried over
+        img.save(tmp, format=_save_format(path), quality=95)
+        os.replace(tmp, path)
+        size = img.size
+    else:
+        size = (w, keep)
+
+    st = os.stat(path)
+    if crop_px:
+        log.info("Removed watermark from %s (cropped %dpx off bottom)", Path(path).name, crop_px)
+    return {
+        "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": _sha256(path),
+        "width": size[0], "height": size[1],
+    }
+
+
+def ingest(paths: list[str]) -> dict[str, dict]:
+    """Ingest every not-yet-processed image in `paths` (files under pending/).
+
+    Already-indexed images cost a stat, so callers pass every linked image
+    on each run. Returns {path: index entry} for the paths that are in the
+    index afterwards; failures are logged and left unindexed, so the next
+    call retries them. Paths outside pending/ are ignored.
+    """
+    pending_dir = _pending_dir()
+    _sweep_temp_files(pending_dir)
+    with _lock:
+        index = _load_index(pending_dir)
+    dirty = False
+
+    todo: list[tuple[str, str, bool]] = []
+    for path in dict.fromkeys(paths):  # dedupe, keep order
+        key = _index_key(path, pending_dir)
+        if key.startswith("../"):
+            continue
+        entry = index.get(key)
+        mtime = entry.get("mtime_ns") if entry else None
+        try:
+            if _is_current(path, entry):
+                dirty |= entry["mtime_ns"] != mtime
+                continue
+        except OSError as exc:
+            log.warning("Cannot ingest %s: %s", path, exc)
+            continue
+        # A .nowm-marked image had its watermark removed before the index
+        # existed; a replaced file (same name, new content) has not.
+        legacy = Path(path).with_suffix(".nowm").exists()
+        todo.append((path, key, not legacy))
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(_workers(), len(todo))) as pool:
+            futures = [(key, pool.submit(_process, path, crop)) for path, key, crop in todo]
+            for key, future in futures:
+                try:
+                    index[key] = future.result()
+                    dirty = True
+                except Exception as exc:
+                    log.warning("Ingest failed for %s: %s", key, exc)
+        log.info("Ingested %d pending image(s)", len(todo))
+
+    if dirty:
+        with _lock:
+            try:
+                _save_index(pending_dir, index)
+            except OSError as exc:
+                log.warning("Could not write ingest index: %s", exc)
+
+    return {
+        path: index[_index_key(path, pending_dir)] for path in paths
+        if _index_key(path, pending_dir) in index
+    }
+
+
+def thumbnails(paths: list[str]) -> dict[str, str]:
+    """{path: thumbnail path} for the ingested images in `paths`.
+
+    A thumbnail is written the first time it is asked for (a DCT-scaled
+    decode of the normalized image) and reused while the image's content
+    hash is unchanged. Images that aren't indexed are left out.
+    """
+    pending_dir = _pending_dir()
+    with _lock:
+        index = _load_index(pending_dir)
+    out: dict[str, str] = {}
+    for path in dict.fromkeys(paths):
+        entry = index.get(_index_key(path, pending_dir))
+        if not entry or not entry.get("sha256"):
+            continue
+        thumb_path = _thumbs_dir() / f"{entry['sha256'][:16]}.jpg"
+        if not thumb_path.exists():
+            try:
+                with Image.open(path) as src:
+                    src.draft("RGB", THUMB_SIZE)
+                    _save_thumb(src.convert("RGB"), thumb_path)
+            except OSError as exc:
+                log.debug("Could not write thumbnail for %s: %s", path, exc)
+                continue
+        out[path] = str(thumb_path)
+    return out
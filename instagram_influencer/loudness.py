@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Loudness analysis for background tracks — measured once, applied at mux.
+
+Every track that ends up under a video (user music, generated lo-fi beds,
+external downloads) is analysed a single time with ffmpeg's ebur128 filter
+for integrated loudness (I), loudness range (LRA) and true peak (TP). The
+muxing ffmpeg call then applies one linear gain via `volume=` — the second
+pass of a two-pass normalization — so levels match across Shorts without
+re-encoding or re-analysing the track on every render.
+
+Measurements are kept in a sidecar index next to the audio:
+
+  <audio dir>/.loudness.json   ← {filename: {"size", "mtime_ns", "I", "LRA", "TP"}}
+
+Files under the temp dir are memoized in-process only; a cut from a bed
+inherits the bed's measurement instead of being analysed again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+import ffmpeg_caps
+
+log = logging.getLogger(__name__)
+
+TARGET_I = -16.0     # LUFS — same target the per-track loudnorm used
+TARGET_TP = -1.5     # dBTP ceiling; the gain is capped so peaks stay below it
+INDEX_NAME = ".loudness.json"
+
+_lock = threading.Lock()
+_memo: dict[tuple[str, int, int], dict] = {}  # (path, size, mtime_ns) → measurement
+
+
+def _get_ffmpeg() -> str:
+    """Get path to ffmpeg binary."""
+    return ffmpeg_caps.ffmpeg_path()
+
+
+def _memo_key(path: str) -> tuple[str, int, int]:
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def _is_temp(path: str) -> bool:
+    return os.path.abspath(path).startswith(tempfile.gettempdir())
+
+
+def _load_index(directory: Path) -> dict[str, dict]:
+    try:
+        with open(directory / INDEX_NAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_index(directory: Path, index: dict[str, dict]) -> None:
+    tmp = directory / f"{INDEX_NAME}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp, directory / INDEX_NAME)
+
+
+def _analyze(path: str) -> dict | None:
+    """Run one ebur128 pass over `path`. None for silence or on failure."""
+    if not ffmpeg_caps.has_filter("ebur128"):
+        return None  # tracks are muxed at their own level
+    cmd = [_get_ffmpeg(), "-hide_banner", "-nostats", "-i", path,
+           "-af", "ebur128=peak=true", "-f", "null", "-"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    except Exception as exc:
+        log.warning("Loudness analysis error for %s: %s", path, exc)
+        return None
+    summary = (result.stderr or "").rpartition("Summary:")[2]
+    fields = {
+        name: re.search(rf"{label}:\s+(-?[0-9.]+|-inf)", summary)
+        for name, label in (("I", r"\bI"), ("LRA", "LRA"), ("TP", "Peak"))
+    }
+    if result.returncode != 0 or not all(fields.values()):
+        log.warning("Loudness analysis failed for %s: %s", path, (result.stderr or "")[-300:])
+        return None
+    values = {name: float(m.group(1)) for name, m in fields.items()}
+    if values["I"] == float("-inf"):
+        return None  # silent track — nothing to normalize
+    return values
+
+
+def measure(path: str) -> dict | None:
+    """Loudness of `path` as {"I", "LRA", "TP"}, analysing only on first sight."""
+    try:
+        key = _memo_key(path)
+    except OSError:
+        return None
+    cached = _memo.get(key)
+    if cached is not None:
+        return cached
+
+    directory, name = Path(path).parent, Path(path).name
+    persistent = not _is_temp(path)
+    if persistent:
+        with _lock:
+            entry = _load_index(directory).get(name)
+        if entry and entry.get("size") == key[1] and entry.get("mtime_ns") == key[2]:
+            values = {k: entry[k] for k in ("I", "LRA", "TP")}
+            _memo[key] = values
+            return values
+
+    values = _analyze(path)
+    if values is None:
+        return None
+    _memo[key] = values
+    log.info("Loudness %s: I=%.1f LUFS, LRA=%.1f LU, TP=%.1f dBTP",
+             name, values["I"], values["LRA"], values["TP"])
+    if persistent:
+        with _lock:
+            try:
+                index = _load_index(directory)
+                index[name] = {"size": key[1], "mtime_ns": key[2], **values}
+                _save_index(directory, index)
+            except OSError as exc:
+                log.debug("Could not write loudness index in %s: %s", directory, exc)
+    return values
+
+
+def inherit(path: str, source: str) -> None:
+    """Record `source`'s measurement for `path` (e.g. a cut from a bed)."""
+    values = measure(source)
+    if values is None:
+        return
+    try:
+        _memo[_memo_key(path)] = values
+    except OSError:
+        pass
+
+
+def gain_db(values: dict) -> float:
+    """Linear gain reaching TARGET_I without pushing the true peak past TARGET_TP."""
+    return min(TARGET_I - values["I"], TARGET_TP - values["TP"])
+
+
+def mux_filter(path: str, duration: float, *, shape: bool = False) -> str | None:
+    """Audio filter for muxing `path` under a `duration`-second video.
+
+    Applies the measured gain; with shape=True also adds the fade in/out a
+    full-length track needs when it is cut to the video (the video's -t
+    does the cut). Returns None when there is nothing to apply.
+    """
+    filters: list[str] = []
+    values = measure(path)
+    if values is not None:
+        filters.append(f"volume={gain_db(values):.2f}dB")
+    if shape:
+        fade_out_start = max(0, duration - 0.8)
+        filters.append(f"afade=t=in:d=0.3,afade=t=out:st={fade_out_start}:d=0.8")
+    return ",".join(filters) or None
@@ -11,21 +11,26 @@ import random
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from config import (DEFAULT_QUEUE_FILE, GENERATED_IMAGES_DIR, REFERENCE_DIR,
-                    SESSION_FILE, Config, load_config, setup_logging)
+import pending_index
+import queue_archive
+from config import DEFAULT_QUEUE_FILE, Config, load_config, setup_logging
 from engagement import run_engagement, run_session
 from generator import generate_content
 from image import fill_image_urls
 from persona import get_persona
 from publisher import publish, _get_client, ChallengeAbort
 from video import convert_posts_to_video
+from post_record import PostType, as_post
 from post_queue import (
+    as_queue,
     find_eligible,
+    flush_queues,
     format_utc,
     parse_scheduled_at,
     publishable_count,
     read_queue,
     status_counts,
+    update_post,
     write_queue,
 )
 
@@ -38,7 +43,9 @@ log = logging.getLogger(__name__)
 REPOST_MIN_AGE_DAYS = 7  # Don't repost content younger than this
 
 
-def _find_oldest_repostable(posts: list[dict[str, Any]]) -> tuple[int, dict[str, Any]] | None:
+def _find_oldest_repostable(
+    posts: list[dict[str, Any]], queue_file: str | None = None,
+) -> tuple[int | None, dict[str, Any]] | None:
     """Find the oldest posted entry with valid images for reposting.
 
     Picks the oldest post (by posted_at) that:
@@ -46,37 +53,44 @@ def _find_oldest_repostable(posts: list[dict[str, Any]]) -> tuple[int, dict[str,
       - Has valid image files still on disk
       - Was posted >= REPOST_MIN_AGE_DAYS ago
       - Is not itself a repost (avoids infinite repost chains)
+
+    The queue keeps posted non-reposts ordered by posted_at (undated last),
+    so the first candidate that passes the checks below is the oldest.
+    With `queue_file`, archived months (all older than the live queue's
+    posts) are tried first, oldest month first, and only read until one
+    yields a candidate; the index is None for an archived entry.
     """
-    now = datetime.now(timezone.utc)
-    oldest: tuple[int, dict[str, Any]] | None = None
-    oldest_dt: datetime | None = None
+    index = pending_index.load()
+    if queue_file:
+        for month in queue_archive.iter_months(queue_file):
+            found = _oldest_repostable_in(month, index)
+            if found:
+                return None, found[1]
+    return _oldest_repostable_in(as_queue(posts), index)
 
-    for idx, item in enumerate(posts):
-        if str(item.get("status", "")).strip().lower() != "posted":
-            continue
-        # Skip reposts to avoid chains
-        if str(item.get("notes", "")).startswith("repost:"):
-            continue
+
+def _oldest_repostable_in(queue, index: pending_index.PendingIndex) -> tuple[int, dict[str, Any]] | None:
+    """First repost candidate in `queue` (oldest first) with images on disk that is old enough."""
+    now = datetime.now(timezone.utc)
+    for idx, item in queue.repost_candidates():
+        record = as_post(item)
         # Must have images on disk
-        carousel_images = item.get("carousel_images") or []
-        image_url = str(item.get("image_url", "")).strip()
+        carousel_images = record.carousel_images
+        image_url = record.image_url
         has_images = False
-        if carousel_images and all(os.path.exists(str(p)) for p in carousel_images):
+        if carousel_images and all(index.exists(p) for p in carousel_images):
             has_images = True
-        elif image_url and os.path.exists(image_url):
+        elif image_url and index.exists(image_url):
             has_images = True
         if not has_images:
             continue
         # Must be old enough
-        posted_at = parse_scheduled_at(item.get("posted_at"))
+        posted_at = record.posted_at
         if posted_at and (now - posted_at).days < REPOST_MIN_AGE_DAYS:
             continue
-        # Track oldest
-        if oldest is None or (posted_at and (oldest_dt is None or posted_at < oldest_dt)):
-            oldest = (idx, item)
-            oldest_dt = posted_at
+        return idx, item
 
-    return oldest
+    return None
 
 
 
@@ -422,25 +436,25 @@ def _promote_drafts(posts: list[dict[str, Any]], cfg: Config) -> int:
         if dt and dt >= next_slot:
             next_slot = dt + interval
 
+    queue = as_queue(posts)
     promoted = 0
-    for item in posts:
-        if str(item.get("status", "")).strip().lower() != "draft":
+    for idx in queue.indices("draft"):
+        item = as_post(queue[idx])
+        if not item.caption:
             continue
-        if not item.get("caption"):
-            continue
-        post_type = str(item.get("post_type", "reel")).lower()
         has_media = (
-            (post_type == "carousel" and item.get("carousel_images"))
-            or item.get("image_url")
-            or item.get("video_url")
+            (item.post_type == PostType.CAROUSEL and item.carousel_images)
+            or item.image_url
+            or item.video_url
         )
         if not has_media:
             continue
-        item["status"] = cfg.auto_promote_status
-        dt = parse_scheduled_at(item.get("scheduled_at"))
+        fields: dict[str, Any] = {"status": cfg.auto_promote_status}
+        dt = item.scheduled_at
         if dt is None or dt <= now:
-            item["scheduled_at"] = format_utc(next_slot)
+            fields["scheduled_at"] = format_utc(next_slot)
             next_slot += interval
+        queue.update(idx, **fields)
         promoted += 1
     return promoted
 
@@ -808,17 +822,12 @@ def main() -> int:
     except ModuleNotFoundError:
         pass
 
-    # CRITICAL: Reset the persona singleton AND lazy paths so they re-read
-    # the PERSONA env var from .env.  Module imports may have triggered
-    # get_persona() BEFORE load_dotenv(), caching the wrong persona
-    # (defaulting to "maya").
+    # CRITICAL: Reset the persona singleton so it re-reads the PERSONA env
+    # var from .env.  Module imports may have triggered get_persona() BEFORE
+    # load_dotenv(), caching the wrong persona (defaulting to "maya"). The
+    # lazy paths are cached per persona id and follow automatically.
     from persona import reset_persona
     reset_persona()
-    # Also reset lazy path caches that may have resolved to the wrong persona dir
-    DEFAULT_QUEUE_FILE.reset()
-    SESSION_FILE.reset()
-    REFERENCE_DIR.reset()
-    GENERATED_IMAGES_DIR.reset()
 
     parser = argparse.ArgumentParser(description="Instagram + YouTube bot pipeline")
     parser.add_argument("--queue-file", default=str(DEFAULT_QUEUE_FILE))
@@ -865,6 +874,15 @@ def main() -> int:
                 print("No eligible posts")
             return 0
 
+        # Settled posts older than QUEUE_ARCHIVE_DAYS leave the hot queue. The
+        # YT-only workflow doesn't commit the archive, so it never archives.
+        if not args.yt_publish_only:
+            archived = queue_archive.archive_settled(
+                args.queue_file, posts, cfg.archive_after_days, youtube=cfg.youtube_enabled,
+            )
+            if archived:
+                write_queue(args.queue_file, posts)
+
         # Step 1: content generation (skipped with --no-generate)
         if not args.no_generate:
             if _should_generate(posts, cfg):
@@ -916,7 +934,7 @@ def main() -> int:
                 if chosen is None:
                     # --- Repost fallback: recycle oldest posted images with fresh hooks ---
                     log.info("No eligible posts — checking for repostable content")
-                    repostable = _find_oldest_repostable(posts)
+                    repostable = _find_oldest_repostable(posts, args.queue_file)
                     if repostable:
                         _, source = repostable
                         repost = _create_repost(posts, source, cfg)
@@ -924,7 +942,7 @@ def main() -> int:
                         # Convert to video immediately
                         convert_posts_to_video(posts, youtube=cfg.youtube_enabled)
                         # Promote to ready so it publishes this run
-                        repost["status"] = cfg.auto_promote_status
+                        update_post(posts, len(posts) - 1, status=cfg.auto_promote_status)
                         write_queue(args.queue_file, posts)
                         log.info("Created repost %s from %s with fresh hooks",
                                  repost["id"], source.get("id"))
@@ -969,16 +987,13 @@ def main() -> int:
                                               post_type=post_type,
                                               alt_text=alt_text,
                                               first_comment=first_comment_hashtags)
-                            posts[idx]["status"] = "posted"
-                            posts[idx]["posted_at"] = _utc_now_iso()
-                            posts[idx]["platform_post_id"] = post_id
-                            posts[idx]["publish_error"] = None
+                            update_post(posts, idx, status="posted", posted_at=_utc_now_iso(),
+                                        platform_post_id=post_id, publish_error=None)
                             log.info("Published %s → %s", item.get("id"), post_id)
                         except ChallengeAbort:
                             raise  # Don't catch — abort immediately
                         except Exception as exc:
-                            posts[idx]["status"] = "failed"
-                            posts[idx]["publish_error"] = str(exc)
+                            update_post(posts, idx, status="failed", publish_error=str(exc))
                             log.error("Publish failed for %s: %s", item.get("id"), exc)
 
                         write_queue(args.queue_file, posts)
@@ -1076,6 +1091,10 @@ def main() -> int:
         except Exception:
             pass
         return 1
+    finally:
+        # SQLite backend: export the queue JSON once per run (atexit is
+        # only the backstop for callers that never reach this point).
+        flush_queues()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Persistent index of generated_images/pending/, refreshed incrementally.
+
+Linking images to posts used to probe the filesystem per post: four
+exists()/stat() calls per single-image post, a directory listing plus a
+stat per file for every carousel, and another stat per linked path in
+_has_images — for every non-posted post on every run, and again across the
+whole history when looking for something to repost. Here one refresh walks
+pending/ with os.scandir and every lookup is answered from memory:
+
+  data/{persona}/generated_images/.pending_index.json
+    {"version": 1, "root_mtime_ns": …,
+     "dirs":  {"maya-043": mtime_ns},
+     "files": {"maya-042.jpg": [size, mtime_ns], "maya-043/1.jpg": [size, mtime_ns]}}
+
+A refresh re-lists pending/ itself only when its mtime moved, and a
+carousel directory only when that directory's mtime moved, so an unchanged
+tree costs one scandir and a stat per subdirectory. Replacing a file
+through a rename (how ingest and the renderers write) updates its
+directory's mtime; a file rewritten in place keeps its old record until
+the next change in that directory.
+
+The index is derived data and sits beside pending/ (gitignored); a fresh
+checkout simply rebuilds it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from persona import persona_images_dir
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+MIN_IMAGE_BYTES = 10_000  # smaller files are partial downloads/placeholders
+
+
+class PendingIndex:
+    """(path → size, mtime) for everything under one pending/ directory."""
+
+    def __init__(self, root: Path, index_path: Path):
+        self.root = Path(os.path.abspath(root))
+        self.index_path = index_path
+        self.root_mtime_ns = 0
+        self.dirs: dict[str, int] = {}
+        self.files: dict[str, tuple[int, int]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return
+        self.root_mtime_ns = int(data.get("root_mtime_ns", 0))
+        self.dirs = {k: int(v) for k, v in data.get("dirs", {}).items()}
+        self.files = {k: (int(v[0]), int(v[1])) for k, v in data.get("files", {}).items()}
+
+    def save(self) -> None:
+        tmp = self.index_path.with_name(f"{self.index_path.name}.tmp{os.getpid()}")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "root_mtime_ns": self.root_mtime_ns,
+                    "dirs": self.dirs,
+                    "files": {k: list(v) for k, v in self.files.items()},
+                }, f, sort_keys=True)
+            os.replace(tmp, self.index_path)
+        except OSError as exc:
+            log.debug("Could not write pending index %s: %s", self.index_path, exc)
+
+    def _scan_dir(self, rel: str, path: str) -> None:
+        """Replace the file records directly inside `rel` ("" for the root)."""
+        prefix = f"{rel}/" if rel else ""
+        for key in [k for k in self.files
+                    if k.startswith(prefix) and "/" not in k[len(prefix):]]:
+            del self.files[key]
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTS):
+                    st = entry.stat()
+                    self.files[prefix + entry.name] = (st.st_size, st.st_mtime_ns)
+
+    def refresh(self) -> int:
+        """Bring the index up to date; returns the number of directories re-listed."""
+        try:
+            root_mtime = os.stat(self.root).st_mtime_ns
+        except OSError:
+            self.root_mtime_ns, self.dirs, self.files = 0, {}, {}
+            return 0
+
+        rescanned = 0
+        if root_mtime != self.root_mtime_ns:
+            self._scan_dir("", str(self.root))
+            self.root_mtime_ns = root_mtime
+            rescanned += 1
+
+        seen: set[str] = set()
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+                seen.add(entry.name)
+                mtime = entry.stat().st_mtime_ns
+                if self.dirs.get(entry.name) != mtime:
+                    self._scan_dir(entry.name, entry.path)
+                    self.dirs[entry.name] = mtime
+                    rescanned += 1
+
+        for name in set(self.dirs) - seen:  # carousel directories that went away
+            del self.dirs[name]
+            prefix = f"{name}/"
+            for key in [k for k in self.files if k.startswith(prefix)]:
+                del self.files[key]
+
+        if rescanned:
+            log.debug("Pending index: re-listed %d director%s",
+                      rescanned, "y" if rescanned == 1 else "ies")
+            self.save()
+        return rescanned
+
+    def _rel(self, path: str) -> str | None:
+        """Key for `path` if it lies under pending/, else None."""
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        if rel.startswith(os.pardir) or os.path.isabs(rel):
+            return None
+        return Path(rel).as_posix()
+
+    def exists(self, path: str) -> bool:
+        """os.path.exists() for image paths, answered from the index under pending/."""
+        rel = self._rel(path)
+        if rel is None or not rel.lower().endswith(IMAGE_EXTS):
+            return os.path.exists(path)
+        return rel in self.files
+
+    def single(self, post_id: str) -> str | None:
+        """User-placed image at pending/{post_id}.(jpg|jpeg|png|webp)."""
+        for ext in IMAGE_EXTS:
+            record = self.files.get(f"{post_id}{ext}")
+            if record and record[0] > MIN_IMAGE_BYTES:
+                return str(self.root / f"{post_id}{ext}")
+        return None
+
+    def carousel(self, post_id: str) -> list[str]:
+        """Images in pending/{post_id}/, sorted by file stem (1, 2, 3, ...)."""
+        prefix = f"{post_id}/"
+        names = [
+            k[len(prefix):] for k, (size, _) in self.files.items()
+            if k.startswith(prefix) and size > MIN_IMAGE_BYTES
+        ]
+        return [str(self.root / post_id / name) for name in sorted(names, key=lambda n: Path(n).stem)]
+
+
+def load() -> PendingIndex:
+    """The current persona's pending/ index, refreshed."""
+    images_dir = persona_images_dir()
+    index = PendingIndex(images_dir / "pending", images_dir / ".pending_index.json")
+    index.refresh()
+    return index
@@ -17,8 +17,9 @@ from __future__ import annotations
 import json
 import logging
 import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 log = logging.getLogger(__name__)
 
@@ -56,6 +57,41 @@ def reset_persona() -> None:
     _persona = None
 
 
+@contextmanager
+def use_persona(name: str) -> Iterator[dict[str, Any]]:
+    """Make `name` the current persona inside the block (restored on exit).
+
+    Everything persona-scoped — data dirs, config.DEFAULT_QUEUE_FILE and the
+    other lazy paths — follows get_persona(), so one process can work
+    through several personas in turn. PERSONA is set too, for the code
+    that reads the env var directly. Not for concurrent use across threads.
+    """
+    global _persona
+    previous, previous_env = _persona, os.environ.get("PERSONA")
+    _persona = load_persona(name)
+    os.environ["PERSONA"] = _persona["id"]
+    try:
+        yield _persona
+    finally:
+        _persona = previous
+        if previous_env is None:
+            os.environ.pop("PERSONA", None)
+        else:
+            os.environ["PERSONA"] = previous_env
+
+
+def list_personas(include_satellites: bool = False) -> list[str]:
+    """Ids of every persona in personas/, main accounts only by default."""
+    names = []
+    for path in sorted(PERSONAS_DIR.glob("*.json")):
+        if not include_satellites:
+            with open(path, "r", encoding="utf-8") as f:
+                if json.load(f).get("mode") == "satellite":
+                    continue
+        names.append(path.stem)
+    return names
+
+
 def persona_data_dir(persona: dict[str, Any] | None = None) -> Path:
     """Return the per-persona state directory: data/{persona_id}/
 
@@ -84,6 +120,8 @@ def next_post_id(existing: list[dict[str, Any]], offset: int = 1) -> str:
     """Generate the next {prefix}-NNN ID based on existing posts and persona prefix."""
     p = get_persona()
     prefix = p.get("post_id_prefix", p["id"])
+    if hasattr(existing, "max_post_number"):  # post_queue.Queue keeps the max indexed
+        return f"{prefix}-{existing.max_post_number(prefix) + offset:03d}"
     max_num = 0
     for item in existing:
         post_id = str(item.get("id", "")).strip().lower()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Fit-with-blur plates shared by the video and story renderers.
+
+Every renderer that puts a photo on a frame of a different aspect ratio
+uses the same look: the photo cover-scaled and blurred as the background
+(dimmed for stories, as bright as the original ffmpeg graph for videos),
+with the full photo fit-scaled on top. This module builds the two layers
+once per (image, size) and caches them on disk:
+
+  data/{persona}/generated_images/.plates/
+    <sha16>_1080x1920_bg2.jpg       ← cover + blur + dim (stories)
+    <sha16>_1080x1920_bg2_dim0.jpg  ← cover + blur (IG/YT video)
+    <sha16>_1080x1497_fg.jpg        ← photo fit inside the box
+
+Keys use the image's content hash, so a repost or a moved file reuses the
+same plates. The cache sits beside pending/ rather than inside it: the
+workflows force-add pending/ to git. Images under the temp dir (e.g.
+downloaded story thumbnails) are built but never cached.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageFilter
+
+from persona import persona_images_dir
+from render_cache import file_digest
+
+log = logging.getLogger(__name__)
+
+BLUR_RADIUS = 25   # GaussianBlur radius at 1080px wide
+BLUR_SCALE = 4     # background blurred at 1/4 size, then upsampled
+DIM = 0.20         # stories: blend toward black so the foreground pops
+VIDEO_DIM = 0.0    # videos: the undimmed gblur fill of the ffmpeg graph
+
+# File-name suffix per layer — bump when a layer's look changes
+_LAYER_VERSIONS = {"bg": "2", "fg": ""}
+
+
+def _plates_dir() -> Path:
+    d = persona_images_dir() / ".plates"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def _cache_path(image_path: str, width: int, height: int, layer: str,
+                variant: str = "") -> Path | None:
+    """Cache file for a plate layer, or None when the source is a temp file."""
+    if os.path.abspath(image_path).startswith(tempfile.gettempdir()):
+        return None
+    digest = file_digest(image_path)[:16]
+    return _plates_dir() / f"{digest}_{width}x{height}_{layer}{_LAYER_VERSIONS[layer]}{variant}.jpg"
+
+
+def _cached(image_path: str, width: int, height: int, layer: str, build,
+            variant: str = "") -> Image.Image:
+    try:
+        path = _cache_path(image_path, width, height, layer, variant)
+    except OSError as exc:
+        log.debug("Plate cache unavailable for %s: %s", image_path, exc)
+        path = None
+    if path is not None and path.exists():
+        try:
+            with Image.open(path) as cached:
+                return cached.convert("RGB")
+        except OSError:
+            pass  # corrupt cache entry — rebuild below
+
+    img = build()
+    if path is not None:
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        try:
+            img.save(tmp, "JPEG", quality=95)
+            os.replace(tmp, path)
+        except OSError as exc:
+            log.debug("Could not cache plate %s: %s", path.name, exc)
+    return img
+
+
+def _open_rgb(image_path: str) -> Image.Image:
+    with Image.open(image_path) as img:
+        return img.convert("RGB")
+
+
+def background(image_path: str, width: int, height: int, dim: float = DIM) -> Image.Image:
+    """Cover-scaled, center-cropped, blurred background plate, dimmed by `dim`."""
+    def build() -> Image.Image:
+        # Blur at 1/BLUR_SCALE size and upsample: a radius-25 blur has no
+        # detail left that the smaller grid can't carry, at ~1/16 the work.
+        # JPEG sources are also decoded DCT-scaled (draft) straight to near
+        # that size.
+        bw, bh = max(1, width // BLUR_SCALE), max(1, height // BLUR_SCALE)
+        with Image.open(image_path) as img:
+            img.draft("RGB", (bw, bh))
+            src = img.convert("RGB")
+        sw, sh = src.size
+        cover = max(bw / sw, bh / sh)
+        cw, ch = max(bw, round(sw * cover)), max(bh, round(sh * cover))
+        small = src.resize((cw, ch), Image.BILINEAR)  # blurred anyway
+        left, top = (cw - bw) // 2, (ch - bh) // 2
+        small = small.crop((left, top, left + bw, top + bh))
+        small = small.filter(ImageFilter.GaussianBlur(radius=BLUR_RADIUS / BLUR_SCALE))
+        if dim:
+            small = Image.blend(small, Image.new("RGB", small.size, (0, 0, 0)), alpha=dim)
+        return small.resize((width, height), Image.BICUBIC)
+
+    variant = "" if dim == DIM else f"_dim{round(dim * 100)}"
+    return _cached(image_path, width, height, "bg", build, variant)
+
+
+def foreground(image_path: str, max_width: int, max_height: int) -> Image.Image:
+    """The full photo fit-scaled inside max_width x max_height (no cropping)."""
+    def build() -> Image.Image:
+        src = _open_rgb(image_path)
+        sw, sh = src.size
+        fit = min(max_width / sw, max_height / sh)
+        fw, fh = min(max_width, round(sw * fit)), min(max_height, round(sh * fit))
+        return src.resize((fw, fh), Image.LANCZOS)
+
+    return _cached(image_path, max_width, max_height, "fg", build)
+
+
+def composite(image_path: str, width: int, height: int) -> Image.Image:
+    """The video frame: undimmed background plate with the foreground centered on it."""
+    bg = background(image_path, width, height, dim=VIDEO_DIM)
+    fg = foreground(image_path, width, height)
+    bg.paste(fg, ((width - fg.width) // 2, (height - fg.height) // 2))
+    return bg
@@ -1,46 +1,270 @@
 #!/usr/bin/env python3
-"""Queue management for the content pipeline."""
+"""Queue management for the content pipeline.
+
+The queue is content_queue.json. With QUEUE_BACKEND=sqlite, read_queue /
+write_queue go through a SQLite store beside it instead (per-post upserts);
+the JSON is exported once per run by flush_queues — see queue_store.py.
+
+Entries are read as post_record.Post records (typed fields, validated once
+here) and held in a Queue (indexed by status, schedule, id and repost
+order). Both still behave as the list of dicts the pipeline was written for.
+"""
 
 from __future__ import annotations
 
+import atexit
+import bisect
+import heapq
 import json
 import logging
+import os
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from post_record import (  # noqa: F401 — datetime helpers re-exported
+    PUBLISHABLE,
+    Post,
+    PostStatus,
+    PostType,
+    as_post,
+    format_utc,
+    parse_scheduled_at,
+    to_json,
+)
+
 log = logging.getLogger(__name__)
 
+QUEUE_BACKENDS = ("json", "sqlite")
+
 
 # ---------------------------------------------------------------------------
-# Datetime helpers
+# Indexed queue
 # ---------------------------------------------------------------------------
 
-def parse_scheduled_at(value: Any) -> datetime | None:
-    """Parse an ISO-8601 datetime string into a UTC-aware datetime."""
-    raw = str(value or "").strip()
-    if not raw:
-        return None
-    try:
-        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
-    except ValueError:
+def _status(post: Post) -> str:
+    return str(post.status) or "unknown"
+
+
+def _id_parts(post: Post) -> tuple[str, int] | None:
+    """("maya", 42) for id "maya-042"; None for ids without a numeric tail."""
+    prefix, sep, tail = post.id.lower().rpartition("-")
+    return (prefix, int(tail)) if sep and tail.isdigit() else None
+
+
+def _repost_key(post: Post, idx: int) -> tuple | None:
+    """Order of repost candidates: posted_at ascending, undated last, then queue order."""
+    if post.status != PostStatus.POSTED or post.notes.startswith("repost:"):
         return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
+    return (0, post.posted_at.timestamp(), idx) if post.posted_at else (1, 0.0, idx)
+
+
+class Queue(list):
+    """The post list, plus indexes kept current as posts are added or change state.
+
+    Still a plain list of dicts to every caller (json.dump, slicing, loops);
+    the queries below skip the full scan and per-item re-normalization:
+
+      - status buckets:   status → indices (status_counts, publishable_count)
+      - due / waiting:    ready/approved indices that are due, and a min-heap
+                          on scheduled_at of those that aren't yet (find_eligible)
+      - id counters:      max numeric id per prefix (persona.next_post_id)
+      - repost order:     posted non-reposts sorted by posted_at
+                          (orchestrator._find_oldest_repostable)
+
+    append()/extend() index the new posts. A change to a post's status,
+    scheduled_at, posted_at, notes or id must go through update() (or
+    reindex() after editing the dict); other list mutations rebuild.
+    """
+
+    def __init__(self, posts: list[dict[str, Any]] = ()):
+        super().__init__(posts)
+        self._reserved_ids: dict[str, int] = {}  # survives rebuilds
+        self._build()
+
+    def _build(self) -> None:
+        self._buckets: dict[str, set[int]] = {}
+        self._due: set[int] = set()
+        self._waiting: list[tuple[float, int, int]] = []  # (scheduled ts, idx, version)
+        self._version: list[int] = []
+        self._max_id: dict[str, int] = {}
+        self._reposts: list[tuple] = []
+        self._repost_keys: dict[int, tuple] = {}
+        now = datetime.now(timezone.utc)
+        for idx in range(len(self)):
+            self._version.append(0)
+            self._index(idx, now)
+
+    def _index(self, idx: int, now: datetime | None = None) -> None:
+        item = as_post(self[idx])
+        status = _status(item)
+        self._buckets.setdefault(status, set()).add(idx)
+        if status in PUBLISHABLE:
+            dt = item.scheduled_at
+            if dt and dt > (now or datetime.now(timezone.utc)):
+                heapq.heappush(self._waiting, (dt.timestamp(), idx, self._version[idx]))
+            else:
+                self._due.add(idx)
+        parts = _id_parts(item)
+        if parts and parts[1] > self._max_id.get(parts[0], 0):
+            self._max_id[parts[0]] = parts[1]
+        key = _repost_key(item, idx)
+        if key is not None:
+            bisect.insort(self._reposts, key)
+            self._repost_keys[idx] = key
+
+    def _unindex(self, idx: int) -> None:
+        for bucket in self._buckets.values():
+            bucket.discard(idx)
+        self._due.discard(idx)
+        self._version[idx] += 1  # its _waiting entry, if any, is now stale
+        key = self._repost_keys.pop(idx, None)
+        if key is not None:
+            del self._reposts[bisect.bisect_left(self._reposts, key)]
+
+    def reindex(self, idx: int) -> None:
+        """Re-read post `idx` after its dict was edited in place."""
+        self._unindex(idx)
+        self._index(idx)
+
+    def update(self, idx: int, **fields: Any) -> dict[str, Any]:
+        """Set fields on post `idx` and keep the indexes current."""
+        self[idx].update(fields)
+        self.reindex(idx)
+        return self[idx]
+
+    def append(self, item: dict[str, Any]) -> None:
+        super().append(item)
+        self._version.append(0)
+        self._index(len(self) - 1)
+
+    def extend(self, items) -> None:
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def _rebuilding(name: str):
+        def method(self, *args):
+            result = getattr(list, name)(self, *args)
+            self._build()
+            return result
+        method.__name__ = name
+        return method
+
+    insert = _rebuilding("insert")
+    pop = _rebuilding("pop")
+    remove = _rebuilding("remove")
+    clear = _rebuilding("clear")
+    sort = _rebuilding("sort")
+    reverse = _rebuilding("reverse")
+    __setitem__ = _rebuilding("__setitem__")
+    __delitem__ = _rebuilding("__delitem__")
+    del _rebuilding
+
+    # -- queries --------------------------------------------------------------
+
+    def status_counts(self) -> dict[str, int]:
+        return {status: len(bucket) for status, bucket in self._buckets.items() if bucket}
+
+    def count_status(self, *statuses: str) -> int:
+        return sum(len(self._buckets.get(s, ())) for s in statuses)
+
+    def indices(self, *statuses: str) -> list[int]:
+        """Indices of posts with one of `statuses`, in queue order."""
+        return sorted(set().union(*(self._buckets.get(s, set()) for s in statuses)))
+
+    def with_status(self, *statuses: str, exclude: bool = False) -> list[dict[str, Any]]:
+        """Posts with (or, with exclude=True, without) one of `statuses`, in queue order."""
+        if exclude:
+            skip = set(self.indices(*statuses))
+            return [item for idx, item in enumerate(self) if idx not in skip]
+        return [self[idx] for idx in self.indices(*statuses)]
+
+    def due(self, now: datetime) -> list[int]:
+        """Indices of ready/approved posts scheduled at or before `now`, in queue order."""
+        cutoff = now.timestamp()
+        while self._waiting and self._waiting[0][0] <= cutoff:
+            _, idx, version = heapq.heappop(self._waiting)
+            if version == self._version[idx]:
+                self._due.add(idx)
+        return sorted(self._due)
+
+    def reserve_ids(self, max_ids: dict[str, int]) -> None:
+        """Treat ids up to max_ids[prefix] as taken (entries kept outside the list)."""
+        for prefix, n in max_ids.items():
+            if n > self._reserved_ids.get(prefix, 0):
+                self._reserved_ids[prefix] = n
 
+    def max_post_number(self, prefix: str) -> int:
+        prefix = prefix.lower()
+        return max(self._max_id.get(prefix, 0), self._reserved_ids.get(prefix, 0))
 
-def format_utc(dt: datetime) -> str:
-    """Format a datetime as an ISO-8601 UTC string."""
-    return dt.astimezone(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    def repost_candidates(self):
+        """(idx, post) of posted non-reposts, oldest posted_at first, undated last."""
+        for key in list(self._reposts):
+            yield key[2], self[key[2]]
+
+
+def as_queue(posts: list[dict[str, Any]]) -> Queue:
+    """`posts` as a Queue (itself if it already is one)."""
+    return posts if isinstance(posts, Queue) else Queue(posts)
+
+
+def update_post(posts: list[dict[str, Any]], idx: int, **fields: Any) -> dict[str, Any]:
+    """posts[idx].update(fields), keeping a Queue's indexes current."""
+    if isinstance(posts, Queue):
+        return posts.update(idx, **fields)
+    posts[idx].update(fields)
+    return posts[idx]
 
 
 # ---------------------------------------------------------------------------
 # Queue I/O
 # ---------------------------------------------------------------------------
 
-def read_queue(path: str | Path) -> list[dict[str, Any]]:
-    """Read posts from the queue JSON file."""
+def queue_backend() -> str:
+    """QUEUE_BACKEND: "json" (default) or "sqlite"."""
+    backend = os.getenv("QUEUE_BACKEND", "json").strip().lower()
+    return backend if backend in QUEUE_BACKENDS else "json"
+
+
+_stores: dict[str, Any] = {}
+_stores_lock = threading.Lock()
+
+
+def _store(path: str | Path):
+    """The open queue_store.QueueStore for `path` (one per queue file per process)."""
+    import queue_store
+
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if not _stores:
+                atexit.register(flush_queues)
+            store = _stores[key] = queue_store.QueueStore(path)
+        return store
+
+
+def flush_queues() -> None:
+    """Export every SQLite-backed queue with unsaved changes to its JSON file.
+
+    The orchestrator calls this once at the end of a run; it is also
+    registered with atexit as a backstop for callers that never do.
+    """
+    with _stores_lock:
+        for store in _stores.values():
+            try:
+                store.export_json()
+            except (OSError, ValueError) as exc:
+                log.error("Could not export %s: %s", store.json_path, exc)
+
+
+def _read_queue_json(path: str | Path) -> list[dict[str, Any]]:
     with open(path, "r", encoding="utf-8") as f:
         payload = json.load(f)
     if isinstance(payload, dict):
@@ -53,19 +277,63 @@ def read_queue(path: str | Path) -> list[dict[str, Any]]:
     raise ValueError("Queue file must be a JSON array or an object with 'posts'")
 
 
-def write_queue(path: str | Path, posts: list[dict[str, Any]]) -> None:
-    """Write posts to the queue JSON file."""
+def _write_queue_json(path: str | Path, posts: list[dict[str, Any]]) -> None:
     with open(path, "w", encoding="utf-8") as f:
-        json.dump({"posts": posts}, f, indent=2, ensure_ascii=True)
+        json.dump({"posts": [to_json(p) for p in posts]}, f, indent=2, ensure_ascii=True)
         f.write("\n")
 
 
+def _validate(raw: list[Any], path: str | Path) -> list[Post]:
+    """Entries as Post records; malformed entries are an error, odd values a warning."""
+    posts: list[Post] = []
+    for idx, item in enumerate(raw):
+        if not isinstance(item, dict):
+            raise ValueError(f"{path}: queue entry {idx} is not an object")
+        post = Post(item)
+        if "status" in post and not isinstance(post.status, PostStatus):
+            log.warning("%s: post %s has unknown status %r", path, post.id or idx, item.get("status"))
+        if post.get("scheduled_at") and post.scheduled_at is None:
+            log.warning("%s: post %s has unparseable scheduled_at %r",
+                        path, post.id or idx, post.get("scheduled_at"))
+        posts.append(post)
+    return posts
+
+
+def read_queue(path: str | Path) -> Queue:
+    """Read posts from the queue (JSON file, or its SQLite store) as validated Post records.
+
+    Ids of entries moved to the queue's archive stay reserved (see queue_archive.py).
+    """
+    import queue_archive
+
+    if queue_backend() == "sqlite":
+        queue = Queue(_validate(_store(path).load(), path))
+    else:
+        queue = Queue(_validate(_read_queue_json(path), path))
+    queue.reserve_ids(queue_archive.archived_max_ids(path))
+    return queue
+
+
+def write_queue(path: str | Path, posts: list[dict[str, Any]]) -> None:
+    """Write posts to the queue (JSON file, or its SQLite store).
+
+    In sqlite mode the changed posts are upserted in one transaction; the
+    JSON is left to flush_queues, which exports it once per run.
+    """
+    if queue_backend() == "sqlite":
+        _store(path).save(posts)
+        return
+    _write_queue_json(path, posts)
+
+
 # ---------------------------------------------------------------------------
 # Queue queries
 # ---------------------------------------------------------------------------
 
 def status_counts(posts: list[dict[str, Any]]) -> dict[str, int]:
     """Count posts by status."""
+    if isinstance(posts, Queue):
+        return posts.status_counts()
     counts: dict[str, int] = {}
     for item in posts:
         status = str(item.get("status", "unknown")).strip().lower() or "unknown"
@@ -75,12 +343,27 @@ def status_counts(posts: list[dict[str, Any]]) -> dict[str, int]:
 
 def publishable_count(posts: list[dict[str, Any]]) -> int:
     """Count posts with status 'ready' or 'approved'."""
+    if isinstance(posts, Queue):
+        return posts.count_status(*PUBLISHABLE)
     return sum(
         1 for item in posts
-        if str(item.get("status", "")).strip().lower() in {"ready", "approved"}
+        if str(item.get("status", "")).strip().lower() in PUBLISHABLE
     )
 
 
+def _is_eligible(item: dict[str, Any], now: datetime) -> bool:
+    post = as_post(item)
+    if post.status not in PUBLISHABLE:
+        return False
+    if post.scheduled_at and post.scheduled_at > now:
+        return False
+    if not post.caption.strip():
+        return False
+    if post.post_type == PostType.CAROUSEL:
+        return bool(post.carousel_images)
+    return bool(post.image_url or post.video_url)
+
+
 def find_eligible(posts: list[dict[str, Any]]) -> tuple[int, dict[str, Any]] | None:
     """Find the next post eligible for publishing.
 
@@ -90,25 +373,18 @@ def find_eligible(posts: list[dict[str, Any]]) -> tuple[int, dict[str, Any]] | N
     - scheduled_at is in the past (or unset)
     - has a caption
     - has media: carousel_images (for carousel) or image_url/video_url (for reel/single)
+
+    A Queue answers from its due index; a plain list is scanned.
     """
     now = datetime.now(timezone.utc)
+    if isinstance(posts, Queue):
+        for idx in posts.due(now):
+            if _is_eligible(posts[idx], now):
+                return idx, posts[idx]
+        return None
     for idx, item in enumerate(posts):
-        status = str(item.get("status", "")).strip().lower()
-        if status not in {"ready", "approved"}:
-            continue
-        dt = parse_scheduled_at(item.get("scheduled_at"))
-        if dt and dt > now:
-            continue
-        if not str(item.get("caption", "")).strip():
-            continue
-        post_type = str(item.get("post_type", "reel")).strip().lower()
-        if post_type == "carousel":
-            if not item.get("carousel_images"):
-                continue
-        else:
-            if not str(item.get("image_url", "")).strip() and not str(item.get("video_url", "")).strip():
-                continue
-        return idx, item
+        if _is_eligible(item, now):
+            return idx, item
     return None
 
 
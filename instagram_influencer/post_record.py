@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Typed queue entries, validated once when the queue is read.
+
+Queue entries used to stay loose dicts, and every consumer re-coerced the
+same fields on each access (str(item.get("status", "")).strip().lower(),
+parse_scheduled_at(...), isinstance(carousel_images, list), ...). A Post
+coerces the fields the pipeline reads once, in post_queue.read_queue:
+
+  status                   PostStatus (unknown values: normalized str)
+  post_type                PostType (unknown values: normalized str; default reel)
+  reel_format              lower-case str
+  scheduled_at, posted_at  UTC datetime or None
+  id, image_url            stripped str
+  caption, notes           str
+  video_url                stripped str or None
+  carousel_images          list[str]
+  video_text               list[str], stripped, blanks dropped
+
+The typed values are read-only attributes (post.status, post.scheduled_at).
+Item access (post["scheduled_at"], .get, .update, dict(post)) still sees
+the JSON form, so code written against dicts keeps working; assignments go
+through item access and are coerced on the way in.
+
+A read/write round trip reproduces the file: key order is kept, fields not
+listed above ride along in a side dict, and a field whose coerced value
+would serialize differently (" Ready", an unparseable date) keeps its raw
+value until it is next assigned. Records use __slots__, and records with
+the same key order share one key tuple.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, MutableMapping
+from datetime import datetime, timezone
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Callable
+
+
+def parse_scheduled_at(value: Any) -> datetime | None:
+    """Parse an ISO-8601 datetime string into a UTC-aware datetime."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    raw = str(value or "").strip()
+    if not raw:
+        return None
+    try:
+        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def format_utc(dt: datetime) -> str:
+    """Format a datetime as an ISO-8601 UTC string."""
+    return dt.astimezone(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class PostStatus(str, Enum):
+    DRAFT = "draft"
+    APPROVED = "approved"
+    READY = "ready"
+    POSTED = "posted"
+    FAILED = "failed"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class PostType(str, Enum):
+    REEL = "reel"
+    CAROUSEL = "carousel"
+    SINGLE = "single"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+PUBLISHABLE = frozenset({PostStatus.READY, PostStatus.APPROVED})
+
+
+# ---------------------------------------------------------------------------
+# Field coercion: raw JSON value → typed value → JSON value
+# ---------------------------------------------------------------------------
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _enum(kind: type[Enum]) -> Callable[[Any], Any]:
+    members = {m.value: m for m in kind}
+
+    def coerce(value: Any) -> Any:
+        norm = _text(value).strip().lower()
+        return members.get(norm, norm)
+    return coerce
+
+
+def _strings(value: Any) -> list[str]:
+    return [str(v) for v in value] if isinstance(value, list) else []
+
+
+def _lines(value: Any) -> list[str]:
+    return [str(t).strip() for t in value if str(t).strip()] if isinstance(value, list) else []
+
+
+def _same(value: Any) -> Any:
+    return value
+
+
+def _dump_dt(value: datetime | None) -> str | None:
+    return format_utc(value) if value else None
+
+
+# name → (coerce, dump, default raw value for an absent key)
+_FIELDS: dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any], Any]] = {
+    "id": (lambda v: _text(v).strip(), _same, None),
+    "status": (_enum(PostStatus), str, None),
+    "post_type": (_enum(PostType), str, "reel"),
+    "reel_format": (lambda v: _text(v).strip().lower(), _same, None),
+    "scheduled_at": (parse_scheduled_at, _dump_dt, None),
+    "posted_at": (parse_scheduled_at, _dump_dt, None),
+    "caption": (_text, _same, None),
+    "image_url": (lambda v: _text(v).strip(), _same, None),
+    "video_url": (lambda v: _text(v).strip() or None, _same, None),
+    "carousel_images": (_strings, _same, None),
+    "video_text": (_lines, _same, None),
+    "notes": (_text, _same, None),
+}
+
+_KEY_ORDERS: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+def _intern_keys(keys: tuple[str, ...]) -> tuple[str, ...]:
+    return _KEY_ORDERS.setdefault(keys, keys)
+
+
+class Post(MutableMapping):
+    """One queue entry: typed slots for the fields above, a dict for the rest."""
+
+    __slots__ = ("_keys", "_extra", "_raw", *(f"_{name}" for name in _FIELDS))
+
+    def __init__(self, data: Iterable[tuple[str, Any]] | dict[str, Any] = ()):
+        self._keys: tuple[str, ...] = ()
+        self._extra: dict[str, Any] | None = None
+        self._raw: dict[str, Any] | None = None
+        for name, (coerce, _, default) in _FIELDS.items():
+            setattr(self, f"_{name}", coerce(default))
+        items = data.items() if isinstance(data, dict) else data
+        keys: list[str] = []
+        for key, value in items:
+            self._set(key, value)
+            keys.append(key)
+        self._keys = _intern_keys(tuple(keys))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Post:
+        return cls(data)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The JSON object for this entry, in its original key order."""
+        return {key: self[key] for key in self._keys}
+
+    def copy(self) -> Post:
+        return Post(self.to_dict())
+
+    def _set(self, key: str, value: Any) -> None:
+        field = _FIELDS.get(key)
+        if field is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        coerce, dump, _ = field
+        typed = coerce(value)
+        setattr(self, f"_{key}", typed)
+        out = dump(typed)
+        if out != value or type(out) is not type(value):
+            if self._raw is None:
+                self._raw = {}
+            self._raw[key] = value
+        elif self._raw:
+            self._raw.pop(key, None)
+
+    # -- mapping protocol (the JSON view) -------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        field = _FIELDS.get(key)
+        if field is None:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        if key not in self._keys:
+            raise KeyError(key)
+        if self._raw and key in self._raw:
+            return self._raw[key]
+        return field[1](getattr(self, f"_{key}"))
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._set(key, value)
+        if key not in self._keys:
+            self._keys = _intern_keys(self._keys + (key,))
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._keys:
+            raise KeyError(key)
+        field = _FIELDS.get(key)
+        if field is None:
+            del self._extra[key]
+        else:
+            setattr(self, f"_{key}", field[0](field[2]))
+            if self._raw:
+                self._raw.pop(key, None)
+        self._keys = _intern_keys(tuple(k for k in self._keys if k != key))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"Post({self.to_dict()!r})"
+
+
+for _name in _FIELDS:
+    setattr(Post, _name, property(attrgetter(f"_{_name}")))
+del _name
+
+
+def as_post(item: dict[str, Any] | Post) -> Post:
+    """A typed view of a queue entry (the entry itself if it is already a Post).
+
+    For a plain dict this is a copy: read typed fields from it, but keep
+    writing to the dict.
+    """
+    return item if isinstance(item, Post) else Post(item)
+
+
+def to_json(item: dict[str, Any] | Post) -> dict[str, Any]:
+    """The JSON object for a queue entry."""
+    return item.to_dict() if isinstance(item, Post) else item
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Monthly archive of settled queue entries.
+
+content_queue.json used to keep every post forever, so each run read and
+rewrote the whole history and the workflows diffed and committed all of
+it. Settled entries older than QUEUE_ARCHIVE_DAYS now move to per-month
+files beside the queue, in the queue's own format:
+
+  data/{persona}/content_queue_archive/
+    index.json     {"version": 1,
+                    "months":  {"2026-03": {"posted": 12, "failed": 1}},
+                    "max_ids": {"maya": 42}}
+    2026-03.json   {"posts": [...]}
+
+An entry is settled when it is posted or failed and its date (posted_at,
+else scheduled_at) is older than the cutoff; with YouTube on, a posted
+entry without a youtube_video_id stays in the queue — the YouTube
+workflow uploads posted entries regardless of age, and a video path that
+is missing today may be filled in later. Undated entries stay put.
+
+Month files are read lazily: the repost picker walks them oldest first and
+stops at the first usable candidate; reports take totals from index.json.
+read_queue() seeds next_post_id() from max_ids, so archived ids are never
+handed out again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from post_queue import Queue, _read_queue_json, _write_queue_json, read_queue
+from post_record import PostStatus, as_post, to_json
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+SETTLED = frozenset({PostStatus.POSTED, PostStatus.FAILED})
+
+
+def archive_dir(queue_file: str | Path) -> Path:
+    """content_queue.json → content_queue_archive/ (same directory)."""
+    path = Path(queue_file)
+    return path.with_name(f"{path.stem}_archive")
+
+
+def _load_index(root: Path) -> dict[str, Any]:
+    try:
+        with open(root / "index.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"version": INDEX_VERSION, "months": {}, "max_ids": {}}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+        return {"version": INDEX_VERSION, "months": {}, "max_ids": {}}
+    data.setdefault("months", {})
+    data.setdefault("max_ids", {})
+    return data
+
+
+def _save_index(root: Path, index: dict[str, Any]) -> None:
+    tmp = root / f"index.json.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, root / "index.json")
+
+
+def archived_max_ids(queue_file: str | Path) -> dict[str, int]:
+    """Highest archived post number per id prefix ({} without an archive)."""
+    root = archive_dir(queue_file)
+    if not root.is_dir():
+        return {}
+    return {k: int(v) for k, v in _load_index(root)["max_ids"].items()}
+
+
+def status_totals(queue_file: str | Path) -> dict[str, int]:
+    """Archived entries by status, summed over all months (no month file is read)."""
+    root = archive_dir(queue_file)
+    if not root.is_dir():
+        return {}
+    totals: dict[str, int] = {}
+    for counts in _load_index(root)["months"].values():
+        for status, n in counts.items():
+            totals[status] = totals.get(status, 0) + int(n)
+    return totals
+
+
+def months(queue_file: str | Path) -> list[str]:
+    """Archived months ("YYYY-MM"), oldest first."""
+    root = archive_dir(queue_file)
+    if not root.is_dir():
+        return []
+    return sorted(p.stem for p in root.glob("????-??.json"))
+
+
+def iter_months(queue_file: str | Path) -> Iterator[Queue]:
+    """Each archived month as a Queue, oldest first, read only when reached."""
+    root = archive_dir(queue_file)
+    for month in months(queue_file):
+        yield read_queue(root / f"{month}.json")
+
+
+def _settled_at(item: dict[str, Any], cutoff: datetime, youtube: bool) -> datetime | None:
+    """The entry's archive date if it is settled and older than cutoff, else None."""
+    post = as_post(item)
+    if post.status not in SETTLED:
+        return None
+    dated = post.posted_at or post.scheduled_at
+    if dated is None or dated >= cutoff:
+        return None
+    if youtube and post.status == PostStatus.POSTED and not item.get("youtube_video_id"):
+        return None  # Short not uploaded yet
+    return dated
+
+
+def archive_settled(queue_file: str | Path, posts: list[dict[str, Any]], max_age_days: int,
+                    youtube: bool = False) -> int:
+    """Move settled entries older than max_age_days out of `posts` into the archive.
+
+    Month files are written before `posts` shrinks, and entries already in
+    a month file (a run that died before writing the queue) aren't added
+    twice. A Queue keeps the archived ids reserved, so next_post_id doesn't
+    hand them out again this run. The caller writes the queue. Returns the
+    number of entries moved.
+    """
+    if max_age_days <= 0:
+        return 0
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    by_month: dict[str, list[dict[str, Any]]] = {}
+    moved: set[int] = set()
+    for idx, item in enumerate(posts):
+        dated = _settled_at(item, cutoff, youtube)
+        if dated is not None:
+            by_month.setdefault(dated.strftime("%Y-%m"), []).append(item)
+            moved.add(idx)
+    if not moved:
+        return 0
+
+    root = archive_dir(queue_file)
+    root.mkdir(parents=True, exist_ok=True)
+    index = _load_index(root)
+    for month, items in sorted(by_month.items()):
+        month_file = root / f"{month}.json"
+        archived = _read_queue_json(month_file) if month_file.exists() else []
+        seen = {str(p.get("id") or "") for p in archived}
+        for item in items:
+            if not item.get("id") or str(item.get("id")) not in seen:
+                archived.append(to_json(item))
+        _write_queue_json(month_file, archived)
+        counts: dict[str, int] = {}
+        for p in archived:
+            status = str(as_post(p).status) or "unknown"
+            counts[status] = counts.get(status, 0) + 1
+        index["months"][month] = counts
+        for p in items:
+            prefix, sep, tail = as_post(p).id.lower().rpartition("-")
+            if sep and tail.isdigit() and int(tail) > index["max_ids"].get(prefix, 0):
+                index["max_ids"][prefix] = int(tail)
+    _save_index(root, index)
+
+    posts[:] = [item for idx, item in enumerate(posts) if idx not in moved]
+    if isinstance(posts, Queue):
+        posts.reserve_ids(index["max_ids"])
+    log.info("Archived %d settled post(s) into %s (%s)",
+             len(moved), root.name, ", ".join(sorted(by_month)))
+    return len(moved)
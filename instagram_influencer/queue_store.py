@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""SQLite (WAL) store behind post_queue.read_queue / write_queue.
+
+write_queue() used to re-serialize the whole content_queue.json (indent=2)
+on every change, and the orchestrator writes it up to five times a run.
+With QUEUE_BACKEND=sqlite the queue lives in a database beside the JSON:
+
+  data/{persona}/content_queue.sqlite
+    posts(key PRIMARY KEY, position, status, scheduled_at, body)
+      + indexes on status and scheduled_at
+    meta(key PRIMARY KEY, value)   ← stamp of the JSON last imported/exported
+
+A save compares each post's compact JSON against the row it was loaded
+from and upserts only the posts that changed (plus deletes for removed
+ones), in one transaction. status is stored normalized and scheduled_at
+as UTC ISO text, so the sqlite3 shell can filter the queue on either.
+
+content_queue.json stays the file the workflows commit and diff:
+  - import: on open, a JSON whose (size, mtime_ns) differs from the stamp
+    (fresh checkout, git pull, merge_yt_state.py, a hand edit) replaces
+    the database contents;
+  - export: export_json() rewrites the JSON when the database has
+    unexported changes; post_queue.flush_queues runs it once at the end
+    of each orchestrator run (and at process exit as a backstop).
+
+The database is derived from the JSON and gitignored; deleting it is safe.
+
+  python queue_store.py import data/maya/content_queue.json
+  python queue_store.py export data/maya/content_queue.json
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from post_record import as_post, format_utc, to_json
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    key          TEXT PRIMARY KEY,
+    position     INTEGER NOT NULL,
+    status       TEXT NOT NULL,
+    scheduled_at TEXT,
+    body         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_status ON posts(status, scheduled_at);
+CREATE INDEX IF NOT EXISTS posts_scheduled ON posts(scheduled_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def db_path_for(json_path: str | Path) -> Path:
+    """content_queue.json → content_queue.sqlite (same directory)."""
+    return Path(json_path).with_suffix(".sqlite")
+
+
+def _stamp(path: Path) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _columns(post: dict[str, Any]) -> tuple[str, str | None]:
+    """Indexed columns: normalized status, scheduled_at as UTC ISO (or NULL)."""
+    record = as_post(post)
+    return str(record.status) or "unknown", format_utc(record.scheduled_at) if record.scheduled_at else None
+
+
+def _keys(posts: list[dict[str, Any]]) -> list[str]:
+    """Row key per post: its id, or id#position when missing or duplicated."""
+    keys: list[str] = []
+    seen: set[str] = set()
+    for position, post in enumerate(posts):
+        key = str(post.get("id") or "").strip()
+        if not key or key in seen:
+            key = f"{key}#{position}"
+        seen.add(key)
+        keys.append(key)
+    return keys
+
+
+class QueueStore:
+    """One queue's posts in SQLite, mirrored to its JSON file on export."""
+
+    def __init__(self, json_path: str | Path):
+        self.json_path = Path(json_path)
+        self.db_path = db_path_for(json_path)
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        # key → (position, body) as last loaded/saved
+        self._rows: dict[str, tuple[int, str]] = {}
+        self._dirty = False
+        if self._meta("schema") != str(SCHEMA_VERSION):
+            self._reset()
+        if self._meta("json_stamp") != _stamp(self.json_path):
+            self.import_json()
+        else:
+            self._dirty = self._meta("dirty") == "1"
+            self._rows = {key: (position, body) for key, position, body in self.conn.execute(
+                "SELECT key, position, body FROM posts")}
+
+    # -- meta ---------------------------------------------------------------
+
+    def _meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def _reset(self) -> None:
+        self.conn.executescript("DELETE FROM posts; DELETE FROM meta;")
+        self._set_meta("schema", str(SCHEMA_VERSION))
+
+    # -- import / export ------------------------------------------------------
+
+    def import_json(self) -> int:
+        """Replace the database contents with the JSON file; returns post count."""
+        from post_queue import _read_queue_json
+
+        if self._meta("dirty") == "1":
+            log.warning("Queue JSON %s changed on disk; unexported changes in %s are replaced",
+                        self.json_path, self.db_path.name)
+        posts = _read_queue_json(self.json_path) if self.json_path.exists() else []
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.execute("DELETE FROM posts")
+            self._rows = {}
+            self._upsert(posts, _keys(posts))
+            self._set_meta("json_stamp", _stamp(self.json_path))
+            self._set_meta("dirty", "0")
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self._dirty = False
+        log.debug("Imported %d post(s) from %s", len(posts), self.json_path)
+        return len(posts)
+
+    def export_json(self, force: bool = False) -> bool:
+        """Rewrite the JSON file from the database if it has unexported changes."""
+        from post_queue import _write_queue_json
+
+        if not (self._dirty or force):
+            return False
+        _write_queue_json(self.json_path, self.load())
+        self._set_meta("json_stamp", _stamp(self.json_path))
+        self._set_meta("dirty", "0")
+        self._dirty = False
+        log.debug("Exported %s", self.json_path)
+        return True
+
+    # -- posts ----------------------------------------------------------------
+
+    def load(self) -> list[dict[str, Any]]:
+        """All posts in queue order."""
+        rows = self.conn.execute("SELECT key, position, body FROM posts ORDER BY position").fetchall()
+        self._rows = {key: (position, body) for key, position, body in rows}
+        return [json.loads(body) for _, _, body in rows]
+
+    def _upsert(self, posts: list[dict[str, Any]], keys: list[str]) -> int:
+        changed = 0
+        for position, (key, post) in enumerate(zip(keys, posts)):
+            body = json.dumps(to_json(post), ensure_ascii=True, separators=(",", ":"))
+            if self._rows.get(key) == (position, body):
+                continue
+            status, scheduled_at = _columns(post)
+            self.conn.execute(
+                "INSERT INTO posts(key, position, status, scheduled_at, body) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET position = excluded.position, "
+                "status = excluded.status, scheduled_at = excluded.scheduled_at, body = excluded.body",
+                (key, position, status, scheduled_at, body),
+            )
+            self._rows[key] = (position, body)
+            changed += 1
+        return changed
+
+    def save(self, posts: list[dict[str, Any]]) -> int:
+        """Upsert changed posts and delete removed ones; returns rows written."""
+        keys = _keys(posts)
+        gone = set(self._rows) - set(keys)
+        self.conn.execute("BEGIN")
+        try:
+            changed = self._upsert(posts, keys)
+            for key in gone:
+                self.conn.execute("DELETE FROM posts WHERE key = ?", (key,))
+                del self._rows[key]
+            if changed or gone:
+                self._set_meta("dirty", "1")
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        if changed or gone:
+            self._dirty = True
+            log.debug("Queue store: %d upserted, %d deleted", changed, len(gone))
+        return changed + len(gone)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import/export a queue's SQLite store")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("queue_file", help="path to content_queue.json")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    store = QueueStore(args.queue_file)
+    try:
+        if args.action == "import":
+            print(f"Imported {store.import_json()} post(s) into {store.db_path}")
+        else:
+            store.export_json(force=True)
+            print(f"Exported {len(store.load())} post(s) to {store.json_path}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache for rendered videos.
+
+A render is identified by a SHA-256 over the bytes of every input image plus
+the render parameters (dimensions, duration, text lines, filter graph, encoder
+settings, and the bytes of the background track when one is baked in — the
+track is picked before the lookup, so a repost doesn't reuse the old pick). Identical renders — e.g. a repost that reuses the original photos,
+or a YT video re-requested after its file went missing — are served from the
+cache by copying the stored MP4 to the requested path.
+
+Layout:
+  data/{persona}/generated_images/.render_cache/
+    index.json        ← {key: {"size": bytes, "last_used": unix_ts}}
+    <key>.mp4
+
+Eviction is LRU by total bytes (RENDER_CACHE_MAX_MB, default 2048).
+Set RENDER_CACHE=0 to disable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from persona import persona_images_dir
+
+log = logging.getLogger(__name__)
+
+# Bump when a renderer change should invalidate every cached output
+CACHE_VERSION = 1
+
+_lock = threading.Lock()
+_digests: dict[tuple[str, int, int], str] = {}  # (path, size, mtime_ns) → sha256
+
+
+def _enabled() -> bool:
+    return os.getenv("RENDER_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _max_bytes() -> int:
+    raw = os.getenv("RENDER_CACHE_MAX_MB", "").strip()
+    return (int(raw) if raw else 2048) * 1024 * 1024
+
+
+def cache_dir() -> Path:
+    d = persona_images_dir() / ".render_cache"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's bytes, memoized per (path, size, mtime)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _digests.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _digests[memo_key] = digest
+    return digest
+
+
+def render_key(kind: str, inputs: list[str], params: dict[str, Any]) -> str:
+    """Build the cache key for a render of `inputs` with `params`."""
+    h = hashlib.sha256()
+    h.update(f"{kind}:v{CACHE_VERSION}".encode())
+    for path in inputs:
+        h.update(file_digest(path).encode())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:32]
+
+
+def _load_index(d: Path) -> dict[str, dict[str, Any]]:
+    try:
+        with open(d / "index.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_index(d: Path, index: dict[str, dict[str, Any]]) -> None:
+    tmp = d / "index.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp, d / "index.json")
+
+
+def _copy(src: Path | str, dst: Path | str) -> None:
+    """Copy src → dst atomically.
+
+    A real copy, not a hard link: ffmpeg -y truncates its output in place,
+    which would corrupt a cache entry sharing the inode.
+    """
+    tmp = f"{dst}.tmp{os.getpid()}.{threading.get_ident()}"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def fetch(key: str, output_path: str) -> bool:
+    """Materialize a cached render at output_path. Returns True on a hit."""
+    if not _enabled():
+        return False
+    with _lock:
+        d = cache_dir()
+        cached = d / f"{key}.mp4"
+        if not cached.exists():
+            return False
+        index = _load_index(d)
+        try:
+            if os.path.abspath(output_path) != os.path.abspath(cached):
+                _copy(cached, output_path)
+        except OSError as exc:
+            log.warning("Render cache fetch failed for %s: %s", key, exc)
+            return False
+        entry = index.setdefault(key, {"size": cached.stat().st_size})
+        entry["last_used"] = time.time()
+        _save_index(d, index)
+    log.info("Render cache hit: %s → %s", key[:12], output_path)
+    return True
+
+
+def store(key: str, output_path: str) -> None:
+    """Add a finished render to the cache, then evict down to the size budget."""
+    if not _enabled() or not os.path.exists(output_path):
+        return
+    with _lock:
+        d = cache_dir()
+        try:
+            _copy(output_path, d / f"{key}.mp4")
+        except OSError as exc:
+            log.warning("Render cache store failed for %s: %s", key, exc)
+            return
+        index = _load_index(d)
+        index[key] = {"size": os.path.getsize(output_path), "last_used": time.time()}
+        _evict(d, index, _max_bytes())
+        _save_index(d, index)
+
+
+def _evict(d: Path, index: dict[str, dict[str, Any]], max_bytes: int) -> None:
+    """Drop least-recently-used entries until the cache fits in max_bytes."""
+    total = sum(int(e.get("size", 0)) for e in index.values())
+    for key in sorted(index, key=lambda k: index[k].get("last_used", 0)):
+        if total <= max_bytes:
+            break
+        total -= int(index[key].get("size", 0))
+        del index[key]
+        try:
+            os.remove(d / f"{key}.mp4")
+        except OSError:
+            pass
+        log.debug("Render cache evicted %s", key[:12])
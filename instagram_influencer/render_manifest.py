@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Persistent manifest of video render jobs, so an interrupted build resumes.
+
+convert_posts_to_video() only hands results back to the queue once every
+job has finished, and the orchestrator writes content_queue.json after
+that. If the run is killed in between (scheduler timeout, CI cancel), the
+renders that did finish would be redone next time. The manifest records
+each job's state as it changes and is rewritten atomically every time:
+
+  data/{persona}/render_manifest.json
+    {"version": 1, "jobs": {
+      "<output path>": {"state": "done", "target": "yt", "input_hash": "…",
+                        "inputs": [...], "post_ids": [...],
+                        "updated_at": 1767225600.0, "error": ""}}}
+
+States: queued → rendering → done | failed. Renders are written to
+generated_images/.render_parts/ under a name unique to the job and the
+process, and renamed into place on success, so a file at the output path
+is always complete and concurrent jobs never share a part file. A job that is "done" with the
+same input hash and whose output is still on disk is adopted on the next
+run instead of being encoded again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from persona import persona_data_dir, persona_images_dir
+
+log = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+QUEUED = "queued"
+RENDERING = "rendering"
+DONE = "done"
+FAILED = "failed"
+
+# Entries untouched for this long are dropped on save
+_RETENTION_SECONDS = 30 * 86400
+
+# Part files older than this were left by a killed run
+_STALE_PART_SECONDS = 86400
+
+
+def parts_dir() -> Path:
+    """Scratch dir for in-progress renders (same filesystem as pending/)."""
+    d = persona_images_dir() / ".render_parts"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def sweep_parts() -> int:
+    """Delete part files a killed run left behind; returns the count."""
+    cutoff = time.time() - _STALE_PART_SECONDS
+    removed = 0
+    for part in parts_dir().iterdir():
+        try:
+            if part.is_file() and part.stat().st_mtime < cutoff:
+                part.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class RenderManifest:
+    """Job states for one persona, persisted after every change."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.jobs: dict[str, dict[str, Any]] = self._load()
+
+    @classmethod
+    def load(cls) -> RenderManifest:
+        return cls(persona_data_dir() / "render_manifest.json")
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as exc:
+            log.warning("Render manifest unreadable, starting fresh: %s", exc)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        jobs = data.get("jobs")
+        return jobs if isinstance(jobs, dict) else {}
+
+    def _save(self) -> None:
+        cutoff = time.time() - _RETENTION_SECONDS
+        self.jobs = {k: v for k, v in self.jobs.items() if v.get("updated_at", 0) >= cutoff}
+        tmp = self.path.with_name(f"{self.path.name}.tmp{os.getpid()}")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "jobs": self.jobs}, f,
+                          indent=2, sort_keys=True)
+                f.write("\n")
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            log.warning("Could not write render manifest: %s", exc)
+
+    def adoptable(self, output_path: str, input_hash: str) -> bool:
+        """True when output_path is a finished render of exactly these inputs."""
+        entry = self.jobs.get(output_path)
+        return (
+            entry is not None
+            and entry.get("state") == DONE
+            and entry.get("input_hash") == input_hash
+            and os.path.exists(output_path)
+            and os.path.getsize(output_path) > 0
+        )
+
+    def mark(self, output_path: str, state: str, **fields: Any) -> None:
+        """Set a job's state (plus any extra fields) and persist the manifest."""
+        with self._lock:
+            entry = self.jobs.setdefault(output_path, {})
+            entry.update(fields)
+            entry["state"] = state
+            entry["updated_at"] = time.time()
+            if state != FAILED:
+                entry.pop("error", None)
+            self._save()
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for entry in self.jobs.values():
+            state = entry.get("state", "")
+            counts[state] = counts.get(state, 0) + 1
+        return counts
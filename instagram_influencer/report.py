@@ -15,6 +15,7 @@ from pathlib import Path
 from typing import Any
 
 from persona import get_persona, persona_data_dir
+from queue_archive import status_totals as archived_status_totals
 
 log = logging.getLogger(__name__)
 
@@ -72,8 +73,8 @@ def generate_report() -> str:
             t = a.get("type", "unknown")
             counts[t] = counts.get(t, 0) + 1
 
-    # Queue stats
-    status_counts: dict[str, int] = {}
+    # Queue stats (archived posts are counted from the archive index)
+    status_counts: dict[str, int] = archived_status_totals(_queue_file())
     for p in queue:
         s = p.get("status", "unknown")
         status_counts[s] = status_counts.get(s, 0) + 1
@@ -3,26 +3,36 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import random
+import shutil
 import tempfile
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import requests as http_requests
 from PIL import Image, ImageDraw, ImageFont
 
+import plates
 from config import BASE_DIR, Config
-from persona import get_persona, persona_data_dir
+from persona import get_persona, persona_data_dir, persona_images_dir
+from render_cache import file_digest
 from publisher import _is_challenge_error, ChallengeAbort
 
 log = logging.getLogger(__name__)
 
 QUEUE_FILE = BASE_DIR / "content_queue.json"
 
+# Finished story assets (generated_images/.stories/) — bump when the look changes
+_STORY_VERSION = 1
+_STORY_CACHE_DAYS = 30
+
 # Text overlays — randomly picked per story
 _OVERLAY_TEXTS = [
     "In case you missed it",
@@ -465,123 +475,134 @@ def _download_post_image(cl: Any, media_pk: int) -> tuple[str | None, str | None
         return None, None
 
 
-def _create_story_image(image_path: str, caption_text: str = "") -> str:
-    """Create a story-sized image from the post thumbnail.
+def _stories_dir() -> Path:
+    d = persona_images_dir() / ".stories"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
 
-    Fits the image into 9:16 story frame with blurred background fill
-    (preserves full image content — no cropping). Adds a subtle text
-    overlay at the bottom with a random CTA.
 
-    Returns path to the story image (caller must clean up).
+def _cached_story_asset(name: str, build) -> str:
+    """Temp copy of a finished story asset, rendered by build() on a miss.
+
+    Assets are cached under generated_images/.stories/ (content-keyed
+    names), so a retried reshare or a re-posted thumbnail is a file copy.
+    Entries unused for _STORY_CACHE_DAYS are pruned on the next write.
+    Returns a temp file the caller removes.
     """
-    from PIL import ImageFilter
+    cached = _stories_dir() / name
+    if not cached.exists():
+        tmp = cached.with_name(f"{name}.tmp{os.getpid()}")
+        build().save(tmp, "JPEG", quality=92)
+        os.replace(tmp, cached)
+        _prune_story_cache()
+    else:
+        os.utime(cached)  # keep hot entries from being pruned
 
-    target_w, target_h = 1080, 1920
-    img = Image.open(image_path).convert("RGB")
+    fd, out_path = tempfile.mkstemp(suffix=".jpg", prefix="story_img_")
+    os.close(fd)
+    shutil.copyfile(cached, out_path)
+    return out_path
 
-    # Fit-with-blur: show FULL image with blurred fill for empty space
-    src_w, src_h = img.size
-    target_ratio = target_w / target_h
 
-    # Create blurred background (cover-scale + blur)
-    src_ratio = src_w / src_h
-    if src_ratio > target_ratio:
-        bg_h = target_h
-        bg_w = int(bg_h * src_ratio)
-    else:
-        bg_w = target_w
-        bg_h = int(bg_w / src_ratio)
-    bg = img.resize((bg_w, bg_h), Image.LANCZOS)
-    # Center-crop background to target
-    left = (bg_w - target_w) // 2
-    top = (bg_h - target_h) // 2
-    bg = bg.crop((left, top, left + target_w, top + target_h))
-    bg = bg.filter(ImageFilter.GaussianBlur(radius=25))
-    # Slight dim
-    dim = Image.new("RGB", (target_w, target_h), (0, 0, 0))
-    bg = Image.blend(bg, dim, alpha=0.20)
-
-    # Fit foreground (maintain aspect ratio, fit inside target)
-    if src_ratio > target_ratio:
-        fg_w = target_w
-        fg_h = int(fg_w / src_ratio)
-    else:
-        fg_h = target_h
-        fg_w = int(fg_h * src_ratio)
-    # Leave room for text at bottom (use 80% of height)
-    max_fg_h = int(target_h * 0.78)
-    if fg_h > max_fg_h:
-        fg_h = max_fg_h
-        fg_w = int(fg_h * src_ratio)
-    fg = img.resize((fg_w, fg_h), Image.LANCZOS)
-
-    # Paste foreground centered (shifted slightly up for text room)
-    x_offset = (target_w - fg_w) // 2
-    y_offset = (target_h - fg_h) // 2 - int(target_h * 0.05)
-    y_offset = max(0, y_offset)
-    bg.paste(fg, (x_offset, y_offset))
-
-    # Add text overlay at bottom
-    overlay_text = random.choice(_OVERLAY_TEXTS)
-    overlay = Image.new("RGBA", (target_w, target_h), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
-    bar_h = int(target_h * 0.10)
-    bar_top = target_h - bar_h
-    draw.rectangle([(0, bar_top), (target_w, target_h)], fill=(0, 0, 0, 120))
+def _prune_story_cache() -> None:
+    cutoff = time.time() - _STORY_CACHE_DAYS * 86400
+    with os.scandir(_stories_dir()) as it:
+        for entry in it:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
 
-    font_size = int(bar_h * 0.40)
-    try:
-        font = ImageFont.truetype(
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
-    except (OSError, IOError):
-        font = ImageFont.load_default()
 
-    bbox = draw.textbbox((0, 0), overlay_text, font=font)
-    text_w = bbox[2] - bbox[0]
-    text_h = bbox[3] - bbox[1]
-    text_x = (target_w - text_w) // 2
-    text_y = bar_top + (bar_h - text_h) // 2
-    draw.text((text_x, text_y), overlay_text, fill=(255, 255, 255, 230), font=font)
+def _create_story_image(image_path: str, caption_text: str = "") -> str:
+    """Create a story-sized image from the post thumbnail.
 
-    result = Image.alpha_composite(bg.convert("RGBA"), overlay).convert("RGB")
+    Fits the image into 9:16 story frame with blurred background fill
+    (preserves full image content — no cropping). Adds a subtle text
+    overlay at the bottom with a CTA picked per image (seeded by its
+    content, so a retry renders — and caches — the same story).
 
-    fd, out_path = tempfile.mkstemp(suffix=".jpg", prefix="story_img_")
-    os.close(fd)
-    result.save(out_path, "JPEG", quality=92)
+    Returns path to the story image (caller must clean up).
+    """
+    target_w, target_h = 1080, 1920
+    digest = file_digest(image_path)
+    overlay_text = random.Random(digest).choice(_OVERLAY_TEXTS)
+
+    def build() -> Image.Image:
+        # Fit-with-blur: show FULL image with blurred fill for empty space.
+        # Both layers come from the shared plate cache (same background as the
+        # 9:16 YouTube render of this image).
+        bg = plates.background(image_path, target_w, target_h)
+        # Leave room for text at bottom (foreground uses 78% of height)
+        fg = plates.foreground(image_path, target_w, int(target_h * 0.78))
+        fg_w, fg_h = fg.size
+
+        # Paste foreground centered (shifted slightly up for text room)
+        x_offset = (target_w - fg_w) // 2
+        y_offset = (target_h - fg_h) // 2 - int(target_h * 0.05)
+        y_offset = max(0, y_offset)
+        bg.paste(fg, (x_offset, y_offset))
+
+        # Add text overlay at bottom
+        overlay = Image.new("RGBA", (target_w, target_h), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+        bar_h = int(target_h * 0.10)
+        bar_top = target_h - bar_h
+        draw.rectangle([(0, bar_top), (target_w, target_h)], fill=(0, 0, 0, 120))
+
+        font_size = int(bar_h * 0.40)
+        try:
+            font = ImageFont.truetype(
+                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
+        except (OSError, IOError):
+            font = ImageFont.load_default()
+
+        bbox = draw.textbbox((0, 0), overlay_text, font=font)
+        text_w = bbox[2] - bbox[0]
+        text_h = bbox[3] - bbox[1]
+        text_x = (target_w - text_w) // 2
+        text_y = bar_top + (bar_h - text_h) // 2
+        draw.text((text_x, text_y), overlay_text, fill=(255, 255, 255, 230), font=font)
+
+        return Image.alpha_composite(bg.convert("RGBA"), overlay).convert("RGB")
+
+    key = hashlib.sha256(
+        f"{_STORY_VERSION}:{digest}:{overlay_text}".encode()
+    ).hexdigest()[:24]
+    out_path = _cached_story_asset(f"img_{key}.jpg", build)
     log.info("Created story image from post thumbnail (%dx%d)", target_w, target_h)
     return out_path
 
 
+# Light gradients for the blank story background — visible in thumbnails (not black)
+_STORY_GRADIENTS = [
+    ((180, 160, 200), (220, 180, 210)),   # soft lavender
+    ((170, 190, 210), (200, 210, 230)),    # soft blue
+    ((210, 180, 180), (230, 200, 200)),    # soft rose
+    ((180, 200, 190), (200, 220, 210)),    # soft mint
+    ((200, 185, 210), (220, 200, 225)),    # soft mauve
+]
+
+
 def _create_blank_story_bg() -> str:
     """Fallback: create a light gradient background for the story.
 
     Used only when the post image can't be fetched.
     """
     w, h = 1080, 1920
-    img = Image.new("RGB", (w, h))
-    draw = ImageDraw.Draw(img)
-
-    # Light gradients — visible in thumbnails (not black)
-    gradients = [
-        ((180, 160, 200), (220, 180, 210)),   # soft lavender
-        ((170, 190, 210), (200, 210, 230)),    # soft blue
-        ((210, 180, 180), (230, 200, 200)),    # soft rose
-        ((180, 200, 190), (200, 220, 210)),    # soft mint
-        ((200, 185, 210), (220, 200, 225)),    # soft mauve
-    ]
-    top_color, bot_color = random.choice(gradients)
-
-    for y in range(h):
-        ratio = y / h
-        r = int(top_color[0] + (bot_color[0] - top_color[0]) * ratio)
-        g = int(top_color[1] + (bot_color[1] - top_color[1]) * ratio)
-        b = int(top_color[2] + (bot_color[2] - top_color[2]) * ratio)
-        draw.line([(0, y), (w, y)], fill=(r, g, b))
-
-    fd, tmp_path = tempfile.mkstemp(suffix=".jpg", prefix="story_bg_")
-    os.close(fd)
-    img.save(tmp_path, "JPEG", quality=85)
-    return tmp_path
+    top_color, bot_color = random.choice(_STORY_GRADIENTS)
+
+    def build() -> Image.Image:
+        # One 1px column in NumPy (same truncation as the old per-line loop),
+        # stretched across the width
+        ratio = (np.arange(h) / h)[:, None]
+        top, bot = np.array(top_color), np.array(bot_color)
+        column = (top + (bot - top) * ratio).astype(np.uint8)
+        return Image.fromarray(column[:, None, :], "RGB").resize((w, h), Image.NEAREST)
+
+    name = f"bg_{_STORY_VERSION}_{'-'.join(map(str, top_color + bot_color))}.jpg"
+    return _cached_story_asset(name, build)
 
 
 def reshare_post_to_story(cl: Any, media_pk: int, user_pk: int) -> str | None:
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""NumPy synthesizer for the generated background tracks.
+
+Renders the same layers as the ffmpeg `aevalsrc` graphs in audio.py —
+detuned chord pads, sub-bass, pink-noise texture, kick and hi-hat — as
+arrays, and writes 16-bit PCM WAV with the stdlib `wave` module. ffmpeg
+evaluates the chord expression per sample through its expression parser,
+which dominates the runtime for long progressions; here each layer is a
+handful of vectorized sin() calls.
+
+All filtering (the noise band-passes, the final lowpass and the mid-range
+EQ) happens in one pass in the frequency domain using the magnitude
+response of ffmpeg's 2-pole filters. FFT filtering is circular, so a bed
+rendered without fades loops without a seam.
+
+The mix is scaled to roughly -16 LUFS / -1.5 dBFS peak with a linear gain
+computed from a K-weighted spectrum (ungated — the tracks are steady beds),
+so no analysis pass is needed here; loudness.py measures the written file
+once and applies the exact gain at mux time.
+"""
+
+from __future__ import annotations
+
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+TARGET_LUFS = -16.0
+TRUE_PEAK_DB = -1.5
+
+
+# ---------------------------------------------------------------------------
+# Frequency-domain filters (magnitude responses)
+# ---------------------------------------------------------------------------
+
+def _lowpass(f: np.ndarray, cutoff: float) -> np.ndarray:
+    return 1.0 / np.sqrt(1.0 + (f / cutoff) ** 4)
+
+
+def _highpass(f: np.ndarray, cutoff: float) -> np.ndarray:
+    r = (f / cutoff) ** 2
+    return r / np.sqrt(1.0 + r * r)
+
+
+def _peaking(f: np.ndarray, center: float, octaves: float, gain_db: float) -> np.ndarray:
+    """Bell boost on a log-frequency axis, `octaves` wide at half gain."""
+    with np.errstate(divide="ignore"):
+        distance = np.log2(np.maximum(f, 1.0) / center)
+    sigma = octaves / 2.355  # FWHM → standard deviation
+    return 10 ** (gain_db * np.exp(-0.5 * (distance / sigma) ** 2) / 20)
+
+
+def _k_weighting_power(f: np.ndarray) -> np.ndarray:
+    """|H|² of the BS.1770 K-weighting (high shelf +4 dB, 38 Hz highpass)."""
+    shelf = (1.0 + 10 ** 0.4 * (f / 1681.0) ** 2) / (1.0 + (f / 1681.0) ** 2)
+    hp = (f / 38.0) ** 4
+    return shelf * hp / (1.0 + hp)
+
+
+def _noise_spectrum(rng: np.random.Generator, n: int, freqs: np.ndarray,
+                    pink: bool) -> np.ndarray:
+    """Spectrum of uniform white noise in [-1, 1], optionally tilted to 1/f."""
+    spectrum = np.fft.rfft(rng.uniform(-1.0, 1.0, n))
+    if pink:
+        tilt = np.zeros_like(freqs)
+        tilt[1:] = freqs[1:] ** -0.5
+        tilt /= np.sqrt(np.mean(tilt ** 2))  # keep the white noise's variance
+        spectrum *= tilt
+    return spectrum
+
+
+# ---------------------------------------------------------------------------
+# Mastering + output
+# ---------------------------------------------------------------------------
+
+def _master(spectrum: np.ndarray, freqs: np.ndarray, n: int) -> np.ndarray:
+    """Loudness-normalize a mixed spectrum and return the time-domain signal."""
+    # Parseval: mean square of the K-weighted signal straight from the bins
+    power = np.abs(spectrum) ** 2 * _k_weighting_power(freqs)
+    power[1:-1] *= 2  # one-sided spectrum
+    mean_square = power.sum() / (n * n)
+    loudness = -0.691 + 10 * np.log10(max(mean_square, 1e-12))
+
+    signal = np.fft.irfft(spectrum, n)
+    signal *= 10 ** ((TARGET_LUFS - loudness) / 20)
+    ceiling = 10 ** (TRUE_PEAK_DB / 20)
+    peak = np.abs(signal).max(initial=0.0)
+    if peak > ceiling:
+        signal *= ceiling / peak
+    return signal
+
+
+def _fade(signal: np.ndarray, fade_in: float, fade_out: float) -> None:
+    """Linear fade in/out in place (afade's default 'tri' curve)."""
+    n_in = min(len(signal), int(fade_in * SAMPLE_RATE))
+    n_out = min(len(signal), int(fade_out * SAMPLE_RATE))
+    if n_in:
+        signal[:n_in] *= np.linspace(0.0, 1.0, n_in, endpoint=False)
+    if n_out:
+        signal[-n_out:] *= np.linspace(1.0, 0.0, n_out)
+
+
+def write_wav(path: str, signal: np.ndarray) -> None:
+    """Write a mono float signal in [-1, 1] as 16-bit PCM WAV."""
+    pcm = (np.clip(signal, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+
+
+# ---------------------------------------------------------------------------
+# Tracks
+# ---------------------------------------------------------------------------
+
+def render_lofi(prog: dict, duration: float, path: str, *,
+                chord_dur: float, bpm: float, fade: bool = True,
+                seed: int | None = None) -> None:
+    """Render a lo-fi progression to `path` (see audio._lofi_cmd for the layers)."""
+    n = int(round(duration * SAMPLE_RATE))
+    t = np.arange(n) / SAMPLE_RATE
+    freqs = np.fft.rfftfreq(n, 1 / SAMPLE_RATE)
+    rng = np.random.default_rng(seed)
+
+    # Which chord of the progression each sample falls in
+    n_chords = len(prog["chords"])
+    chord_idx = np.minimum((np.mod(t, n_chords * chord_dur) // chord_dur).astype(np.intp),
+                           n_chords - 1)
+
+    # Chord pads: main + detuned (+1.5 Hz) + octave-up per note
+    chords = np.array(prog["chords"])
+    pad = np.zeros(n)
+    amp = 0.10
+    for note in range(chords.shape[1]):
+        f = chords[chord_idx, note]
+        pad += amp * np.sin(2 * np.pi * f * t)
+        pad += amp * 0.7 * np.sin(2 * np.pi * (f + 1.5) * t)
+        pad += amp * 0.5 * np.sin(2 * np.pi * 2 * f * t)
+
+    bass = 0.14 * np.sin(2 * np.pi * np.array(prog["bass"])[chord_idx] * t)
+
+    # Kick: 55 Hz thump with an exponential decay every 2 beats
+    beat = np.mod(t, 2 * 60.0 / bpm)
+    kick = 0.22 * np.sin(2 * np.pi * 55 * t) * np.exp(-8 * beat) * (beat < 0.15)
+
+    # amix normalizes by the weight sum (1 + 0.8 + 0.5 + 0.7 + 0.4)
+    w_pad, w_bass, w_noise, w_kick, w_hat = 1, 0.8, 0.5, 0.7, 0.4
+    norm = w_pad + w_bass + w_noise + w_kick + w_hat
+    tonal = (w_pad * pad + w_bass * bass + w_kick * kick) / norm
+
+    vinyl = _noise_spectrum(rng, n, freqs, pink=True) * (
+        _lowpass(freqs, 800) * _highpass(freqs, 200) * 0.07)
+    hat = _noise_spectrum(rng, n, freqs, pink=False) * (
+        _highpass(freqs, 7000) * _lowpass(freqs, 14000) * 0.025)
+
+    spectrum = np.fft.rfft(tonal) + (w_noise * vinyl + w_hat * hat) / norm
+    spectrum *= _lowpass(freqs, 12000) * _peaking(freqs, 400, 2, 3)
+
+    signal = _master(spectrum, freqs, n)
+    if fade:
+        _fade(signal, 0.8, 1.2)
+    write_wav(path, signal)
+
+
+def render_ambient(duration: float, path: str, seed: int | None = None) -> None:
+    """Render the warm Am7 pad used when the lo-fi track can't be built."""
+    n = int(round(duration * SAMPLE_RATE))
+    t = np.arange(n) / SAMPLE_RATE
+    freqs = np.fft.rfftfreq(n, 1 / SAMPLE_RATE)
+    rng = np.random.default_rng(seed)
+
+    def tone(freq: float) -> np.ndarray:
+        return np.sin(2 * np.pi * freq * t)
+
+    def lfo(rate: float, depth: float = 0.3) -> np.ndarray:
+        return 1 + depth * np.sin(2 * np.pi * rate * t)
+
+    pad = (
+        0.12 * lfo(0.4) * tone(220) + 0.08 * tone(222)        # A3 + detune
+        + 0.10 * lfo(0.5) * tone(261.6) + 0.07 * tone(263.6)  # C4
+        + 0.09 * lfo(0.6) * tone(329.6) + 0.06 * tone(331.6)  # E4
+        + 0.06 * lfo(0.35) * tone(392)                         # G4
+        + 0.10 * lfo(0.3, 0.2) * tone(110)                     # A2 sub-bass
+    )
+    texture = _noise_spectrum(rng, n, freqs, pink=True) * (
+        _lowpass(freqs, 600) * _highpass(freqs, 100) * 0.08)
+
+    spectrum = (np.fft.rfft(pad) + texture) / 2  # amix of two inputs
+    spectrum *= _lowpass(freqs, 10000)
+
+    signal = _master(spectrum, freqs, n)
+    _fade(signal, 0.6, 0.8)
+    write_wav(path, signal)
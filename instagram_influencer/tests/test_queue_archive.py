@@ -0,0 +1,55 @@
+"""queue_archive.archive_settled keeps archived ids out of next_post_id."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from persona import next_post_id, use_persona
+from post_queue import read_queue
+from queue_archive import archive_settled, archived_max_ids
+
+
+def _post(post_id: str, status: str, posted_at: str | None = None) -> dict:
+    post = {"id": post_id, "status": status, "caption": "c", "image_url": "i.jpg"}
+    if posted_at:
+        post["posted_at"] = posted_at
+    return post
+
+
+class ArchiveSettledTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.queue_file = Path(tmp.name) / "content_queue.json"
+        self.queue_file.write_text(json.dumps({"posts": [
+            _post("maya-001", "posted", "2020-01-05T10:00:00Z"),
+            _post("maya-002", "posted", "2020-01-06T10:00:00Z"),
+        ]}), encoding="utf-8")
+        self.enterContext(use_persona("maya"))
+
+    def test_archived_ids_not_reused_in_same_run(self) -> None:
+        posts = read_queue(self.queue_file)
+        self.assertEqual(archive_settled(self.queue_file, posts, max_age_days=30), 2)
+        self.assertEqual(len(posts), 0)
+        self.assertEqual(archived_max_ids(self.queue_file), {"maya": 2})
+        self.assertEqual(next_post_id(posts), "maya-003")
+
+    def test_reservation_survives_later_appends(self) -> None:
+        posts = read_queue(self.queue_file)
+        archive_settled(self.queue_file, posts, max_age_days=30)
+        posts.append(_post(next_post_id(posts), "draft"))
+        self.assertEqual(posts[0]["id"], "maya-003")
+        self.assertEqual(next_post_id(posts), "maya-004")
+
+    def test_nothing_settled_leaves_queue_alone(self) -> None:
+        posts = read_queue(self.queue_file)
+        self.assertEqual(archive_settled(self.queue_file, posts, max_age_days=0), 0)
+        self.assertEqual(len(posts), 2)
+        self.assertEqual(next_post_id(posts), "maya-003")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,16 +10,38 @@
 
 from __future__ import annotations
 
+import hashlib
+import io
+import json
 import logging
 import os
+import re
+import shutil
 import subprocess
 import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
-from audio import get_background_track, trim_audio, _safe_remove as _audio_safe_remove
+import ffmpeg_caps
+import framepipe
+import loudness
+import plates
+import render_cache
+from render_manifest import (
+    DONE, FAILED, QUEUED, RENDERING, RenderManifest, parts_dir, sweep_parts,
+)
+from audio import get_background_track, _safe_remove as _audio_safe_remove
+from persona import persona_images_dir
+from post_record import PostStatus, PostType, as_post
 
 log = logging.getLogger(__name__)
 
@@ -36,9 +58,30 @@ YT_DURATION = 10  # slightly longer for YouTube's retention-based algorithm
 # Montage: per-image duration for carousel → Reel conversion
 IG_MONTAGE_PER_IMAGE = 6  # 5 images × 6s = 30s Reel (sweet spot for shares)
 YT_MONTAGE_PER_IMAGE = 5  # 5 images × 5s = 25s Short
+MONTAGE_XFADE = 0.5       # crossfade between montage slides (seconds)
 
 FPS = 30
 
+# Named libx264 profiles (the resolved args are part of the render cache key).
+# Choose with VIDEO_ENCODER_PROFILE or the encoder_profile argument;
+# `python -m benchmarks.encoder_profiles` compares them on pending images.
+#   draft        — quick previews
+#   publish      — what gets uploaded (the long-standing fast/crf 23)
+#   archive      — high-quality masters
+#   intermediate — legacy per-clip renders that the concat step re-encodes:
+#                  fastest preset at near-lossless quality
+# The static-content tunings (-tune stillimage, a long GOP with scenecut=0)
+# are left out: every frame carries Ken Burns motion, which is not the still
+# content they target. `python -m benchmarks.encoder_profiles --tuning`
+# measures them against publish/archive — adopt one only if it wins there.
+ENCODER_PROFILES: dict[str, list[str]] = {
+    "draft": ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "28"],
+    "publish": ["-c:v", "libx264", "-preset", "fast", "-crf", "23"],
+    "archive": ["-c:v", "libx264", "-preset", "slow", "-crf", "18"],
+    "intermediate": ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "16"],
+}
+DEFAULT_ENCODER_PROFILE = "publish"
+
 # Hook-photo reel: variable frame durations for viral pacing
 # Hook = fast snap (grabs attention), photo = hold (let them absorb),
 # bridge = quick (curiosity), CTA = linger (drives action)
@@ -50,6 +93,26 @@ CTA_DUR = 2.5        # CTA: longer so viewer registers the action
 # Legacy constant for montage calls (used by non-hook reels)
 HOOK_REEL_PER_FRAME = 2  # seconds per frame (fallback)
 
+# Ken Burns motion engines (KEN_BURNS_ENGINE env var):
+#   "plate"   — cached plates.py background + foreground (the same plates
+#               stories use) composited at target size once; single-photo
+#               reels stream framepipe.ken_burns frames (sub-pixel motion),
+#               filter graphs upscale the plate 2x for zoompan (default)
+#   "zoompan" — split/gblur/overlay at 2x, zoompan from the 2x frame;
+#               see `python -m benchmarks.kenburns`
+KEN_BURNS_ENGINES = ("plate", "zoompan")
+
+# Hook-photo reel renderers (HOOK_REEL_RENDERER env var):
+#   "pipe"  — frames composed in Python (plates + text frames in memory)
+#             and streamed raw to one ffmpeg encoder; see framepipe.py
+#   "graph" — one filter_complex graph over temp JPEG inputs
+# Either falls back to the per-clip renderer if ffmpeg rejects it.
+HOOK_REEL_RENDERERS = ("pipe", "graph")
+DEFAULT_HOOK_REEL_RENDERER = "pipe"
+
+# CTA text frames are gold so the action stands out
+_CTA_TEXT_COLOR = (255, 215, 0)
+
 # Font for text overlays — DejaVu is available on Ubuntu (GitHub Actions)
 # Falls back to "Sans" if not found (ffmpeg default)
 _FONT_PATHS = [
@@ -59,13 +122,51 @@ _FONT_PATHS = [
 ]
 
 
+# Render worker pool: VIDEO_WORKERS concurrent jobs, each with a hard
+# deadline of VIDEO_JOB_TIMEOUT seconds across all its ffmpeg calls
+_DEFAULT_JOB_TIMEOUT = 600
+
+_job_state = threading.local()  # .deadline — monotonic time the current job must finish by
+
+
+def _video_workers() -> int:
+    raw = os.getenv("VIDEO_WORKERS", "").strip()
+    if raw:
+        return max(1, int(raw))
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _job_timeout() -> float:
+    raw = os.getenv("VIDEO_JOB_TIMEOUT", "").strip()
+    return float(raw) if raw else _DEFAULT_JOB_TIMEOUT
+
+
+def _temp_token() -> str:
+    """Unique suffix for temp files — pid alone collides across worker threads."""
+    return f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+
+def _run_ffmpeg(cmd: list[str], timeout: float) -> subprocess.CompletedProcess:
+    """subprocess.run for ffmpeg, bounded by the current render job's deadline.
+
+    On timeout the child is killed and RuntimeError is raised, so callers'
+    existing fallback paths (which catch RuntimeError) still apply.
+    """
+    deadline = getattr(_job_state, "deadline", None)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError("render job deadline exceeded")
+        timeout = min(timeout, remaining)
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"ffmpeg timed out after {timeout:.0f}s")
+
+
 def _get_ffmpeg() -> str:
     """Get path to ffmpeg binary (bundled with imageio_ffmpeg or system)."""
-    try:
-        import imageio_ffmpeg
-        return imageio_ffmpeg.get_ffmpeg_exe()
-    except ImportError:
-        return "ffmpeg"
+    return ffmpeg_caps.ffmpeg_path()
 
 
 def _find_font() -> str:
@@ -163,44 +264,96 @@ def _build_drawtext_filters(
     return ",".join(filters)
 
 
-def image_to_video(
-    image_path: str,
-    output_path: str | None = None,
-    width: int = IG_WIDTH,
-    height: int = IG_HEIGHT,
-    duration: int = IG_DURATION,
-    add_audio: bool = True,
-    text_lines: list[str] | None = None,
-) -> str:
-    """Convert a static image to MP4 with snap zoom hook + Ken Burns + text overlays.
+def _encoder_args(profile: str | None = None) -> list[str]:
+    """libx264 args for `profile` (default: VIDEO_ENCODER_PROFILE, else publish)."""
+    name = (profile or os.getenv("VIDEO_ENCODER_PROFILE", "")).strip().lower()
+    if not name:
+        name = DEFAULT_ENCODER_PROFILE
+    if name not in ENCODER_PROFILES:
+        log.warning("Unknown encoder profile %r — using %s", name, DEFAULT_ENCODER_PROFILE)
+        name = DEFAULT_ENCODER_PROFILE
+    return ENCODER_PROFILES[name]
 
-    2026 algorithm optimizations:
-      - Snap zoom in first 0.5s (attention grab in 1.7s decision window)
-      - On-screen text overlays (85% watch on mute)
-      - Ken Burns cinematic zoom
 
-    Returns path to the generated MP4 file.
+def _hook_reel_renderer() -> str:
+    renderer = os.getenv("HOOK_REEL_RENDERER", DEFAULT_HOOK_REEL_RENDERER).strip().lower()
+    if renderer not in HOOK_REEL_RENDERERS:
+        renderer = DEFAULT_HOOK_REEL_RENDERER
+    # The graph and per-clip renderers animate with zoompan; the pipe doesn't need it
+    if renderer == "graph" and not ffmpeg_caps.has_filter("zoompan"):
+        return "pipe"
+    return renderer
+
+
+def _ken_burns_engine() -> str:
+    engine = os.getenv("KEN_BURNS_ENGINE", "plate").strip().lower()
+    return engine if engine in KEN_BURNS_ENGINES else "plate"
+
+
+def _motion_input(
+    image_path: str, width: int, height: int, engine: str,
+) -> tuple[str, str, bool]:
+    """Prepare the ffmpeg input for a Ken Burns segment.
+
+    Returns (input_path, engine, is_temp). The plate engine writes the
+    plates.composite() frame to a temp JPEG; if that fails the original image is returned with the
+    zoompan engine so the render still goes through.
     """
-    if output_path is None:
-        output_path = str(Path(image_path).with_suffix(".mp4"))
+    if engine != "plate":
+        return image_path, engine, False
+    try:
+        plate = plates.composite(image_path, width, height)
+        plate_path = os.path.join(tempfile.gettempdir(), f"kbplate_{_temp_token()}.jpg")
+        plate.save(plate_path, quality=95)
+        return plate_path, "plate", True
+    except Exception as exc:
+        log.warning("Plate build failed for %s, using zoompan engine: %s", image_path, exc)
+        return image_path, "zoompan", False
 
-    ffmpeg = _get_ffmpeg()
-    total_frames = duration * FPS
-    half_fps = FPS // 2  # frames in 0.5s
 
+def _ken_burns_filter(
+    width: int,
+    height: int,
+    total_frames: int,
+    tag: str = "",
+    fade_in: bool = True,
+    engine: str = "zoompan",
+) -> str:
+    """Build the fit-with-blur + snap zoom + Ken Burns filter chain for a photo.
+
+    Shared by image_to_video() (as -vf) and the single-pass hook reel and
+    montage graphs (as one branch of -filter_complex — `tag` keeps the pad
+    labels unique). fade_in=False for slides entering through an xfade.
+
+    engine="plate" expects the _motion_input() plate as input and skips the
+    blur/composite stage; "zoompan" takes the raw photo. Both run zoompan on
+    a 2x frame: zoompan crops on whole pixels, and the headroom halves the
+    pan/zoom step so slow motion doesn't jitter.
+    """
     # Snap Zoom Hook + Ken Burns (2026 algorithm — grab attention in 1.7s):
     #   Frames 0-15 (0-0.5s):   Quick zoom 1.0x → 1.3x (visual punch)
     #   Frames 15-30 (0.5-1.0s): Ease back to 1.1x (settle)
     #   Frames 30-end:           Gentle 1.1x → 1.2x (classic Ken Burns)
+    half_fps = FPS // 2  # frames in 0.5s
     zoom_expr = (
         f"if(lt(on,{half_fps}),"
         f"1+0.6*on/{half_fps},"                          # 1.0 → 1.3 (snap in)
         f"if(lt(on,{FPS}),"
         f"1.3-0.2*(on-{half_fps})/{half_fps},"           # 1.3 → 1.1 (ease back)
-        f"1.1+0.1*(on-{FPS})/({total_frames}-{FPS})))"   # 1.1 → 1.2 (Ken Burns)
+        f"1.1+0.1*(on-{FPS})/max(1,{total_frames}-{FPS})))"  # 1.1 → 1.2 (Ken Burns)
     )
+    # Horizontal drift: 5px at target size (10px on the 2x zoompan frame)
     pan_x = f"iw/2-(iw/zoom/2)+10*on/{total_frames}"
     pan_y = "ih/2-(ih/zoom/2)"
+    zoompan = (
+        f"zoompan=z='{zoom_expr}':x='{pan_x}':y='{pan_y}':"
+        f"d={total_frames}:s={width}x{height}:fps={FPS}"
+        + (",fade=in:0:5" if fade_in else "")
+    )
+    tw, th = width * 2, height * 2  # 2x target for zoompan headroom
+    if engine == "plate":
+        # The plate is composed at target size; only the upscale is left
+        return f"scale={tw}:{th}:flags=bicubic," + zoompan
 
     # Fit-with-blur: Show the FULL image (no cropping) with a blurred version
     # of itself filling any empty space. This preserves all content regardless
@@ -209,106 +362,227 @@ def image_to_video(
     #   2. overlay foreground centered on blurred background
     #   3. zoompan for the zoom animation
     #   4. fade=in AFTER zoompan (zoompan reads only frame 0)
-    tw, th = width * 2, height * 2  # 2x target for zoompan headroom
+    return (
+        f"split[bg{tag}][fg{tag}];"
+        f"[bg{tag}]scale={tw}:{th}:force_original_aspect_ratio=increase,"
+        f"crop={tw}:{th},gblur=sigma=40[bgblur{tag}];"
+        f"[fg{tag}]scale={tw}:{th}:force_original_aspect_ratio=decrease[fgfit{tag}];"
+        f"[bgblur{tag}][fgfit{tag}]overlay=(W-w)/2:(H-h)/2,"
+        + zoompan
+    )
+
+
+def _text_zoom_gain(frame_type: str) -> float:
+    """Push-in over a text frame's duration: 1.0 → 1.0 + gain."""
+    if frame_type == "hook":
+        return 0.08  # slightly faster zoom for urgency
+    if frame_type == "cta":
+        return 0.04  # gentle — calm, authoritative
+    return 0.06      # bridge: medium
+
+
+def _text_zoom_filter(width: int, height: int, total_frames: int, frame_type: str) -> str:
+    """Build the gentle push-in filter chain for a hook/bridge/CTA text frame."""
+    # Zoom: gentle push-in — text feels like it's coming at you
+    zoom_expr = f"1+{_text_zoom_gain(frame_type)}*on/{total_frames}"
+
+    pan_x = "iw/2-(iw/zoom/2)"
+    pan_y = "ih/2-(ih/zoom/2)"
+
+    # Simple pipeline: scale → zoompan → fade
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black,"
+        f"zoompan=z='{zoom_expr}':x='{pan_x}':y='{pan_y}':"
+        f"d={total_frames}:s={width}x{height}:fps={FPS},"
+        f"fade=in:0:4"  # 4 frames = ~0.13s fade-in
+    )
+
+
+def _resolve_audio(duration: float) -> tuple[str | None, bool]:
+    """Fetch a background track for a `duration`-second video.
+
+    Returns (audio_path, is_temp) — the caller removes the file when is_temp.
+    User tracks are returned as-is; the mux cuts, fades and levels them
+    (see _audio_filter_args).
+    """
+    raw_audio = get_background_track(duration)
+    if not raw_audio:
+        return None, False
+    # Generated ambient audio — already correct duration
+    return raw_audio, raw_audio.startswith(tempfile.gettempdir())
+
+
+def _audio_key(audio_path: str | None) -> str | None:
+    """Render-cache identity of a chosen background track (None when silent)."""
+    return render_cache.file_digest(audio_path) if audio_path else None
+
+
+def _audio_filter_args(audio_path: str, duration: float) -> list[str]:
+    """-af args that level a background track at mux time.
+
+    Gain comes from the track's cached loudness measurement; full-length
+    user tracks also get a short fade in/out.
+    """
+    shape = not audio_path.startswith(tempfile.gettempdir())
+    af = loudness.mux_filter(audio_path, duration, shape=shape)
+    return ["-af", af] if af else []
+
+
+def _render_ken_burns_pipe(
+    image_path: str,
+    output_path: str,
+    width: int,
+    height: int,
+    duration: int,
+    audio_path: str | None,
+    x264_args: list[str],
+) -> None:
+    """The plate engine for a single photo: framepipe.ken_burns over the cached plate.
+
+    Zoom and drift are applied per frame with sub-pixel crop boxes at the
+    target size, so the motion is as smooth as the 2x zoompan graph without
+    its 4x-area frames.
+    """
+    if audio_path:
+        input_args = ["-i", audio_path]
+        audio_args = [*_audio_filter_args(audio_path, duration), "-c:a", "aac", "-b:a", "128k"]
+    else:
+        # Silent audio track (Instagram needs audio stream for music overlay)
+        input_args = ["-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo"]
+        audio_args = ["-c:a", "aac", "-b:a", "32k"]
+
+    plate = plates.composite(image_path, width, height)
+    deadline = getattr(_job_state, "deadline", None) or time.monotonic() + 120
+    with framepipe.FrameEncoder(
+        _get_ffmpeg(), output_path, width, height, FPS,
+        input_args=input_args,
+        output_args=["-map", "0:v", "-map", "1:a", *x264_args, *audio_args, "-t", str(duration)],
+        deadline=deadline,
+    ) as encoder:
+        encoder.write_all(framepipe.ken_burns(plate, (width, height), duration * FPS, FPS))
+
+
+def image_to_video(
+    image_path: str,
+    output_path: str | None = None,
+    width: int = IG_WIDTH,
+    height: int = IG_HEIGHT,
+    duration: int = IG_DURATION,
+    add_audio: bool = True,
+    text_lines: list[str] | None = None,
+    cache: bool = True,
+    encoder_profile: str | None = None,
+) -> str:
+    """Convert a static image to MP4 with snap zoom hook + Ken Burns + text overlays.
+
+    2026 algorithm optimizations:
+      - Snap zoom in first 0.5s (attention grab in 1.7s decision window)
+      - On-screen text overlays (85% watch on mute)
+      - Ken Burns cinematic zoom
+
+    cache=False skips the render cache (used for intermediate clips).
+    encoder_profile picks an ENCODER_PROFILES entry (default: publish).
+
+    Returns path to the generated MP4 file.
+    """
+    if output_path is None:
+        output_path = str(Path(image_path).with_suffix(".mp4"))
+
+    ffmpeg = _get_ffmpeg()
+    total_frames = duration * FPS
+    engine = _ken_burns_engine()
+    x264_args = _encoder_args(encoder_profile)
 
     def _build_vf(use_text: bool = True) -> str:
-        base = (
-            f"split[bg][fg];"
-            f"[bg]scale={tw}:{th}:force_original_aspect_ratio=increase,"
-            f"crop={tw}:{th},gblur=sigma=40[bgblur];"
-            f"[fg]scale={tw}:{th}:force_original_aspect_ratio=decrease[fgfit];"
-            f"[bgblur][fgfit]overlay=(W-w)/2:(H-h)/2,"
-            f"zoompan=z='{zoom_expr}':x='{pan_x}':y='{pan_y}':"
-            f"d={total_frames}:s={width}x{height}:fps={FPS},"
-            f"fade=in:0:5,"
-            f"format=yuv420p"
-        )
-        if use_text and text_lines:
+        base = _ken_burns_filter(width, height, total_frames, engine=engine) + ",format=yuv420p"
+        # drawtext needs libfreetype, which not every ffmpeg build has
+        if use_text and text_lines and ffmpeg_caps.has_filter("drawtext"):
             drawtext = _build_drawtext_filters(text_lines, width, height, duration)
             if drawtext and base.endswith("format=yuv420p"):
                 base = base[:-len("format=yuv420p")] + drawtext + ",format=yuv420p"
         return base
 
     # Text overlays are now baked into Gemini-generated images — skip drawtext
-    vf = _build_vf(use_text=False)
+    # (the plate engine streams frames from Python and has no filter graph)
+    vf = "framepipe.ken_burns" if engine == "plate" else _build_vf(use_text=False)
 
-    # Try to get background audio
+    # The track is picked before the cache lookup and keyed by its bytes —
+    # the pick is random, so add_audio alone doesn't identify the output.
     audio_path = None
     audio_is_temp = False
     if add_audio:
-        raw_audio = get_background_track(duration)
-        if raw_audio:
-            # If it's a user-provided track, trim it to match video duration
-            if not raw_audio.startswith(tempfile.gettempdir()):
-                trimmed = trim_audio(raw_audio, duration)
-                if trimmed:
-                    audio_path = trimmed
-                    audio_is_temp = True
-                else:
-                    audio_path = raw_audio
-                    audio_is_temp = False
-            else:
-                # Generated ambient audio — already correct duration
-                audio_path = raw_audio
-                audio_is_temp = True
-
-    def _build_cmd(filter_str: str) -> list[str]:
-        if audio_path:
-            return [
-                ffmpeg, "-y",
-                "-loop", "1",
-                "-i", image_path,
-                "-i", audio_path,
-                "-vf", filter_str,
-                "-c:v", "libx264",
-                "-preset", "fast",
-                "-crf", "23",
-                "-c:a", "aac",
-                "-b:a", "128k",
-                "-t", str(duration),
-                "-map", "0:v",
-                "-map", "1:a",
-                output_path,
-            ]
-        else:
-            # Add a silent audio track (Instagram rejects video-only MP4
-            # for Reel uploads with music overlay)
-            return [
-                ffmpeg, "-y",
-                "-loop", "1",
-                "-i", image_path,
-                "-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo",
-                "-vf", filter_str,
-                "-c:v", "libx264",
-                "-preset", "fast",
-                "-crf", "23",
-                "-c:a", "aac",
-                "-b:a", "32k",
-                "-t", str(duration),
-                "-map", "0:v",
-                "-map", "1:a",
-                "-shortest",
-                output_path,
-            ]
-
-    cmd = _build_cmd(vf)
-    log.debug("ffmpeg: %s", " ".join(cmd[:6]) + " ...")
+        audio_path, audio_is_temp = _resolve_audio(duration)
+    audio_filter = _audio_filter_args(audio_path, duration) if audio_path else []
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-
-        # If ffmpeg fails and we used text overlays, retry without them
-        # (drawtext filter requires libfreetype which may not be compiled in)
-        if result.returncode != 0 and text_lines:
-            log.warning("ffmpeg failed with text overlays, retrying without: %s",
-                        (result.stderr or "")[-200:])
-            vf_plain = _build_vf(use_text=False)
-            cmd = _build_cmd(vf_plain)
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-
-        if result.returncode != 0:
-            log.error("ffmpeg stderr: %s", (result.stderr or "")[-500:])
-            raise RuntimeError(f"ffmpeg failed (exit {result.returncode})")
+        cache_key = None
+        if cache:
+            cache_key = render_cache.render_key("image_to_video", [image_path], {
+                "size": [width, height], "duration": duration, "fps": FPS,
+                "audio": _audio_key(audio_path), "text": text_lines or [], "vf": vf,
+                "encoder": x264_args,
+            })
+            if render_cache.fetch(cache_key, output_path):
+                return output_path
+
+        if engine == "plate":
+            try:
+                _render_ken_burns_pipe(
+                    image_path, output_path, width, height, duration, audio_path, x264_args,
+                )
+            except Exception as exc:
+                log.warning("Frame-pipe Ken Burns failed for %s, using zoompan engine: %s",
+                            image_path, exc)
+                engine = "zoompan"
+
+        if engine != "plate":
+            vf = _build_vf(use_text=False)
+
+            def _build_cmd(filter_str: str) -> list[str]:
+                if audio_path:
+                    return [
+                        ffmpeg, "-y",
+                        "-loop", "1",
+                        "-i", image_path,
+                        "-i", audio_path,
+                        "-vf", filter_str,
+                        *x264_args,
+                        *audio_filter,
+                        "-c:a", "aac",
+                        "-b:a", "128k",
+                        "-t", str(duration),
+                        "-map", "0:v",
+                        "-map", "1:a",
+                        output_path,
+                    ]
+                else:
+                    # Add a silent audio track (Instagram rejects video-only MP4
+                    # for Reel uploads with music overlay)
+                    return [
+                        ffmpeg, "-y",
+                        "-loop", "1",
+                        "-i", image_path,
+                        "-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo",
+                        "-vf", filter_str,
+                        *x264_args,
+                        "-c:a", "aac",
+                        "-b:a", "32k",
+                        "-t", str(duration),
+                        "-map", "0:v",
+                        "-map", "1:a",
+                        "-shortest",
+                        output_path,
+                    ]
+
+            cmd = _build_cmd(vf)
+            log.debug("ffmpeg: %s", " ".join(cmd[:6]) + " ...")
+
+            result = _run_ffmpeg(cmd, timeout=120)
+
+            if result.returncode != 0:
+                log.error("ffmpeg stderr: %s", (result.stderr or "")[-500:])
+                raise RuntimeError(f"ffmpeg failed (exit {result.returncode})")
 
         if not os.path.exists(output_path):
             raise RuntimeError(f"ffmpeg produced no output: {output_path}")
@@ -316,6 +590,8 @@ def image_to_video(
         file_size = os.path.getsize(output_path)
         has_audio = "with audio" if audio_path else "silent"
         log.info("Video: %s (%d bytes, %ds, %s)", output_path, file_size, duration, has_audio)
+        if cache_key:
+            render_cache.store(cache_key, output_path)
         return output_path
     finally:
         # Clean up temp audio
@@ -327,6 +603,7 @@ def image_to_youtube_short(
     image_path: str,
     output_path: str | None = None,
     text_lines: list[str] | None = None,
+    encoder_profile: str | None = None,
 ) -> str:
     """Convert a static image to YouTube Shorts format (9:16, 1080x1920, 10s).
 
@@ -344,9 +621,44 @@ def image_to_youtube_short(
         duration=YT_DURATION,
         add_audio=True,
         text_lines=text_lines,
+        encoder_profile=encoder_profile,
     )
 
 
+def _montage_graph(
+    width: int, height: int, duration_per_image: int, engines: list[str],
+) -> str:
+    """Build the single-pass montage filter graph: Ken Burns per slide + xfade chain.
+
+    Every slide but the last is rendered MONTAGE_XFADE seconds longer so the
+    crossfade eats into that overlap; transition k starts at k × per-image
+    duration, keeping the total exactly n × duration_per_image. `engines`
+    holds the Ken Burns engine of each slide's input (see _motion_input).
+    """
+    n = len(engines)
+    xfade_frames = round(MONTAGE_XFADE * FPS)
+    branches: list[str] = []
+    for i in range(n):
+        frames = duration_per_image * FPS + (xfade_frames if i < n - 1 else 0)
+        chain = _ken_burns_filter(
+            width, height, frames, tag=str(i), fade_in=(i == 0), engine=engines[i],
+        )
+        branches.append(
+            f"[{i}:v]{chain},trim=end_frame={frames},setpts=PTS-STARTPTS,"
+            f"fps={FPS},setsar=1,format=yuv420p[s{i}]"  # xfade needs a declared CFR
+        )
+
+    prev = "[s0]"
+    for k in range(1, n):
+        out = ",format=yuv420p[vout]" if k == n - 1 else f"[x{k}]"
+        branches.append(
+            f"{prev}[s{k}]xfade=transition=fade:duration={MONTAGE_XFADE}:"
+            f"offset={k * duration_per_image}{out}"
+        )
+        prev = out
+    return ";".join(branches)
+
+
 def images_to_montage(
     image_paths: list[str],
     output_path: str,
@@ -355,6 +667,7 @@ def images_to_montage(
     duration_per_image: int = IG_MONTAGE_PER_IMAGE,
     add_audio: bool = False,
     text_lines: list[str] | None = None,
+    encoder_profile: str | None = None,
 ) -> str:
     """Create a multi-image montage video with transitions.
 
@@ -364,6 +677,9 @@ def images_to_montage(
       - Text overlay on first and last segments
       - Total duration = len(images) × duration_per_image
 
+    Rendered as one filter graph and one libx264 pass (audio muxed in the
+    same pass); the older per-slide clips + concat path is the fallback.
+
     2026 algorithm: 60-90s Reels get 24% more shares, 19% more reach.
     A 5-image carousel → 30s montage Reel hits the sweet spot.
     """
@@ -372,19 +688,123 @@ def images_to_montage(
         return image_to_video(
             image_paths[0], output_path, width, height,
             duration_per_image, add_audio, text_lines,
+            encoder_profile=encoder_profile,
         )
 
-    ffmpeg = _get_ffmpeg()
-    temp_clips: list[str] = []
-
+    engine = _ken_burns_engine()
+    x264_args = _encoder_args(encoder_profile)
+    graph = _montage_graph(width, height, duration_per_image, [engine] * len(image_paths))
+    total_duration = len(image_paths) * duration_per_image
     audio_path = None
     audio_is_temp = False
 
+    try:
+        # Audio for the full montage if needed — picked before the cache
+        # lookup, since the key depends on which track it is
+        if add_audio:
+            audio_path, audio_is_temp = _resolve_audio(total_duration)
+
+        cache_key = render_cache.render_key("montage", image_paths, {
+            "size": [width, height], "per_image": duration_per_image, "fps": FPS,
+            "audio": _audio_key(audio_path), "text": text_lines or [], "graph": graph,
+            "encoder": x264_args,
+        })
+        if render_cache.fetch(cache_key, output_path):
+            return output_path
+
+        try:
+            if not ffmpeg_caps.has_filter("xfade"):
+                raise RuntimeError("ffmpeg has no xfade filter")
+            _render_montage_single_pass(
+                image_paths, output_path, width, height,
+                duration_per_image, engine, audio_path, x264_args,
+            )
+            mode = "xfade"
+        except RuntimeError as exc:
+            log.warning("Single-pass montage failed, falling back to per-clip render: %s", exc)
+            _render_montage_clips(
+                image_paths, output_path, width, height,
+                duration_per_image, text_lines, audio_path, x264_args,
+            )
+            mode = "concat"
+
+        file_size = os.path.getsize(output_path)
+        log.info("Montage: %s (%d bytes, %ds, %d slides, %s)",
+                 output_path, file_size, total_duration, len(image_paths), mode)
+        render_cache.store(cache_key, output_path)
+        return output_path
+
+    finally:
+        if audio_is_temp and audio_path:
+            _audio_safe_remove(audio_path)
+
+
+def _render_montage_single_pass(
+    image_paths: list[str],
+    output_path: str,
+    width: int,
+    height: int,
+    duration_per_image: int,
+    engine: str,
+    audio_path: str | None,
+    x264_args: list[str],
+) -> None:
+    """Run the _montage_graph() graph: one input per slide, one encode."""
+    ffmpeg = _get_ffmpeg()
+    total_duration = len(image_paths) * duration_per_image
+    cmd = [ffmpeg, "-y"]
+    engines: list[str] = []
+    temp_inputs: list[str] = []
+
+    try:
+        for img_path in image_paths:
+            source, slide_engine, is_temp = _motion_input(img_path, width, height, engine)
+            if is_temp:
+                temp_inputs.append(source)
+            engines.append(slide_engine)
+            cmd += ["-i", source]
+        if audio_path:
+            cmd += ["-i", audio_path]
+        graph = _montage_graph(width, height, duration_per_image, engines)
+        cmd += ["-filter_complex", graph, "-map", "[vout]"]
+        if audio_path:
+            cmd += ["-map", f"{len(image_paths)}:a",
+                    *_audio_filter_args(audio_path, total_duration),
+                    "-c:a", "aac", "-b:a", "128k"]
+        else:
+            cmd += ["-an"]
+        cmd += [*x264_args, "-t", str(total_duration), output_path]
+
+        result = _run_ffmpeg(cmd, timeout=300)
+        if result.returncode != 0:
+            log.debug("Single-pass montage stderr: %s", (result.stderr or "")[-500:])
+            raise RuntimeError(f"Montage ffmpeg failed (exit {result.returncode})")
+    finally:
+        for tmp in temp_inputs:
+            _audio_safe_remove(tmp)
+
+
+def _render_montage_clips(
+    image_paths: list[str],
+    output_path: str,
+    width: int,
+    height: int,
+    duration_per_image: int,
+    text_lines: list[str] | None,
+    audio_path: str | None,
+    x264_args: list[str],
+) -> None:
+    """Legacy montage renderer: one MP4 per slide, then concat + re-encode (hard cuts)."""
+    ffmpeg = _get_ffmpeg()
+    temp_clips: list[str] = []
+    token = _temp_token()
+    list_path = os.path.join(tempfile.gettempdir(), f"montage_list_{token}.txt")
+
     try:
         # Generate individual Ken Burns clips per image
         for i, img_path in enumerate(image_paths):
             clip_path = os.path.join(
-                tempfile.gettempdir(), f"montage_clip_{i}_{os.getpid()}.mp4"
+                tempfile.gettempdir(), f"montage_clip_{i}_{token}.mp4"
             )
 
             # Text overlay: hook on first clip, CTA on last clip
@@ -398,13 +818,11 @@ def images_to_montage(
             image_to_video(
                 img_path, clip_path, width, height,
                 duration_per_image, add_audio=False, text_lines=clip_text,
+                cache=False, encoder_profile="intermediate",
             )
             temp_clips.append(clip_path)
 
         # Create concat list file for ffmpeg
-        list_path = os.path.join(
-            tempfile.gettempdir(), f"montage_list_{os.getpid()}.txt"
-        )
         with open(list_path, "w") as f:
             for clip in temp_clips:
                 f.write(f"file '{clip}'\n")
@@ -412,27 +830,13 @@ def images_to_montage(
         # Concatenate clips — use concat demuxer (reliable, fast)
         total_duration = len(image_paths) * duration_per_image
 
-        # Get audio for the full montage if needed
-        if add_audio:
-            raw_audio = get_background_track(total_duration)
-            if raw_audio:
-                if not raw_audio.startswith(tempfile.gettempdir()):
-                    trimmed = trim_audio(raw_audio, total_duration)
-                    if trimmed:
-                        audio_path = trimmed
-                        audio_is_temp = True
-                    else:
-                        audio_path = raw_audio
-                else:
-                    audio_path = raw_audio
-                    audio_is_temp = True
-
         if audio_path:
             cmd = [
                 ffmpeg, "-y",
                 "-f", "concat", "-safe", "0", "-i", list_path,
                 "-i", audio_path,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+                *x264_args,
+                *_audio_filter_args(audio_path, total_duration),
                 "-c:a", "aac", "-b:a", "128k",
                 "-t", str(total_duration),
                 "-map", "0:v", "-map", "1:a",
@@ -442,38 +846,105 @@ def images_to_montage(
             cmd = [
                 ffmpeg, "-y",
                 "-f", "concat", "-safe", "0", "-i", list_path,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+                *x264_args,
                 "-t", str(total_duration),
                 "-an",
                 output_path,
             ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        result = _run_ffmpeg(cmd, timeout=300)
         if result.returncode != 0:
             log.error("Montage ffmpeg stderr: %s", (result.stderr or "")[-500:])
             raise RuntimeError(f"Montage ffmpeg failed (exit {result.returncode})")
 
-        file_size = os.path.getsize(output_path)
-        log.info("Montage: %s (%d bytes, %ds, %d clips)",
-                 output_path, file_size, total_duration, len(image_paths))
-        return output_path
-
     finally:
         # Clean up temp clips
         for clip in temp_clips:
             _audio_safe_remove(clip)
-        list_file = os.path.join(
-            tempfile.gettempdir(), f"montage_list_{os.getpid()}.txt"
-        )
-        _audio_safe_remove(list_file)
-        if audio_is_temp and audio_path:
-            _audio_safe_remove(audio_path)
+        _audio_safe_remove(list_path)
 
 
 # ---------------------------------------------------------------------------
 # Hook-photo reel: interleaved text hooks + photos (2026 viral format)
 # ---------------------------------------------------------------------------
 
+# Finished text frames: memoized in-process (JPEG bytes) and on disk under
+# generated_images/.text_frames/ — the same hook/bridge/CTA frames are
+# rendered for IG and YT, and again on reposts. Bump the version when the
+# frame design changes.
+_TEXT_FRAME_VERSION = 1
+_text_frames: dict[str, bytes] = {}
+
+# FreeType faces aren't safe to share between render workers: one font
+# cache per thread, keyed by size.
+_font_cache = threading.local()
+
+
+@lru_cache(maxsize=1)
+def _text_font_path() -> str | None:
+    """First loadable entry of _FONT_PATHS (None → PIL's default font)."""
+    for path in _FONT_PATHS:
+        if os.path.exists(path):
+            try:
+                ImageFont.truetype(path, 12)
+                return path
+            except Exception:
+                continue
+    return None
+
+
+def _text_font(size: int) -> ImageFont.ImageFont:
+    fonts = getattr(_font_cache, "fonts", None)
+    if fonts is None:
+        fonts = _font_cache.fonts = {}
+    font = fonts.get(size)
+    if font is None:
+        path = _text_font_path()
+        font = ImageFont.truetype(path, size) if path else ImageFont.load_default()
+        fonts[size] = font
+    return font
+
+
+@lru_cache(maxsize=256)
+def _wrap_text(text: str, font_size: int, max_w: int) -> str:
+    """Greedy word-wrap of `text` to max_w pixels, joined with newlines."""
+    font = _text_font(font_size)
+    lines: list[str] = []
+    current = ""
+    for word in text.split():
+        test = f"{current} {word}".strip()
+        bbox = font.getbbox(test)
+        if bbox[2] - bbox[0] > max_w and current:
+            lines.append(current)
+            current = word
+        else:
+            current = test
+    if current:
+        lines.append(current)
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=16)
+def _gradient_background(width: int, height: int, bg_color: tuple) -> Image.Image:
+    """Vertical vignette: bg_color at the center band, 40% darker at the edges.
+
+    Shaded in 4px bands (the look of the original strip-drawing loop): one
+    1px column computed in NumPy, stretched across the width. Callers must
+    copy() before drawing on it.
+    """
+    cy = height // 2
+    band = (np.arange(height) // 4 * 4).astype(np.float64)
+    factor = 1.0 - 0.4 * (np.abs(band - cy) / cy) ** 1.5
+    column = np.clip(np.outer(factor, bg_color).astype(np.int64), 0, 255).astype(np.uint8)
+    return Image.fromarray(column[:, None, :], "RGB").resize((width, height), Image.NEAREST)
+
+
+def _text_frames_dir() -> Path:
+    d = persona_images_dir() / ".text_frames"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
 def _create_text_frame(
     text: str,
     width: int = 1080,
@@ -493,27 +964,69 @@ def _create_text_frame(
     Args:
         frame_type: "hook", "bridge", or "cta" — affects font size and styling
 
-    Returns path to a temporary JPEG file.
+    Returns path to a temporary JPEG file (the caller removes it). Frames are
+    memoized by (text, size, type, colours), so repeats are a file write.
     """
-    import random as _rnd
+    data = _text_frame_bytes(text, width, height, bg_color, text_color, frame_type)
+    temp_path = os.path.join(
+        tempfile.gettempdir(), f"hooktext_{_temp_token()}.jpg"
+    )
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    return temp_path
 
-    img = Image.new("RGB", (width, height), bg_color)
-    draw = ImageDraw.Draw(img)
 
+def _text_frame_bytes(
+    text: str,
+    width: int,
+    height: int,
+    bg_color: tuple = (13, 13, 13),
+    text_color: tuple = (255, 255, 255),
+    frame_type: str = "hook",
+) -> bytes:
+    """JPEG bytes of a text frame, from the in-process memo, disk, or a fresh render."""
+    key = hashlib.sha256(json.dumps(
+        [_TEXT_FRAME_VERSION, text, width, height, frame_type,
+         list(bg_color), list(text_color)],
+    ).encode()).hexdigest()[:24]
+
+    data = _text_frames.get(key)
+    cache_path: Path | None = None
+    if data is None:
+        try:
+            cache_path = _text_frames_dir() / f"{key}.jpg"
+            data = cache_path.read_bytes()
+        except OSError:
+            data = None
+    if data is None:
+        img = _render_text_frame(text, width, height, bg_color, text_color, frame_type)
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=95)
+        data = buf.getvalue()
+        if cache_path is not None:
+            tmp = f"{cache_path}.tmp{os.getpid()}.{threading.get_ident()}"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, cache_path)
+            except OSError as exc:
+                log.debug("Could not cache text frame %s: %s", key, exc)
+    _text_frames[key] = data
+    return data
+
+
+def _render_text_frame(
+    text: str,
+    width: int,
+    height: int,
+    bg_color: tuple,
+    text_color: tuple,
+    frame_type: str,
+) -> Image.Image:
+    """Rasterize a text frame (see _create_text_frame)."""
     # --- Gradient background with vignette ---
-    # Radial gradient: lighter center → darker edges (depth effect)
-    cx, cy = width // 2, height // 2
-    max_dist = (cx ** 2 + cy ** 2) ** 0.5
-    # Draw vertical gradient strips (faster than pixel-by-pixel)
-    for y_pos in range(0, height, 4):
-        # Vertical gradient: slightly lighter center band
-        dist_y = abs(y_pos - cy) / cy  # 0 at center, 1 at edges
-        # Darken edges: center=bg_color, edges=darker
-        factor = 1.0 - 0.4 * (dist_y ** 1.5)
-        r = max(0, min(255, int(bg_color[0] * factor)))
-        g = max(0, min(255, int(bg_color[1] * factor)))
-        b = max(0, min(255, int(bg_color[2] * factor)))
-        draw.rectangle([(0, y_pos), (width, y_pos + 4)], fill=(r, g, b))
+    img = _gradient_background(width, height, tuple(bg_color)).copy()
+    draw = ImageDraw.Draw(img)
 
     # --- Font sizing by frame type ---
     if frame_type == "hook":
@@ -522,35 +1035,10 @@ def _create_text_frame(
         font_size = width // 9  # ~120px — large but slightly smaller
     else:
         font_size = width // 10  # ~108px — bridge text
-
-    font = None
-    for path in _FONT_PATHS:
-        if os.path.exists(path):
-            try:
-                font = ImageFont.truetype(path, font_size)
-                break
-            except Exception:
-                continue
-    if font is None:
-        font = ImageFont.load_default()
+    font = _text_font(font_size)
 
     # Word-wrap: keep text within 78% of frame width
-    max_w = int(width * 0.78)
-    words = text.split()
-    lines: list[str] = []
-    current = ""
-    for word in words:
-        test = f"{current} {word}".strip()
-        bbox = draw.textbbox((0, 0), test, font=font)
-        if bbox[2] - bbox[0] > max_w and current:
-            lines.append(current)
-            current = word
-        else:
-            current = test
-    if current:
-        lines.append(current)
-
-    full_text = "\n".join(lines)
+    full_text = _wrap_text(text, font_size, int(width * 0.78))
 
     # Center text vertically and horizontally
     bbox = draw.multiline_textbbox((0, 0), full_text, font=font, align="center")
@@ -592,12 +1080,7 @@ def _create_text_frame(
             [(line_x, line_y), (line_x + line_w, line_y + 3)],
             fill=accent_color,
         )
-
-    temp_path = os.path.join(
-        tempfile.gettempdir(), f"hooktext_{abs(hash(text))}_{os.getpid()}.jpg"
-    )
-    img.save(temp_path, quality=95)
-    return temp_path
+    return img
 
 
 def _text_frame_to_clip(
@@ -624,50 +1107,28 @@ def _text_frame_to_clip(
     dur_int = max(1, int(duration + 0.5))
     total_frames = int(dur_int * FPS)
 
-    # Zoom: gentle push-in — text feels like it's coming at you
-    if frame_type == "hook":
-        # Hook: slightly faster zoom for urgency (1.0 → 1.08)
-        zoom_expr = f"1+0.08*on/{total_frames}"
-    elif frame_type == "cta":
-        # CTA: gentle zoom-in (1.0 → 1.04) — calm, authoritative
-        zoom_expr = f"1+0.04*on/{total_frames}"
-    else:
-        # Bridge: medium zoom (1.0 → 1.06)
-        zoom_expr = f"1+0.06*on/{total_frames}"
-
-    pan_x = "iw/2-(iw/zoom/2)"
-    pan_y = "ih/2-(ih/zoom/2)"
-
     # Simple pipeline: scale → zoompan → fade → format
-    vf = (
-        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
-        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black,"
-        f"zoompan=z='{zoom_expr}':x='{pan_x}':y='{pan_y}':"
-        f"d={total_frames}:s={width}x{height}:fps={FPS},"
-        f"fade=in:0:4,"  # 4 frames = ~0.13s fade-in
-        f"format=yuv420p"
-    )
+    vf = _text_zoom_filter(width, height, total_frames, frame_type) + ",format=yuv420p"
 
     cmd = [
         ffmpeg, "-y",
         "-loop", "1",
         "-i", image_path,
         "-vf", vf,
-        "-c:v", "libx264",
-        "-preset", "fast",
-        "-crf", "23",
+        *_encoder_args("intermediate"),  # re-encoded by the concat step
         "-t", f"{duration:.2f}",
         "-an",
         output_path,
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    result = _run_ffmpeg(cmd, timeout=60)
     if result.returncode != 0:
         log.warning("Text frame clip failed, falling back to image_to_video: %s",
                      (result.stderr or "")[-200:])
         # Fallback: use full pipeline
         image_to_video(image_path, output_path, width, height,
-                       duration=dur_int, add_audio=False)
+                       duration=dur_int, add_audio=False, cache=False,
+                       encoder_profile="intermediate")
     return output_path
 
 
@@ -678,6 +1139,7 @@ def create_hook_photo_reel(
     height: int = YT_HEIGHT,
     text_lines: list[str] | None = None,
     add_audio: bool = False,
+    encoder_profile: str | None = None,
 ) -> str:
     """Create a hook-photo reel: bold text slides interleaved with photos.
 
@@ -694,94 +1156,294 @@ def create_hook_photo_reel(
         return images_to_montage(
             photo_paths, output_path, width, height,
             HOOK_REEL_PER_FRAME, add_audio, text_lines,
+            encoder_profile=encoder_profile,
         )
 
-    ffmpeg = _get_ffmpeg()
+    x264_args = _encoder_args(encoder_profile)
+    renderer = _hook_reel_renderer()
+
+    # Interleaved segment sequence: (photo path or text line, seconds, type)
+    segments: list[tuple[str, float, str]] = []
+
+    # 1. Hook text frame — FAST snap (pattern interrupt)
+    segments.append((text_lines[0], HOOK_DUR, "hook"))
+
+    for i, photo in enumerate(photo_paths):
+        # 2. Photo frame — HOLD (let visual land)
+        segments.append((photo, PHOTO_DUR, "photo"))
+
+        # 3. Bridge text between photos (not after last photo)
+        if i < len(photo_paths) - 1 and len(text_lines) > 1:
+            segments.append((text_lines[1], BRIDGE_DUR, "bridge"))
+
+    # 4. Bridge text after last photo (if no CTA, or as setup for CTA)
+    if len(text_lines) > 1 and len(photo_paths) == 1:
+        segments.append((text_lines[1], BRIDGE_DUR, "bridge"))
+
+    # 5. CTA text frame — LINGER (drives saves/sends)
+    if len(text_lines) >= 3:
+        segments.append((text_lines[2], CTA_DUR, "cta"))
+
+    total_dur = sum(d for _, d, _ in segments)
+    log.info(
+        "Hook-photo reel: %d photos + %d text frames = %d total (%.1fs) "
+        "[hook=%.1fs photo=%.1fs bridge=%.1fs cta=%.1fs]",
+        len(photo_paths), len(segments) - len(photo_paths), len(segments), total_dur,
+        HOOK_DUR, PHOTO_DUR, BRIDGE_DUR, CTA_DUR,
+    )
+
     text_frames: list[str] = []
-    temp_clips: list[str] = []
     audio_path = None
     audio_is_temp = False
 
     try:
-        # Build interleaved frame sequence with per-frame durations
-        frame_specs: list[tuple[str, float]] = []  # (image_path, duration_seconds)
-
-        # 1. Hook text frame — FAST snap (pattern interrupt)
-        hook = _create_text_frame(text_lines[0], width, height, frame_type="hook")
-        text_frames.append(hook)
-        frame_specs.append((hook, HOOK_DUR))
-
-        for i, photo in enumerate(photo_paths):
-            # 2. Photo frame — HOLD (let visual land)
-            frame_specs.append((photo, PHOTO_DUR))
-
-            # 3. Bridge text between photos (not after last photo)
-            if i < len(photo_paths) - 1 and len(text_lines) > 1:
-                bridge = _create_text_frame(text_lines[1], width, height, frame_type="bridge")
-                text_frames.append(bridge)
-                frame_specs.append((bridge, BRIDGE_DUR))
-
-        # 4. Bridge text after last photo (if no CTA, or as setup for CTA)
-        if len(text_lines) > 1 and len(photo_paths) == 1:
-            bridge = _create_text_frame(text_lines[1], width, height, frame_type="bridge")
-            text_frames.append(bridge)
-            frame_specs.append((bridge, BRIDGE_DUR))
-
-        # 5. CTA text frame — LINGER (drives saves/sends)
-        if len(text_lines) >= 3:
-            cta = _create_text_frame(
-                text_lines[2], width, height,
-                text_color=(255, 215, 0),  # gold — stands out
-                frame_type="cta",
+        # Get audio if needed (YouTube) — before the cache lookup, since the
+        # key depends on which track was picked
+        if add_audio:
+            audio_path, audio_is_temp = _resolve_audio(total_dur)
+
+        cache_key = render_cache.render_key("hook_reel", photo_paths, {
+            "size": [width, height], "fps": FPS, "audio": _audio_key(audio_path),
+            "text": text_lines,
+            "durations": [HOOK_DUR, PHOTO_DUR, BRIDGE_DUR, CTA_DUR],
+            "renderer": renderer,
+            "photo_graph": _ken_burns_filter(
+                width, height, round(PHOTO_DUR * FPS), engine=_ken_burns_engine(),
+            ),
+            "text_graph": _text_zoom_filter(width, height, round(HOOK_DUR * FPS), "hook"),
+            "encoder": x264_args,
+        })
+        if render_cache.fetch(cache_key, output_path):
+            return output_path
+
+        rendered = False
+        if renderer == "pipe":
+            try:
+                _render_hook_reel_pipe(
+                    segments, output_path, width, height, total_dur, audio_path, x264_args,
+                )
+                rendered = True
+            except Exception as exc:
+                log.warning("Frame-pipe hook reel failed, falling back to filter graph: %s", exc)
+
+        if not rendered:
+            # The graph and per-clip renderers read text frames from disk
+            frame_specs: list[tuple[str, float, str]] = []
+            for source, dur, frame_type in segments:
+                if frame_type != "photo":
+                    source = _create_text_frame(
+                        source, width, height,
+                        text_color=_text_color(frame_type), frame_type=frame_type,
+                    )
+                    text_frames.append(source)
+                frame_specs.append((source, dur, frame_type))
+
+            # One filter graph, one encode. The per-clip pipeline (2-3 encodes
+            # per segment) is kept as a fallback for ffmpeg builds that choke
+            # on the combined graph.
+            try:
+                _render_hook_reel_single_pass(
+                    frame_specs, output_path, width, height, total_dur, audio_path, x264_args,
+                )
+            except RuntimeError as exc:
+                log.warning("Single-pass hook reel failed, falling back to per-clip render: %s", exc)
+                _render_hook_reel_clips(
+                    frame_specs, output_path, width, height, total_dur, audio_path, x264_args,
+                )
+
+        file_size = os.path.getsize(output_path)
+        log.info("Hook-photo reel: %s (%d bytes, %.1fs, %s audio)",
+                 output_path, file_size, total_dur,
+                 "with" if audio_path else "silent")
+        render_cache.store(cache_key, output_path)
+        return output_path
+
+    finally:
+        # Clean up temp files
+        for tf in text_frames:
+            try:
+                os.remove(tf)
+            except OSError:
+                pass
+        if audio_is_temp and audio_path:
+            _audio_safe_remove(audio_path)
+
+
+def _text_color(frame_type: str) -> tuple:
+    return _CTA_TEXT_COLOR if frame_type == "cta" else (255, 255, 255)
+
+
+def _render_hook_reel_pipe(
+    segments: list[tuple[str, float, str]],
+    output_path: str,
+    width: int,
+    height: int,
+    total_dur: float,
+    audio_path: str | None,
+    x264_args: list[str],
+) -> None:
+    """Render a hook-photo reel by streaming Python-composed frames to one encoder.
+
+    Photos are plates.composite() plates and text slides are the cached text
+    frames, both decoded once in memory; framepipe applies the same snap
+    zoom / push-in motion per frame. Nothing is written to disk but the MP4.
+    """
+    if audio_path:
+        input_args = ["-i", audio_path]
+        audio_args = [*_audio_filter_args(audio_path, total_dur),
+                      "-c:a", "aac", "-b:a", "128k"]
+    else:
+        # Silent audio track (Instagram needs audio stream for music overlay)
+        input_args = ["-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo"]
+        audio_args = ["-c:a", "aac", "-b:a", "32k"]
+
+    deadline = getattr(_job_state, "deadline", None) or time.monotonic() + 300
+    size = (width, height)
+    with framepipe.FrameEncoder(
+        _get_ffmpeg(), output_path, width, height, FPS,
+        input_args=input_args,
+        output_args=[
+            "-map", "0:v", "-map", "1:a",
+            *x264_args,
+            *audio_args,
+            "-t", f"{total_dur:.2f}",
+        ],
+        deadline=deadline,
+    ) as encoder:
+        for source, dur, frame_type in segments:
+            frames = max(1, round(dur * FPS))
+            if frame_type == "photo":
+                plate = plates.composite(source, width, height)
+                encoder.write_all(framepipe.ken_burns(plate, size, frames, FPS))
+            else:
+                data = _text_frame_bytes(
+                    source, width, height,
+                    text_color=_text_color(frame_type), frame_type=frame_type,
+                )
+                with Image.open(io.BytesIO(data)) as img:
+                    card = img.convert("RGB")
+                encoder.write_all(
+                    framepipe.push_in(card, size, frames, _text_zoom_gain(frame_type))
+                )
+
+
+def _render_hook_reel_single_pass(
+    frame_specs: list[tuple[str, float, str]],
+    output_path: str,
+    width: int,
+    height: int,
+    total_dur: float,
+    audio_path: str | None,
+    x264_args: list[str],
+) -> None:
+    """Render a hook-photo reel with one filter_complex graph and one encode.
+
+    Each segment is a single-frame image input; zoompan expands it to exactly
+    round(duration * FPS) frames, trim pins the length, and concat joins the
+    segments — no intermediate MP4s, no re-encode to trim.
+    """
+    ffmpeg = _get_ffmpeg()
+    engine = _ken_burns_engine()
+    cmd = [ffmpeg, "-y"]
+    branches: list[str] = []
+    labels: list[str] = []
+    temp_inputs: list[str] = []
+
+    try:
+        for i, (img_path, dur, frame_type) in enumerate(frame_specs):
+            frames = max(1, round(dur * FPS))
+            if frame_type == "photo":
+                source, photo_engine, is_temp = _motion_input(img_path, width, height, engine)
+                if is_temp:
+                    temp_inputs.append(source)
+                chain = _ken_burns_filter(width, height, frames, tag=str(i), engine=photo_engine)
+            else:
+                source = img_path
+                chain = _text_zoom_filter(width, height, frames, frame_type)
+            cmd += ["-i", source]
+            branches.append(
+                f"[{i}:v]{chain},trim=end_frame={frames},setpts=PTS-STARTPTS,"
+                f"setsar=1,format=yuv420p[v{i}]"
             )
-            text_frames.append(cta)
-            frame_specs.append((cta, CTA_DUR))
-
-        total_dur = sum(d for _, d in frame_specs)
-        log.info(
-            "Hook-photo reel: %d photos + %d text frames = %d total (%.1fs) "
-            "[hook=%.1fs photo=%.1fs bridge=%.1fs cta=%.1fs]",
-            len(photo_paths), len(text_frames), len(frame_specs), total_dur,
-            HOOK_DUR, PHOTO_DUR, BRIDGE_DUR, CTA_DUR,
+            labels.append(f"[v{i}]")
+
+        graph = (
+            ";".join(branches)
+            + f";{''.join(labels)}concat=n={len(labels)}:v=1:a=0,fps={FPS}[vout]"
         )
 
+        if audio_path:
+            cmd += ["-i", audio_path]
+            audio_args = [*_audio_filter_args(audio_path, total_dur),
+                          "-c:a", "aac", "-b:a", "128k"]
+        else:
+            # Silent audio track (Instagram needs audio stream for music overlay)
+            cmd += ["-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo"]
+            audio_args = ["-c:a", "aac", "-b:a", "32k"]
+
+        cmd += [
+            "-filter_complex", graph,
+            "-map", "[vout]", "-map", f"{len(frame_specs)}:a",
+            *x264_args,
+            *audio_args,
+            "-t", f"{total_dur:.2f}",
+            output_path,
+        ]
+
+        result = _run_ffmpeg(cmd, timeout=300)
+        if result.returncode != 0:
+            log.debug("Single-pass hook reel stderr: %s", (result.stderr or "")[-500:])
+            raise RuntimeError(f"Hook reel ffmpeg failed (exit {result.returncode})")
+    finally:
+        for tmp in temp_inputs:
+            _audio_safe_remove(tmp)
+
+
+def _render_hook_reel_clips(
+    frame_specs: list[tuple[str, float, str]],
+    output_path: str,
+    width: int,
+    height: int,
+    total_dur: float,
+    audio_path: str | None,
+    x264_args: list[str],
+) -> None:
+    """Legacy hook-photo renderer: one MP4 per segment, then concat + re-encode."""
+    ffmpeg = _get_ffmpeg()
+    temp_clips: list[str] = []
+    token = _temp_token()
+    list_path = os.path.join(tempfile.gettempdir(), f"hook_list_{token}.txt")
+
+    try:
         # Generate individual clips with per-frame durations
         # Text frames → _text_frame_to_clip (zoom + fade, fast)
         # Photo frames → image_to_video (Ken Burns + snap zoom, full pipeline)
-        for i, (img_path, dur) in enumerate(frame_specs):
+        for i, (img_path, dur, frame_type) in enumerate(frame_specs):
             clip_path = os.path.join(
-                tempfile.gettempdir(), f"hook_clip_{i}_{os.getpid()}.mp4"
+                tempfile.gettempdir(), f"hook_clip_{i}_{token}.mp4"
             )
 
-            is_text_frame = img_path in text_frames
-            if is_text_frame:
-                # Determine frame type from position
-                if i == 0:
-                    ft = "hook"
-                elif i == len(frame_specs) - 1:
-                    ft = "cta"
-                else:
-                    ft = "bridge"
-                _text_frame_to_clip(img_path, clip_path, width, height, dur, ft)
+            if frame_type != "photo":
+                _text_frame_to_clip(img_path, clip_path, width, height, dur, frame_type)
                 temp_clips.append(clip_path)
             else:
                 # Photo frame: full Ken Burns pipeline, then trim
                 image_to_video(
                     img_path, clip_path, width, height,
                     duration=max(1, int(dur + 0.5)),
-                    add_audio=False,
+                    add_audio=False, cache=False, encoder_profile="intermediate",
                 )
                 # Trim to exact float duration
                 trimmed_path = os.path.join(
-                    tempfile.gettempdir(), f"hook_trim_{i}_{os.getpid()}.mp4"
+                    tempfile.gettempdir(), f"hook_trim_{i}_{token}.mp4"
                 )
                 trim_cmd = [
                     ffmpeg, "-y", "-i", clip_path,
                     "-t", f"{dur:.2f}",
-                    "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+                    *_encoder_args("intermediate"),
                     "-an", trimmed_path,
                 ]
-                result = subprocess.run(trim_cmd, capture_output=True, text=True, timeout=60)
+                result = _run_ffmpeg(trim_cmd, timeout=60)
                 if result.returncode == 0:
                     temp_clips.append(trimmed_path)
                     _audio_safe_remove(clip_path)
@@ -789,34 +1451,17 @@ def create_hook_photo_reel(
                     temp_clips.append(clip_path)
 
         # Concatenate all clips
-        list_path = os.path.join(
-            tempfile.gettempdir(), f"hook_list_{os.getpid()}.txt"
-        )
         with open(list_path, "w") as f:
             for clip in temp_clips:
                 f.write(f"file '{clip}'\n")
 
-        # Get audio if needed (YouTube)
-        if add_audio:
-            raw_audio = get_background_track(total_dur)
-            if raw_audio:
-                if not raw_audio.startswith(tempfile.gettempdir()):
-                    trimmed = trim_audio(raw_audio, total_dur)
-                    if trimmed:
-                        audio_path = trimmed
-                        audio_is_temp = True
-                    else:
-                        audio_path = raw_audio
-                else:
-                    audio_path = raw_audio
-                    audio_is_temp = True
-
         if audio_path:
             cmd = [
                 ffmpeg, "-y",
                 "-f", "concat", "-safe", "0", "-i", list_path,
                 "-i", audio_path,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+                *x264_args,
+                *_audio_filter_args(audio_path, total_dur),
                 "-c:a", "aac", "-b:a", "128k",
                 "-t", f"{total_dur:.2f}",
                 "-map", "0:v", "-map", "1:a",
@@ -828,7 +1473,7 @@ def create_hook_photo_reel(
                 ffmpeg, "-y",
                 "-f", "concat", "-safe", "0", "-i", list_path,
                 "-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
+                *x264_args,
                 "-c:a", "aac", "-b:a", "32k",
                 "-t", f"{total_dur:.2f}",
                 "-map", "0:v", "-map", "1:a",
@@ -836,177 +1481,363 @@ def create_hook_photo_reel(
                 output_path,
             ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        result = _run_ffmpeg(cmd, timeout=300)
         if result.returncode != 0:
             log.error("Hook reel ffmpeg stderr: %s", (result.stderr or "")[-500:])
             raise RuntimeError(f"Hook reel ffmpeg failed (exit {result.returncode})")
 
-        file_size = os.path.getsize(output_path)
-        log.info("Hook-photo reel: %s (%d bytes, %.1fs, %s audio)",
-                 output_path, file_size, total_dur,
-                 "with" if audio_path else "silent")
-        return output_path
-
     finally:
-        # Clean up temp files
-        for tf in text_frames:
-            try:
-                os.remove(tf)
-            except OSError:
-                pass
         for tc in temp_clips:
             _audio_safe_remove(tc)
-        _audio_safe_remove(os.path.join(
-            tempfile.gettempdir(), f"hook_list_{os.getpid()}.txt"
-        ))
+        _audio_safe_remove(list_path)
+
+
+def _existing(path: Any) -> bool:
+    """True when a queue field points at a file that is still on disk."""
+    path = str(path or "").strip()
+    return bool(path) and os.path.exists(path)
+
+
+@dataclass
+class _RenderJob:
+    """One pending video render and the posts waiting on its output."""
+    output_path: str
+    target: str                      # "ig" → video_url, "yt" → youtube_video_url
+    label: str                       # log prefix on failure
+    render: partial                  # called with output_path= (the .render_parts file)
+    posts: list[dict[str, Any]]
+    source: str | None = None        # silent job whose video stream this one reuses
+
+    @property
+    def inputs(self) -> list[str]:
+        first = self.render.args[0]
+        return [str(p) for p in first] if isinstance(first, list) else [str(first)]
+
+    def input_hash(self) -> str:
+        """Identity of the render: input image bytes + function + parameters."""
+        return render_cache.render_key(self.render.func.__name__, self.inputs, {
+            "args": self.render.args[1:], "kwargs": self.render.keywords,
+        })
+
+
+# Renderers whose add_audio flag only changes the audio track
+_AUDIO_ONLY_VARIANTS = (create_hook_photo_reel,)
+
+
+def _video_spec(job: _RenderJob) -> tuple | None:
+    """What a job's video stream depends on, for renders where add_audio only
+    changes the audio track; None for every other render."""
+    if job.render.func not in _AUDIO_ONLY_VARIANTS:
+        return None
+    kwargs = {k: v for k, v in job.render.keywords.items() if k != "add_audio"}
+    return (job.render.func.__name__, repr(job.render.args), repr(sorted(kwargs.items())))
+
+
+def _share_video_streams(jobs: list[_RenderJob]) -> None:
+    """Point audio variants at a silent job with the same video spec.
+
+    The IG and YT hook-photo reels are both 1080x1920 with identical frames;
+    only the YT one carries a background track. The YT job then remuxes the
+    IG render (-c:v copy) with fresh audio instead of encoding it again.
+    """
+    silent: dict[tuple, str] = {}
+    for job in jobs:
+        spec = _video_spec(job)
+        if spec is not None and not job.render.keywords.get("add_audio"):
+            silent.setdefault(spec, job.output_path)
+    for job in jobs:
+        spec = _video_spec(job)
+        if spec is not None and job.render.keywords.get("add_audio") and spec in silent:
+            job.source = silent[spec]
+
+
+def _media_duration(path: str) -> float | None:
+    """Container duration in seconds, from ffmpeg's input banner."""
+    result = _run_ffmpeg([_get_ffmpeg(), "-hide_banner", "-i", path], timeout=30)
+    m = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr or "")
+    if not m:
+        return None
+    hours, minutes, seconds = m.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _mux_audio_variant(video_path: str, output_path: str) -> str:
+    """Copy video_path's video stream and mux a background track under it.
+
+    Produces what a render with add_audio=True would, minus the video encode.
+    Without a track the result is the silent render itself (same as the
+    renderers' silent fallback).
+    """
+    duration = _media_duration(video_path)
+    if duration is None:
+        raise RuntimeError(f"could not read duration of {video_path}")
+    audio_path, audio_is_temp = _resolve_audio(duration)
+    try:
+        if not audio_path:
+            shutil.copyfile(video_path, output_path)
+            return output_path
+        cmd = [
+            _get_ffmpeg(), "-y",
+            "-i", video_path,
+            "-i", audio_path,
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy",
+            *_audio_filter_args(audio_path, duration),
+            "-c:a", "aac", "-b:a", "128k",
+            "-t", f"{duration:.2f}",
+            output_path,
+        ]
+        result = _run_ffmpeg(cmd, timeout=120)
+        if result.returncode != 0:
+            raise RuntimeError(f"audio remux failed: {(result.stderr or '')[-300:]}")
+        log.info("Audio variant: %s (video stream from %s)", output_path, Path(video_path).name)
+        return output_path
+    finally:
         if audio_is_temp and audio_path:
             _audio_safe_remove(audio_path)
 
 
-def convert_posts_to_video(posts: list[dict[str, Any]], youtube: bool = False) -> int:
-    """Convert images to videos for posts that need it. Returns count converted.
+def _plan_video_jobs(posts: list[dict[str, Any]], youtube: bool) -> list[_RenderJob]:
+    """Walk the queue and collect every render that is needed, in queue order.
 
-    Audio strategy (2026 algorithm):
-      - Instagram Reels: SILENT video — trending music is overlaid at publish time
-        via publisher._find_trending_track() (Instagram algorithm boosts trending audio)
-      - YouTube Shorts: WITH audio — royalty-free music baked in (Pixabay/user/ambient)
-
-    Text overlay strategy (2026 — 85% watch on mute):
-      - On-screen text captions from post's 'video_text' field
-      - Hook → Body → CTA timed to appear sequentially
+    Jobs are keyed by output path: reposts that share an image_url share one
+    render instead of racing two ffmpeg processes onto the same file.
     """
-    converted = 0
+    jobs: dict[str, _RenderJob] = {}
+
+    def _add(output_path: str, target: str, label: str,
+             render: partial, post: dict[str, Any]) -> None:
+        job = jobs.get(output_path)
+        if job is None:
+            jobs[output_path] = _RenderJob(output_path, target, label, render, [post])
+        elif post not in job.posts:
+            job.posts.append(post)
+
     for post in posts:
-        status = str(post.get("status", "")).strip().lower()
-        if status == "failed":
+        record = as_post(post)  # typed fields, coerced when the queue was read
+        if record.status == PostStatus.FAILED:
             continue
         # "posted" posts already published to IG — only process for YT videos
-        is_posted = (status == "posted")
+        is_posted = record.status == PostStatus.POSTED
         if is_posted:
             # Skip if YouTube is off or post already has a YT video
             if not youtube or post.get("youtube_video_id"):
                 continue
 
         # Single/photo posts publish as photos — no video needed
-        post_type = str(post.get("post_type", "reel")).strip().lower()
-        if post_type in ("single", "photo"):
+        post_type = record.post_type
+        if post_type in (PostType.SINGLE, "photo"):
             continue
 
         # Need an existing image to convert
-        image_url = str(post.get("image_url", "")).strip()
+        image_url = record.image_url
         if not image_url or not os.path.exists(image_url):
             continue
 
-        # Extract text overlay lines from post
-        video_text = post.get("video_text")
-        if isinstance(video_text, list):
-            text_lines = [str(t).strip() for t in video_text if str(t).strip()][:3]
-        else:
-            text_lines = None
+        # Text overlay lines from post
+        text_lines = record.video_text[:3] if isinstance(post.get("video_text"), list) else None
+
+        ig_path = str(Path(image_url).with_suffix(".mp4"))
+        yt_path = str(Path(image_url).with_name(Path(image_url).stem + "_yt.mp4"))
+        need_ig = not _existing(post.get("video_url"))
+        need_yt = youtube and not _existing(post.get("youtube_video_url"))
 
         # Hook-photo reel format: text hooks interleaved with photos
         # Detect: reel_format == "hook_photo" with 2+ carousel_images
-        reel_format = str(post.get("reel_format", "")).strip().lower()
-        if reel_format == "hook_photo" and not is_posted:
-            carousel_images = post.get("carousel_images") or []
+        if record.reel_format == "hook_photo" and not is_posted:
+            carousel_images = record.carousel_images
             valid_hook = (
-                isinstance(carousel_images, list)
-                and len(carousel_images) >= 1
-                and all(os.path.exists(str(p)) for p in carousel_images)
+                len(carousel_images) >= 1
+                and all(os.path.exists(p) for p in carousel_images)
             )
             if valid_hook and text_lines:
-                video_url = str(post.get("video_url") or "").strip()
-                if not video_url or not os.path.exists(video_url):
-                    try:
-                        hook_path = str(Path(image_url).with_name(
-                            Path(image_url).stem + ".mp4"
-                        ))
-                        video_path = create_hook_photo_reel(
-                            [str(p) for p in carousel_images],
-                            hook_path,
-                            width=IG_WIDTH,
-                            height=YT_HEIGHT,  # 9:16 for reels
-                            text_lines=text_lines,
-                            add_audio=False,  # trending audio at publish
-                        )
-                        post["video_url"] = video_path
-                        post["is_reel"] = True
-                        converted += 1
-                        log.info("Hook-photo reel created for %s", post.get("id"))
-                    except Exception as exc:
-                        log.warning("Hook-photo reel failed for %s: %s", post.get("id"), exc)
-
+                photos = list(carousel_images)
+                if need_ig:
+                    _add(ig_path, "ig", "Hook-photo reel", partial(
+                        create_hook_photo_reel, photos,
+                        width=IG_WIDTH,
+                        height=YT_HEIGHT,  # 9:16 for reels
+                        text_lines=text_lines,
+                        add_audio=False,  # trending audio at publish
+                    ), post)
                 # Also create YT version if youtube enabled
-                if youtube:
-                    yt_video = str(post.get("youtube_video_url") or "").strip()
-                    if not yt_video or not os.path.exists(yt_video):
-                        try:
-                            yt_path = str(Path(image_url).with_name(
-                                Path(image_url).stem + "_yt.mp4"
-                            ))
-                            create_hook_photo_reel(
-                                [str(p) for p in carousel_images],
-                                yt_path,
-                                width=YT_WIDTH,
-                                height=YT_HEIGHT,
-                                text_lines=text_lines,
-                                add_audio=True,  # baked audio for YT
-                            )
-                            post["youtube_video_url"] = yt_path
-                        except Exception as exc:
-                            log.warning("Hook-photo YT reel failed for %s: %s", post.get("id"), exc)
+                if need_yt:
+                    _add(yt_path, "yt", "Hook-photo YT reel", partial(
+                        create_hook_photo_reel, photos,
+                        width=YT_WIDTH,
+                        height=YT_HEIGHT,
+                        text_lines=text_lines,
+                        add_audio=True,  # baked audio for YT
+                    ), post)
                 continue  # hook-photo reel done — skip normal processing
 
         # Instagram video (4:5) — SILENT: trending audio added at publish time
         # Carousels publish as swipeable albums on IG — no video needed.
         # The montage video is created below for YouTube Shorts only.
         # Skip IG video for already-posted posts (already published to IG).
-        if is_posted or post_type == "carousel":
-            pass  # Skip IG video — either already posted or carousel (album)
-        else:
-            video_url = str(post.get("video_url") or "").strip()
-            if not video_url or not os.path.exists(video_url):
-                try:
-                    video_path = image_to_video(
-                        image_url, add_audio=False, text_lines=text_lines,
-                    )
-                    post["video_url"] = video_path
-                    post["is_reel"] = True
-                    converted += 1
-                except Exception as exc:
-                    log.warning("IG video conversion failed for %s: %s", post.get("id"), exc)
+        if not (is_posted or post_type == PostType.CAROUSEL) and need_ig:
+            _add(ig_path, "ig", "IG video conversion", partial(
+                image_to_video, image_url, add_audio=False, text_lines=text_lines,
+            ), post)
 
         # YouTube Shorts video (9:16) — WITH audio: royalty-free music baked in
         # For carousels: montage all slides into one Short (not just 1st image)
-        if youtube:
-            yt_video = str(post.get("youtube_video_url") or "").strip()
-            if not yt_video or not os.path.exists(yt_video):
-                try:
-                    # Carousel → montage all slides into one YT Short
-                    carousel_images = post.get("carousel_images") or []
-                    valid_carousel = (
-                        post_type == "carousel"
-                        and isinstance(carousel_images, list)
-                        and len(carousel_images) >= 3
-                        and all(os.path.exists(str(p)) for p in carousel_images)
-                    )
+        if need_yt:
+            carousel_images = record.carousel_images
+            valid_carousel = (
+                post_type == PostType.CAROUSEL
+                and len(carousel_images) >= 3
+                and all(os.path.exists(p) for p in carousel_images)
+            )
+            if valid_carousel:
+                # Carousel → montage all slides into one YT Short
+                _add(yt_path, "yt", "YT video conversion", partial(
+                    images_to_montage,
+                    list(carousel_images),
+                    width=YT_WIDTH, height=YT_HEIGHT,
+                    duration_per_image=YT_MONTAGE_PER_IMAGE,
+                    add_audio=True, text_lines=text_lines,
+                ), post)
+            else:
+                _add(yt_path, "yt", "YT video conversion", partial(
+                    image_to_youtube_short, image_url, text_lines=text_lines,
+                ), post)
+
+    planned = list(jobs.values())
+    _share_video_streams(planned)
+    return planned
+
+
+def _part_path(output_path: str) -> str:
+    """Scratch file for a render of output_path, unique per job and process.
+
+    Output basenames repeat across posts (every carousel's image_url is
+    pending/<post_id>/1.jpg → 1.mp4), so the name carries a hash of the full
+    output path plus a temp token; the suffix stays for ffmpeg's muxer pick.
+    """
+    out = Path(output_path)
+    digest = hashlib.sha1(os.path.abspath(output_path).encode()).hexdigest()[:12]
+    return str(parts_dir() / f"{out.stem}.{digest}.{_temp_token()}{out.suffix}")
+
+
+def _run_job(
+    job: _RenderJob, timeout: float, manifest: RenderManifest, source_video: str | None = None,
+) -> str:
+    """Worker entry point: run one render under a per-job deadline.
+
+    The render writes to .render_parts/ and is renamed onto output_path only
+    once it succeeds, so the output path never holds a half-written file.
+    With source_video (the finished output of job.source) the job is an
+    audio remux of that file; if the remux fails it renders in full.
+    """
+    part_path = _part_path(job.output_path)
+    manifest.mark(job.output_path, RENDERING)
+    _job_state.deadline = time.monotonic() + timeout
+    try:
+        if source_video:
+            try:
+                _mux_audio_variant(source_video, part_path)
+            except RuntimeError as exc:
+                log.warning("%s: remux of %s failed, rendering in full: %s",
+                            job.label, source_video, exc)
+                job.render(output_path=part_path)
+        else:
+            job.render(output_path=part_path)
+        os.replace(part_path, job.output_path)
+    except BaseException as exc:
+        _audio_safe_remove(part_path)
+        manifest.mark(job.output_path, FAILED, error=str(exc)[:300])
+        raise
+    finally:
+        _job_state.deadline = None
+    manifest.mark(job.output_path, DONE)
+    return job.output_path
+
+
+def convert_posts_to_video(
+    posts: list[dict[str, Any]],
+    youtube: bool = False,
+    pool: ThreadPoolExecutor | None = None,
+) -> int:
+    """Convert images to videos for posts that need it. Returns count converted.
+
+    Audio strategy (2026 algorithm):
+      - Instagram Reels: SILENT video — trending music is overlaid at publish time
+        via publisher._find_trending_track() (Instagram algorithm boosts trending audio)
+      - YouTube Shorts: WITH audio — royalty-free music baked in (Pixabay/user/ambient)
+
+    Text overlay strategy (2026 — 85% watch on mute):
+      - On-screen text captions from post's 'video_text' field
+      - Hook → Body → CTA timed to appear sequentially
+
+    Renders run concurrently (VIDEO_WORKERS, default min(4, cores)); each job
+    is capped at VIDEO_JOB_TIMEOUT seconds. Results are merged back into the
+    posts in queue order once all jobs finish, so the outcome is identical to
+    a serial run.
+
+    Every job's state is persisted in the render manifest as it changes, so
+    a run killed part-way resumes: finished outputs whose inputs are
+    unchanged are adopted instead of re-encoded (see render_manifest.py).
+
+    `pool` lets a caller that converts several queues in turn (build.py)
+    reuse one render pool; by default a pool is created for this call.
+    """
+    jobs = _plan_video_jobs(posts, youtube)
+    if not jobs:
+        return 0
+
+    manifest = RenderManifest.load()
+    sweep_parts()
+    results: dict[str, str | Exception] = {}
+    pending: list[_RenderJob] = []
+    for job in jobs:
+        input_hash = job.input_hash()
+        if manifest.adoptable(job.output_path, input_hash):
+            log.info("Adopting finished render %s", job.output_path)
+            results[job.output_path] = job.output_path
+            continue
+        manifest.mark(job.output_path, QUEUED, target=job.target, input_hash=input_hash,
+                      inputs=job.inputs, post_ids=[p.get("id") for p in job.posts])
+        pending.append(job)
+
+    if pending:
+        workers = min(_video_workers(), len(pending))
+        timeout = _job_timeout()
+        log.info("Rendering %d video(s) with %d worker(s)%s", len(pending), workers,
+                 f" ({len(jobs) - len(pending)} adopted)" if len(pending) < len(jobs) else "")
+        own_pool = pool is None
+        if own_pool:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        try:
+            # Audio variants go second: they remux their source job's output
+            for batch in ([j for j in pending if not j.source],
+                          [j for j in pending if j.source]):
+                futures = {}
+                for job in batch:
+                    source = results.get(job.source) if job.source else None
+                    futures[pool.submit(_run_job, job, timeout, manifest,
+                                        source if isinstance(source, str) else None)] = job
+                for future, job in futures.items():
+                    try:
+                        results[job.output_path] = future.result()
+                    except Exception as exc:
+                        results[job.output_path] = exc
+        finally:
+            if own_pool:
+                pool.shutdown()
 
-                    if valid_carousel:
-                        yt_montage_path = str(Path(image_url).with_name(
-                            Path(image_url).stem + "_yt.mp4"
-                        ))
-                        yt_path = images_to_montage(
-                            [str(p) for p in carousel_images],
-                            yt_montage_path,
-                            YT_WIDTH, YT_HEIGHT, YT_MONTAGE_PER_IMAGE,
-                            add_audio=True, text_lines=text_lines,
-                        )
-                    else:
-                        yt_path = image_to_youtube_short(
-                            image_url, text_lines=text_lines,
-                        )
-                    post["youtube_video_url"] = yt_path
-                except Exception as exc:
-                    log.warning("YT video conversion failed for %s: %s", post.get("id"), exc)
+    converted = 0
+    for job in jobs:
+        outcome = results[job.output_path]
+        for post in job.posts:
+            if isinstance(outcome, Exception):
+                log.warning("%s failed for %s: %s", job.label, post.get("id"), outcome)
+                continue
+            if job.target == "yt":
+                post["youtube_video_url"] = outcome
+            else:
+                post["video_url"] = outcome
+                post["is_reel"] = True
+                converted += 1
 
     return converted